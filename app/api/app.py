@@ -1,23 +1,156 @@
+import time
+
+_import_started = time.perf_counter()
+
+from contextlib import asynccontextmanager
+
+import anyio
 from fastapi import FastAPI,Request, status
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, PlainTextResponse
 
-from app.api.v1.Integration_SM.app import router as api_router_v1
 from app.middlewares.ConfigureMiddleware import configure_middleware
-from app.api.v2.Integration_SM.app import router as api_router_v2
-from app.api.v3.Integration_SM.app import router as api_router_v3
-from app.api.v4.Integration_SM.app import router as api_router_v4
-from app.api.v5.Integration_SM.app import router as api_router_v5
-from app.api.v1.PasarelaPagoMS.app import router as api_router_pasarela_ms_v1
-from app.api.v2.PasarelaPagoMS.app import router as api_router_pasarela_ms_v2
-from app.utils.v2.LoggerSingletonDB import logger
+from app.middlewares.MetricsMiddleware import register_router_prefix
+from app.utils.v1.AsyncHttpx import http_pool
+from app.utils.v1.configs import (ENABLED_ROUTERS, METRICS_FLUSH_INTERVAL, PROBE_INTERVAL, WARMUP_ENABLED,
+                                  WARMUP_TASA_BCV)
+from app.utils.v1.DependencyProbes import UP, dependency_probes
+from app.utils.v2.LoggerSingletonDB import attach_mongodb_sink, detach_mongodb_sink, logger
+from app.utils.v1.PayloadLogging import log_payload
+from app.utils.v1.UpstreamPolicy import CircuitOpenError, circuit_breaker_states
+from app.utils.v1.ResponseCache import cache_stats
+from app.utils.v1.RequestCoalescing import coalescing_stats
+from app.utils.v1.StartupTiming import startup_timings
+from app.utils.v1.Metrics import registry
+from app.utils.v1.WarmUp import build_response_models, open_upstream_connections, ping_mongodb, warm_up
+
+# Routers versionados: nombre (para ENABLED_ROUTERS) -> (módulo, prefijo). Solo se
+# importan los routers habilitados, con sus schemas y dependencias.
+ROUTERS = {
+    "v1_sm": ("app.api.v1.Integration_SM.app", "/api/v1/sm"),
+    "v2_sm": ("app.api.v2.Integration_SM.app", "/api/v2/sm"),
+    "v3_sm": ("app.api.v3.Integration_SM.app", "/api/v3/sm"),
+    "v4_sm": ("app.api.v4.Integration_SM.app", "/api/v4/sm"),
+    "v5_sm": ("app.api.v5.Integration_SM.app", "/api/v5/sm"),
+    "v1_pasarela": ("app.api.v1.PasarelaPagoMS.app", "/api/v1/pasarela_pago_ms"),
+    "v2_pasarela": ("app.api.v2.PasarelaPagoMS.app", "/api/v2/pasarela_pago_ms"),
+}
+
+
+def enabled_routers(value: str | None) -> list[str]:
+    """
+    Routers a montar según `ENABLED_ROUTERS` (nombres separados por coma).
+
+    Args:
+        value (str | None): Valor de la configuración; vacío monta todos.
+
+    Returns:
+        list[str]: Nombres de `ROUTERS` en su orden de declaración.
+
+    Raises:
+        ValueError: Si algún nombre no corresponde a un router.
+    """
+    if not value or not value.strip():
+        return list(ROUTERS)
+    names = {name.strip() for name in value.split(",") if name.strip()}
+    unknown = names - ROUTERS.keys()
+    if unknown:
+        raise ValueError(f"ENABLED_ROUTERS inválido: {sorted(unknown)}. Opciones: {list(ROUTERS)}")
+    return [name for name in ROUTERS if name in names]
+
+
+# Métricas calculadas al momento del scrape a partir de los componentes del worker
+registry.callback(
+    "upstream_pool_connections", "Conexiones abiertas en el pool HTTP por host y estado",
+    ("host", "state"), http_pool.connection_stats,
+)
+registry.callback(
+    "circuit_breaker_open", "Circuit breaker abierto (1) o no (0) por upstream", ("upstream",),
+    lambda: {(name, ): float(state["state"] == "open") for name, state in circuit_breaker_states().items()},
+)
+registry.callback(
+    "response_cache_events_total", "Eventos de las cachés de respuestas (hits, misses, coalesced, bypasses, errors)",
+    ("cache", "event"),
+    lambda: {
+        (name, event): stats[event]
+        for name, stats in cache_stats().items()
+        for event in ("hits", "misses", "coalesced", "bypasses", "errors")
+    },
+    type="counter",
+)
+registry.callback(
+    "dependency_up", "Último sondeo de la dependencia: disponible (1) o no (0)", ("dependency",),
+    lambda: {
+        (name, ): float(result["state"] == UP)
+        for name, result in dependency_probes.results.items() if "checked_at" in result
+    },
+)
+registry.callback(
+    "coalesced_requests_total", "Peticiones idénticas que compartieron una llamada al upstream", ("endpoint",),
+    lambda: {(name, ): stats["shared"] for name, stats in coalescing_stats().items()},
+    type="counter",
+)
+
+
+async def _flush_metrics():
+    # Publica la instantánea de este worker para que /metrics sume todos los procesos
+    while True:
+        await anyio.sleep(METRICS_FLUSH_INTERVAL)
+        try:
+            await anyio.to_thread.run_sync(registry.write_snapshot)
+        except OSError as e:
+            logger.warning(f"No se pudo escribir la instantánea de métricas: {e}")
+
+
+def warm_up_steps(app: FastAPI) -> dict:
+    """Pasos del calentamiento del worker según la configuración y los routers montados."""
+    steps = {
+        "upstreams": open_upstream_connections,
+        "mongodb": ping_mongodb,
+        "response_models": lambda: build_response_models(app),
+    }
+    if WARMUP_TASA_BCV and "v1_pasarela" in enabled_routers(ENABLED_ROUTERS):
+        steps["tasa_bcv"] = startup_timings.import_module(ROUTERS["v1_pasarela"][0]).precargar_tasa_bcv
+    return steps
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Ciclo de vida del worker. La conexión a MongoDB (sink de logs) se abre aquí, fuera del
+    import, y en un hilo para no bloquear el event loop. Los clientes HTTP hacia los
+    upstreams se comparten durante toda la vida del worker (un pool por host) y se cierran
+    aquí al apagarlo. Con `WARMUP_ENABLED` el calentamiento corre en segundo plano y
+    `/health` responde 503 hasta que termina.
+    """
+    with startup_timings.step("mongodb_sink"):
+        await anyio.to_thread.run_sync(attach_mongodb_sink)
+    logger.info(f"Worker listo: {startup_timings.report()}")
+    async with anyio.create_task_group() as tg:
+        if registry.directory is not None:
+            tg.start_soon(_flush_metrics)
+        if PROBE_INTERVAL > 0:
+            tg.start_soon(dependency_probes.run)
+        if WARMUP_ENABLED:
+            warm_up.begin()
+            tg.start_soon(warm_up.run, warm_up_steps(app))
+        yield
+        tg.cancel_scope.cancel()
+    await http_pool.aclose()
+    logger.info("Clientes HTTP cerrados")
+    if registry.directory is not None:
+        await anyio.to_thread.run_sync(registry.write_snapshot)
+    await anyio.to_thread.run_sync(detach_mongodb_sink)
+
 
 app = FastAPI(
     title="Asistensi Integración Seguros Mercantil",  # The title of the API
     description="Asistensi Integración Seguros Mercantil",  # The description of the API
     version="0.1.0",  # The version of the API
     docs_url="/docs",  # The URL where the API documentation will be served
-    redoc_url=None  # The URL where the ReDoc documentation will be served. None means it will not be served
+    redoc_url=None,  # The URL where the ReDoc documentation will be served. None means it will not be served
+    lifespan=lifespan,  # Opens/closes shared resources (pooled HTTP clients) per worker
 )
 
 
@@ -34,15 +167,31 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 
     # Loggeamos los detalles del error en el servidor. ¡Esto es lo que necesitas!
     logger.error(f"Error de validación en la petición: {request.method} {request.url}")
-    logger.error(f"Payload recibido (cuerpo): {await request.body()}")
+    log_payload("Payload recibido (cuerpo)", await request.body(), level="ERROR")
     logger.error(f"Detalles del error de Pydantic: {error_details}")
 
     # Podemos incluso modificar la respuesta que se envía al cliente si quisiéramos.
     # Por ahora, simplemente replicaremos el comportamiento por defecto de FastAPI,
     # que es devolver los detalles del error.
+    # jsonable_encoder como el manejador por defecto: el `ctx` de los validadores propios
+    # trae la instancia de ValueError, que `json.dumps` no sabe serializar
     return JSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-        content={"detail": error_details},
+        content={"detail": jsonable_encoder(error_details)},
+    )
+
+
+@app.exception_handler(CircuitOpenError)
+async def circuit_open_exception_handler(request: Request, exc: CircuitOpenError):
+    """
+    El circuito del upstream está abierto: se responde 503 de inmediato en lugar de
+    esperar el timeout de un servicio que ya está fallando.
+    """
+    logger.warning(f"Circuito abierto para {exc.name}: {request.method} {request.url.path}")
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(max(1, round(exc.retry_after)))},
     )
 
 
@@ -52,17 +201,111 @@ async def health_check():
     Health check endpoint to verify the API is running.
 
     Returns:
-        dict: A dictionary with a status message.
+        dict: A dictionary with a status message; 503 `warming_up` while the worker warm-up
+            is still running.
     """
+    if not warm_up.ready:
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content={"status": "warming_up"})
     return {"status": "ok"}
 
 
-app.include_router(api_router_v1, prefix="/api/v1/sm")
-app.include_router(api_router_v2, prefix="/api/v2/sm")
-app.include_router(api_router_v3, prefix="/api/v3/sm")
-app.include_router(api_router_v4, prefix="/api/v4/sm")
-app.include_router(api_router_v5, prefix="/api/v5/sm")
-app.include_router(api_router_pasarela_ms_v1,prefix="/api/v1/pasarela_pago_ms")
-app.include_router(api_router_pasarela_ms_v2,prefix="/api/v2/pasarela_pago_ms")
+@app.get("/ready", tags=["Health"])
+async def readiness_check():
+    """
+    Readiness para el balanceador: el worker terminó el calentamiento y ninguna dependencia
+    crítica (Mongo si es el almacén de la caché, y los hosts de `PROBE_CRITICAL_HOSTS`) falló
+    en el último sondeo.
+    Solo lee el resultado del sondeo en segundo plano, nunca espera a una dependencia.
+
+    Returns:
+        dict: `ready`, o 503 `not_ready` con los motivos.
+    """
+    reasons = [f"{name}: down" for name in dependency_probes.failing()]
+    if not warm_up.ready:
+        reasons.insert(0, "warming_up")
+    if reasons:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content={"status": "not_ready", "reasons": reasons}
+        )
+    return {"status": "ready"}
+
+
+@app.get("/health/dependencies", tags=["Health"])
+async def dependencies_health():
+    """
+    Último sondeo de cada dependencia en este worker.
+
+    Returns:
+        dict: Estado (`up`, `down`, `unknown`), latencia en ms, antigüedad del sondeo en
+            segundos, error y si es crítica para `/ready`.
+    """
+    return dependency_probes.report()
+
+
+@app.get("/health/upstreams", tags=["Health"])
+async def upstreams_health():
+    """
+    Estado de los circuit breakers de los upstreams en este worker.
+
+    Returns:
+        dict: Estado, fallos consecutivos y llamadas rechazadas por upstream.
+    """
+    return circuit_breaker_states()
+
+
+@app.get("/health/caches", tags=["Health"])
+async def caches_health():
+    """
+    Contadores de las cachés de respuestas en este worker.
+
+    Returns:
+        dict: Aciertos, fallos, llamadas agrupadas y tamaño por caché.
+    """
+    return cache_stats()
+
+
+@app.get("/health/coalescing", tags=["Health"])
+async def coalescing_health():
+    """
+    Peticiones idénticas agrupadas por endpoint en este worker.
+
+    Returns:
+        dict: Ejecuciones reales (`leaders`) y peticiones que compartieron resultado (`shared`).
+    """
+    return coalescing_stats()
+
+
+@app.get("/metrics", tags=["Health"], response_class=PlainTextResponse)
+async def metrics():
+    """
+    Métricas en formato de texto de Prometheus: latencia por ruta y por upstream, códigos
+    HTTP y resultados de negocio de los upstreams, uso del pool y peticiones en curso.
+    Con `METRICS_DIR` se suman las instantáneas de todos los workers.
+
+    Returns:
+        PlainTextResponse: Exposición en formato 0.0.4.
+    """
+    content = await anyio.to_thread.run_sync(registry.render)
+    return PlainTextResponse(content, media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/health/startup", tags=["Health"])
+async def startup_health():
+    """
+    Tiempos de arranque de este worker.
+
+    Returns:
+        dict: Milisegundos y módulos cargados por cada router importado, duración de los
+            pasos de inicialización del lifespan y resultado de cada paso del calentamiento.
+    """
+    return {**startup_timings.report(), "warmup": warm_up.report()}
+
+
+for name in enabled_routers(ENABLED_ROUTERS):
+    module_name, prefix = ROUTERS[name]
+    router = startup_timings.import_module(module_name).router
+    app.include_router(router, prefix=prefix)
+    register_router_prefix(router, prefix)
 
-logger.info("API started")
+startup_timings.record("app.api.app", time.perf_counter() - _import_started)
+logger.info(f"API started: routers {enabled_routers(ENABLED_ROUTERS)}")
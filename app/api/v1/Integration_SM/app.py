@@ -1,5 +1,3 @@
-import json
-
 import httpx
 from fastapi import APIRouter, Depends, HTTPException, Security, status
 
@@ -15,8 +13,13 @@ from app.schemas.v1.Integration_SM.ResponseModelAPI import (AnexosConsultaRespon
                                                             CreadaPersonaResponse,
                                                             EmisionResponse)
 from app.middlewares.verify_api_key import APIKeyVerifier
-from app.utils.v1.AsyncHttpx import get_client, fetch_url
+from app.utils.v1.AsyncHttpx import fetch_url
+from app.utils.v1.FastJSON import trusted_response
+from app.utils.v1.UpstreamResponse import ERROR, FALLONEGOCIO, UpstreamResponse
 from app.utils.v1.ExternalApis import request_anular_poliza
+from app.utils.v1.CotizacionCache import invalidate_cotizacion
+from app.utils.v1.LookupCache import (cached_lookup, invalidate_persona, invalidate_poliza, invalidates,
+                                      persona_cache, persona_key, poliza_cache, poliza_key)
 from app.utils.v1.configs import API_KEY_AUTH, get_valid_api_keys
 from app.utils.v1.constants import (
     frecuencia_cuota,
@@ -34,13 +37,13 @@ from app.utils.v1.constants import (
     indAnulacion,
 )
 from app.utils.v2.LoggerSingletonDB import logger
+from app.utils.v1.PayloadLogging import log_payload, log_response
 from app.utils.v1.payload_templates import (payload_consultar_persona,
                                             payload_consultar_poliza,
                                             payload_cotizacion,
                                             payload_emitir_poliza,
                                             payload_inclusion_anexos_poliza,
                                             payload_persona)
-from app.utils.v2.SyncHttpx import sync_fetch_url
 
 router = APIRouter(
     tags=["MS Integration Version 1"],
@@ -54,6 +57,8 @@ api_key_verifier = APIKeyVerifier(get_valid_api_keys())
     status_code=status.HTTP_200_OK,
     summary="Consultar persona en Seguros Mercantil",
 )
+@trusted_response
+@cached_lookup(persona_cache, lambda request: persona_key(request.num_documento))
 async def consultar_persona(
     request: ConsultarPersonaBase,
     #client: httpx.AsyncClient = Depends(get_client),
@@ -79,16 +84,16 @@ async def consultar_persona(
 
     # Extrae el número de documento de la solicitud y determina el tipo de documento
     num_document = request.model_dump(exclude_unset=True)["num_documento"]
-    logger.info(f"data: {num_document}")
+    log_payload("data", num_document)
     # Determina el tipo de documento y ajusta el número de documento si es necesario
     tp_document = tipo_documento[num_document[0]]
     num_document = num_document[2:] if num_document[0] == "P" else num_document
 
     # Prepara el cuerpo de la solicitud para la API
-    body = payload_consultar_persona.copy()
+    body = payload_consultar_persona.build()
     body["persona"]["tp_documento"] = tp_document
     body["persona"]["nu_documento"] = num_document
-    logger.info(f"Payload: {body}")
+    log_payload("Payload", body)
 
 
 
@@ -99,18 +104,18 @@ async def consultar_persona(
             headers,
             body
         )
+    except httpx.TimeoutException as e:
+        logger.error(f"Tiempo de espera excedido: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_408_REQUEST_TIMEOUT,
+            detail="Tiempo de espera excedido",
+        )
     except httpx.RequestError as e:
         logger.error(f"Error en la solicitud: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error interno del servidor",
         )
-    except httpx.ReadTimeout as e:
-        logger.error(f"Tiempo de espera excedido: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_408_REQUEST_TIMEOUT,
-            detail="Tiempo de espera excedido",
-        )
     except httpx.HTTPError as e:
         logger.error(f"{e}")
         raise HTTPException(
@@ -119,27 +124,12 @@ async def consultar_persona(
         )
 
 
-    if response.status_code != 200:
-        # try:
-        #     detail = f"{response.json()['status']['code']} {response.json()['status']['descripcion']}"
-        # except KeyError:
-        detail = f"{response.text}"
-        logger.error(detail)
-        raise HTTPException(status_code=response.status_code,
-                            detail=detail)
-
-    if response.json()["status"]["code"] != "EXITO":
-        # try:
-        #     detail = f"{response.json()['status']['code']} {response.json()['status']['descripcion']}"
-        # except KeyError:
-        detail = f"{response.text}"
-        logger.error(detail)
-        raise HTTPException(status_code=response.status_code, detail=detail)
+    upstream = UpstreamResponse(response).ensure_success()
 
 
     # Convierte la respuesta en JSON
-    response_json = response.json()
-    logger.info(f"Response: {response_json}")
+    response_json = upstream.data
+    log_response("Response", response_json)
     persona = response_json.get("persona", [])
 
 
@@ -153,21 +143,20 @@ async def consultar_persona(
     status_code=status.HTTP_201_CREATED,
     summary="Crear persona en Seguros Mercantil",
 )
-def crear_persona(
+@invalidates(lambda request, result: invalidate_persona(request.persona.documento.nu_documento))
+async def crear_persona(
     request: CrearPersonaBase,
-    client: httpx.AsyncClient = Depends(get_client),
     api_key: str = Security(api_key_verifier),
 ) -> dict:
     """
     Args:
         request: The request payload containing the necessary information for creating a person.
-        client: An asynchronous HTTP client dependency for making external API requests.
         api_key: Security dependency for verifying the API key.
     """
     try:
         data = request.model_dump(exclude_unset=True)
-        logger.info(f"data: {data}")
-        body = payload_persona.copy()
+        log_payload("data", data)
+        body = payload_persona.build()
         nu_documento = (
             data["persona"]["documento"]["nu_documento"][2:]
             if data["persona"]["documento"]["nu_documento"][0] == "P"
@@ -206,24 +195,24 @@ def crear_persona(
 
 
     try:
-        response = sync_fetch_url(
+        response = await fetch_url(
             "POST",
             url_crear_persona,
             headers,
             body
         )
+    except httpx.TimeoutException as e:
+        logger.error(f"Tiempo de espera excedido: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_408_REQUEST_TIMEOUT,
+            detail="Tiempo de espera excedido",
+        )
     except httpx.RequestError as e:
         logger.error(f"Error en la solicitud: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error interno del servidor",
         )
-    except httpx.ReadTimeout as e:
-        logger.error(f"Tiempo de espera excedido: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_408_REQUEST_TIMEOUT,
-            detail="Tiempo de espera excedido",
-        )
     except httpx.HTTPError as e:
         logger.error(f"{e}")
         raise HTTPException(
@@ -231,24 +220,12 @@ def crear_persona(
             detail=f"{e}",
         )
 
-    if response.status_code != 200:
-
-        detail = f"{response.text}"
-        logger.error(detail)
-        raise HTTPException(status_code=response.status_code,
-                            detail=detail)
-
-    if response.json()["status"]["code"] != "EXITO":
-
-        detail = f"{response.text}"
-        logger.error(detail)
-        raise HTTPException(status_code=response.status_code,
-                            detail=detail)
+    upstream = UpstreamResponse(response).ensure_success()
 
 
     # convertir response to JSON
-    response_json = response.json()
-    logger.info(f"Response: {response_json}")
+    response_json = upstream.data
+    log_response("Response", response_json)
     # verificar si el request fue exitoso
 
     return response_json["persona"][0]
@@ -263,19 +240,17 @@ def crear_persona(
 )
 async def crear_cotizacion(
     request: CrearPolizaBase,
-    client: httpx.AsyncClient = Depends(get_client),
     api_key: str = Security(api_key_verifier),
 ) -> dict:
     """
     Args:
         request: The request object containing the input data for creating a policy quote.
-        client: An asynchronous HTTP client used to make API calls.
         api_key: Security dependency for verifying the API key.
 
     """
     try:
         data = request.model_dump(exclude_unset=True)
-        logger.info(f"data: {data}")
+        log_payload("data", data)
         fecha_nacimiento = data["persona"]["fecha_nacimiento"]
         suma_poliza = (
             data["poliza"]["suma_asegurada"]
@@ -295,7 +270,7 @@ async def crear_cotizacion(
             f"{data['persona']['nm_primer_nombre']} {data['persona']['nm_primer_apellido']}"
         )
 
-        body = payload_cotizacion.copy()
+        body = payload_cotizacion.build()
         body["coll_bienes"]["bienes"][0]["de_bien"] = fullname
 
         body["coll_generales"]["generales"][0]["fe_desde"] = fe_desde
@@ -325,25 +300,25 @@ async def crear_cotizacion(
         )
 
     try:
-        logger.info(f"Payload: {json.dumps(body)}")
+        log_payload("Payload", body)
         response = await fetch_url(
             "POST",
             url_crear_cotizacion,
             headers,
             body
         )
+    except httpx.TimeoutException as e:
+        logger.error(f"Tiempo de espera excedido: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_408_REQUEST_TIMEOUT,
+            detail="Tiempo de espera excedido",
+        )
     except httpx.RequestError as e:
         logger.error(f"Error en la solicitud: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error interno del servidor",
         )
-    except httpx.ReadTimeout as e:
-        logger.error(f"Tiempo de espera excedido: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_408_REQUEST_TIMEOUT,
-            detail="Tiempo de espera excedido",
-        )
     except httpx.HTTPError as e:
         logger.error(f"{e}")
         raise HTTPException(
@@ -351,31 +326,16 @@ async def crear_cotizacion(
             detail=f"{e}",
         )
 
-    if response.status_code != 200:
-        try:
-            detail = f"{response.json()['status']['code']} {response.json()['status']['descripcion']}"
-        except KeyError:
-            detail = f"{response.text}"
-        logger.error(detail)
-        raise HTTPException(status_code=response.status_code,
-                            detail=detail)
-
-    if response.json()["status"]["code"] != "EXITO":
-        try:
-            detail = f"{response.json()['status']['code']} {response.json()['status']['descripcion']}"
-        except KeyError:
-            detail = f"{response.text}"
-        logger.error(detail)
-        raise HTTPException(status_code=response.status_code,
-                            detail=detail)
+    # Este endpoint siempre respondió "<code> <descripcion>" en lugar del cuerpo del upstream
+    upstream = UpstreamResponse(response).ensure_success(status_detail=True)
 
 
 
 
 
     # convertir response to JSON
-    response_json = response.json()
-    logger.info(f"Response: {response_json}")
+    response_json = upstream.data
+    log_response("Response", response_json)
     return response_json["cotizacion"]
 
 
@@ -385,21 +345,23 @@ async def crear_cotizacion(
     status_code=status.HTTP_201_CREATED,
     summary="Emitir poliza de persona en Seguros Mercantil",
 )
+@invalidates(
+    lambda request, result: invalidate_poliza(result["cd_entidad"], result["cd_area"], result["nu_poliza"]),
+    lambda request, result: invalidate_cotizacion(request.nu_cotizacion),
+)
 async def emitir_poliza(
     request: EmitirPolizaBase,
-    client: httpx.AsyncClient = Depends(get_client),
     api_key: str = Security(api_key_verifier),
 ) -> dict:
     """
     Args:
         request: Contiene los datos de la solicitud para emitir la póliza.
-        client: Cliente HTTP asincrónico utilizado para hacer solicitudes.
         api_key: Clave de API utilizada para la verificación de seguridad.
     """
     try:
         data = request.model_dump(exclude_unset=True)
-        logger.info(f"data: {data}")
-        body = payload_emitir_poliza.copy()
+        log_payload("data", data)
+        body = payload_emitir_poliza.build()
         body["coll_generales"]["generales"][0]["cd_entidad"] = data["cd_entidad"]
         body["coll_generales"]["generales"][0]["nu_cotizacion"] = data["nu_cotizacion"]
 
@@ -411,7 +373,7 @@ async def emitir_poliza(
         )
 
     try:
-        logger.info(f"Payload: {json.dumps(body)}")
+        log_payload("Payload", body)
         response = await fetch_url(
             "POST",
             url_emitir_poliza,
@@ -419,18 +381,18 @@ async def emitir_poliza(
             body
         )
 
+    except httpx.TimeoutException as e:
+        logger.error(f"Tiempo de espera excedido: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_408_REQUEST_TIMEOUT,
+            detail="Tiempo de espera excedido",
+        )
     except httpx.RequestError as e:
         logger.error(f"Error en la solicitud: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error interno del servidor",
         )
-    except httpx.ReadTimeout as e:
-        logger.error(f"Tiempo de espera excedido: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_408_REQUEST_TIMEOUT,
-            detail="Tiempo de espera excedido",
-        )
     except httpx.HTTPError as e:
         logger.error(f"{e}")
         raise HTTPException(
@@ -438,23 +400,11 @@ async def emitir_poliza(
             detail=f"{e}",
         )
 
-    if response.status_code != 200:
-
-        detail = f"{response.text}"
-        logger.error(detail)
-        raise HTTPException(status_code=response.status_code,
-                            detail=detail)
-
-    if response.json()["status"]["code"] != "EXITO":
-
-        detail = f"{response.text}"
-        logger.error(detail)
-        raise HTTPException(status_code=response.status_code,
-                            detail=detail)
+    upstream = UpstreamResponse(response).ensure_success()
 
 
-    response_json = response.json()
-    logger.info(f"Response: {response_json}")
+    response_json = upstream.data
+    log_response("Response", response_json)
 
 
     return response_json["emision"]
@@ -467,26 +417,26 @@ async def emitir_poliza(
     status_code=status.HTTP_200_OK,
     summary="Consultar poliza de persona en Seguros Mercantil",
 )
+@trusted_response
+@cached_lookup(poliza_cache, lambda request: poliza_key("poliza", request))
 async def consultar_poliza(
     request: ConsultarPolizaBase,
-    client: httpx.AsyncClient = Depends(get_client),
     api_key: str = Security(api_key_verifier),
 ) -> dict:
     """
     Args:
         request: An instance of ConsultarPolizaBase, representing the body of the request to get the policy details.
-        client: An asynchronous HTTP client dependency, provided by FastAPI's Depends function.
         api_key: A security dependency to verify the API key, provided by FastAPI's Security function.
     """
     try:
         data = request.model_dump(exclude_unset=True)
-        logger.info(f"data: {data}")
-        body = payload_consultar_poliza.copy()
+        log_payload("data", data)
+        body = payload_consultar_poliza.build()
         body["polizas-recibos"][0]["cd_entidad"] = data["cd_entidad"]
         body["polizas-recibos"][0]["cd_area"] = data["cd_area"]
         body["polizas-recibos"][0]["poliza"] = data["poliza"]
         body["polizas-recibos"][0]["certificado"] = data["certificado"]
-        logger.info(f"antes: {body}")
+        log_payload("antes", body)
         try:
             del body["polizas-recibos"][0]["nu_recibo"]
         except KeyError:
@@ -494,7 +444,7 @@ async def consultar_poliza(
 
         if "nu_recibo" in data.keys():
             body["polizas-recibos"][0]["nu_recibo"] = data["nu_recibo"]
-        logger.info(f"depues: {body}")
+        log_payload("depues", body)
 
     except Exception as e:
         logger.error(f"{e}")
@@ -504,7 +454,7 @@ async def consultar_poliza(
         )
 
     try:
-        logger.info(f"Payload:{body}")
+        log_payload("Payload", body)
         response = await fetch_url(
             "POST",
             url_consultar_poliza,
@@ -513,18 +463,18 @@ async def consultar_poliza(
         )
 
 
+    except httpx.TimeoutException as e:
+        logger.error(f"Tiempo de espera excedido: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_408_REQUEST_TIMEOUT,
+            detail="Tiempo de espera excedido",
+        )
     except httpx.RequestError as e:
         logger.error(f"Error en la solicitud: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error interno del servidor",
         )
-    except httpx.ReadTimeout as e:
-        logger.error(f"Tiempo de espera excedido: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_408_REQUEST_TIMEOUT,
-            detail="Tiempo de espera excedido",
-        )
     except httpx.HTTPError as e:
         logger.error(f"{e}")
         raise HTTPException(
@@ -533,32 +483,17 @@ async def consultar_poliza(
         )
 
     # verificar si el request fue exitoso
-    if response.status_code != 200:
-
-        detail = f"{response.text}"
-        logger.error(detail)
-        raise HTTPException(status_code=response.status_code,
-                            detail=detail)
-
-    if response.json()["status"]["code"] != "EXITO":
+    upstream = UpstreamResponse(response).ensure_success()
 
-        detail = f"{response.text}"
-        logger.error(detail)
-        raise HTTPException(status_code=response.status_code,
-                            detail=detail)
-
-    elif response.json()["status"]["code"] == "EXITO" and response.json()["status"]['descripcion'] == 'No se ha encontrado informacion para los criterios de busqueda indicados.':
-        try:
-            detail = f"{response.json()['status']['code']} {response.json()['status']['descripcion']}"
-        except KeyError:
-            detail = f"{response.text}"
+    if upstream.descripcion == 'No se ha encontrado informacion para los criterios de busqueda indicados.':
+        detail = f"{upstream.code} {upstream.descripcion}"
         logger.error(detail)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail=detail)
 
 
-    response_json = response.json()
-    logger.info(f"Response: {response_json}")
+    response_json = upstream.data
+    log_response("Response", response_json)
     return response_json
 
 
@@ -569,22 +504,21 @@ async def consultar_poliza(
     status_code=status.HTTP_200_OK,
     summary="Incluir anexo poliza en Seguros Mercantil",
 )
+@invalidates(lambda request, result: invalidate_poliza(request.cd_entidad, request.cd_area, request.nu_poliza))
 async def incluir_anexo(
     request: InclusionAnexosPolizaBase,
-    client: httpx.AsyncClient = Depends(get_client),
     api_key: str = Security(api_key_verifier),
 ) -> dict:
     """
     Args:
         request: Instance of InclusionAnexosPolizaBase containing the request data.
-        client: An httpx.AsyncClient instance for making HTTP requests.
         api_key: A string representing the security API key.
     """
     try:
         data = request.model_dump(exclude_unset=True)
-        logger.info(f"data: {data}")
+        log_payload("data", data)
         name = f"{data['nm_primer_nombre']} {data['nm_primer_apellido']}"
-        body = payload_inclusion_anexos_poliza.copy()
+        body = payload_inclusion_anexos_poliza.build()
         body["cd_entidad"] = data["cd_entidad"]
         body["cd_area"] = data["cd_area"]
         body["nu_poliza"] = data["nu_poliza"]
@@ -618,18 +552,18 @@ async def incluir_anexo(
 
         # convertir response to JSON
 
+    except httpx.TimeoutException as e:
+        logger.error(f"Tiempo de espera excedido: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_408_REQUEST_TIMEOUT,
+            detail="Tiempo de espera excedido",
+        )
     except httpx.RequestError as e:
         logger.error(f"Error en la solicitud: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error interno del servidor",
         )
-    except httpx.ReadTimeout as e:
-        logger.error(f"Tiempo de espera excedido: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_408_REQUEST_TIMEOUT,
-            detail="Tiempo de espera excedido",
-        )
     except httpx.HTTPError as e:
         logger.error(f"{e}")
         raise HTTPException(
@@ -638,24 +572,12 @@ async def incluir_anexo(
         )
 
     # verificar si el request fue exitoso
-    if response.status_code != 200:
-
-        detail = f"{response.text}"
-        logger.error(detail)
-        raise HTTPException(status_code=response.status_code,
-                            detail=detail)
-
-    if response.json()["status"]["code"] != "EXITO":
+    upstream = UpstreamResponse(response).ensure_success()
 
-        detail = f"{response.text}"
-        logger.error(detail)
-        raise HTTPException(status_code=response.status_code,
-                            detail=detail)
 
 
-
-    response_json = response.json()
-    logger.info(f"Response: {response_json}")
+    response_json = upstream.data
+    log_response("Response", response_json)
     return {"anexo": response_json["anexo"]}
 
 
@@ -666,15 +588,15 @@ async def incluir_anexo(
     status_code=status.HTTP_200_OK,
     summary="Consultar recibos de una poliza de persona en Seguros Mercantil",
 )
+@trusted_response
+@cached_lookup(poliza_cache, lambda request: poliza_key("recibos", request))
 async def consultar_recibos(
     request: ConsultarRecibosPolizaBase,
-    client: httpx.AsyncClient = Depends(get_client),
     api_key: str = Security(api_key_verifier),
 ) -> dict:
     """
     Args:
         request: An instance of ConsultarRecibosPolizaBase containing the request data for retrieving policy receipts.
-        client: An instance of httpx.AsyncClient which is used to make HTTP requests.
         api_key: A string representing the API key, verified through Security.
 
     Returns:
@@ -686,8 +608,8 @@ async def consultar_recibos(
     """
     try:
         data = request.model_dump(exclude_unset=True)
-        logger.info(f"Data: {data}")
-        body = payload_consultar_poliza.copy()
+        log_payload("Data", data)
+        body = payload_consultar_poliza.build()
         body["polizas-recibos"][0]["cd_entidad"] = data["cd_entidad"]
         body["polizas-recibos"][0]["cd_area"] = data["cd_area"]
         body["polizas-recibos"][0]["poliza"] = data["poliza"]
@@ -709,22 +631,18 @@ async def consultar_recibos(
             headers,
             body
         )
-
-        # convertir response to JSON
-        response_json = json.loads(response.content)
-        logger.info(f"Response: {response_json}")
+    except httpx.TimeoutException as e:
+        logger.error(f"Tiempo de espera excedido: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_408_REQUEST_TIMEOUT,
+            detail="Tiempo de espera excedido",
+        )
     except httpx.RequestError as e:
         logger.error(f"Error en la solicitud: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error interno del servidor",
         )
-    except httpx.ReadTimeout as e:
-        logger.error(f"Tiempo de espera excedido: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_408_REQUEST_TIMEOUT,
-            detail="Tiempo de espera excedido",
-        )
     except httpx.HTTPError as e:
         logger.error(f"{e}")
         raise HTTPException(
@@ -733,49 +651,38 @@ async def consultar_recibos(
         )
 
     # verificar si el request fue exitoso
-    if response.status_code != 200:
-
-        detail = f"{response.text}"
-
-        logger.error(detail)
-        raise HTTPException(status_code=response.status_code,
-                            detail=detail)
+    upstream = UpstreamResponse(response).ensure_success()
+    log_response("Response", upstream.data)
 
-    if response.json()["status"]["code"] != "EXITO":
-
-        detail = f"{response.text}"
-        logger.error(detail)
-        raise HTTPException(status_code=response.status_code,
-                            detail=detail)
-
-
-
-    polizas = response_json.get("polizas", [])
+    polizas = upstream.get("polizas", [])
     return {"polizas": polizas}
 
 
 @router.post("/anular_poliza")
-def anular_poliza(requests: RequestAnularPolizaBase, api_key: str = Security(api_key_verifier)) -> dict:
+@invalidates(
+    lambda requests, result: invalidate_poliza(requests.cdEntidad, requests.cdArea, requests.nuPoliza, requests.nuCertificado),
+    param="requests",
+)
+async def anular_poliza(requests: RequestAnularPolizaBase, api_key: str = Security(api_key_verifier)) -> dict:
     data = requests.model_dump(exclude_unset=True)
     payload = data.copy()
     payload["cdPersonaContratante"] = cdPersonaContratante
     payload["indAnulacion"] = indAnulacion
-    logger.info(f"{payload}")
-    logger.info(f"x-api-key: {headers_anular_poliza['x-api-key']}")
-    logger.info(f"headers: {headers_anular_poliza}")
+    log_payload("Payload", payload)
+    log_payload("headers", headers_anular_poliza)
     logger.info(f"URL: {url_anular_poliza}")
     try:
-        resp_poliza_anulada = request_anular_poliza(url_anular_poliza,payload,headers_anular_poliza)
+        resp_poliza_anulada = await request_anular_poliza(url_anular_poliza,payload,headers_anular_poliza)
         status_code = resp_poliza_anulada.status_code
         message = resp_poliza_anulada.message
         description = resp_poliza_anulada.descripcion
         code = resp_poliza_anulada.code
         detail = f"{description},{message}"
 
-        if code == "FALLONEGOCIO":
+        if code == FALLONEGOCIO:
             logger.warning(f"Error: descipcion:{description}, message:{message}")
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
-        if code == "ERROR":
+        if code == ERROR:
             logger.error(f"Error: descipcion:{description}")
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=detail)
         if status_code == 500:
@@ -783,18 +690,18 @@ def anular_poliza(requests: RequestAnularPolizaBase, api_key: str = Security(api
 
         return {"message": message}
 
+    except httpx.TimeoutException as e:
+        logger.error(f"Tiempo de espera excedido: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_408_REQUEST_TIMEOUT,
+            detail="Tiempo de espera excedido",
+        )
     except httpx.RequestError as e:
         logger.error(f"Error en la solicitud: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error interno del servidor",
         )
-    except httpx.ReadTimeout as e:
-        logger.error(f"Tiempo de espera excedido: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_408_REQUEST_TIMEOUT,
-            detail="Tiempo de espera excedido",
-        )
     except httpx.HTTPError as e:
         logger.error(f"{e}")
         raise HTTPException(
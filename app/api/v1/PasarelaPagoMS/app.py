@@ -1,4 +1,3 @@
-import json
 from typing import Dict
 
 import httpx
@@ -12,7 +11,7 @@ from app.schemas.v1.PasarelaPagoMS.ModelAPI import (
 )
 from app.schemas.v1.PasarelaPagoMS.ResponseModelAPI import ResponseTasaBCV
 
-from app.utils.v1.configs import API_KEY_AUTH, MID, MOCKUP, get_valid_api_keys
+from app.utils.v1.configs import API_KEY_AUTH, MID, MOCKUP, TASA_BCV_CACHE_TTL, get_valid_api_keys
 from app.utils.v1.constants import (
     url_registrar_pago,
     headers_pasarela_ms,
@@ -21,8 +20,14 @@ from app.utils.v1.constants import (
     url_suscripcion_tasa_bcv,
     url_notificacion_pago,
     headers_notificacion_pago_ms,
+    VET,
 )
 from app.utils.v2.LoggerSingletonDB import logger
+from app.utils.v1.PayloadLogging import log_payload, log_response
+from app.utils.v1.AsyncHttpx import fetch_url
+from app.utils.v1.UpstreamResponse import UpstreamResponse
+from app.utils.v1.LookupCache import invalidate_poliza, invalidates
+from app.utils.v1.ResponseCache import ResponseCache, register_cache, shared_backend
 from app.utils.v1.messages_error import (
     INTERNAL_ERROR,
     TIMEOUT_ERROR,
@@ -40,6 +45,25 @@ router = APIRouter(
 
 api_key_verifier = APIKeyVerifier(get_valid_api_keys())
 
+# La tasa de una fecha pasada ya no cambia; solo la del día en curso puede actualizarse
+tasa_bcv_cache = register_cache(
+    ResponseCache("tasa_bcv", maxsize=512, shared=shared_backend("tasa_bcv"))
+)
+
+
+def tasa_bcv_ttl(fe_tasa: str) -> float | None:
+    """
+    Vigencia en caché de la tasa para `fe_tasa` (dd/mm/yyyy).
+
+    Returns:
+        float | None: `None` (no expira) para fechas pasadas; `TASA_BCV_CACHE_TTL`
+        segundos para hoy o fechas futuras.
+    """
+    fecha = datetime.strptime(fe_tasa, "%d/%m/%Y").date()
+    if fecha < datetime.now(VET).date():
+        return None
+    return TASA_BCV_CACHE_TTL
+
 
 
 
@@ -49,7 +73,13 @@ api_key_verifier = APIKeyVerifier(get_valid_api_keys())
     status_code=status.HTTP_200_OK,
     summary="Registrar Pago Pasarela MS",
 )
-def registrar_pago(
+@invalidates(lambda request, result: invalidate_poliza(
+    request.recibo_poliza_pago.cd_entidad,
+    request.recibo_poliza_pago.cd_area,
+    request.recibo_poliza_pago.nu_poliza,
+    request.recibo_poliza_pago.nu_certificado,
+))
+async def registrar_pago(
     request: RegistroPagoBase,
     api_key: str = Security(api_key_verifier),
 ):
@@ -74,7 +104,7 @@ def registrar_pago(
             and with other statuses and messages specific to the payment gateway response.
     """
     data = request.model_dump()
-    logger.info(f"Data: {data}")
+    log_payload("Data", data)
 
 
     recibo_poliza_pago = data.get("recibo_poliza_pago")
@@ -118,49 +148,56 @@ def registrar_pago(
                         detail=f"Error tipo de instrumento de pago: {tipo_instrumento_pago}",
                     )
 
-    logger.info(f"Recibo poliza pago:{recibo_poliza_pago}")
+    log_payload("Recibo poliza pago", recibo_poliza_pago)
     logger.info(f"Moneda: {moneda_pago}")
     logger.info(f"Tipo de instrumento de pago:{tipo_instrumento_pago}")
-    logger.info(f"Instrumento de pago: {instrumento}")
-    payload_pasarela_pago["datos"]["poliza_recibo_cuota"] = [recibo_poliza_pago]
-    payload_pasarela_pago["datos"]["tipo_instrumento_pago"] = tipo_instrumento_pago
-    payload_pasarela_pago["datos"]["moneda_pago"] = moneda_pago
+    log_payload("Instrumento de pago", instrumento)
+    payload = payload_pasarela_pago.build()
+    payload["datos"]["poliza_recibo_cuota"] = [recibo_poliza_pago]
+    payload["datos"]["tipo_instrumento_pago"] = tipo_instrumento_pago
+    payload["datos"]["moneda_pago"] = moneda_pago
     match tipo_instrumento_pago:
         case "TDD":
             tipo_instrumento = "instrumento_tdd"
-            if "instrumento_tdc" in payload_pasarela_pago["datos"].keys():
-                del payload_pasarela_pago["datos"]["instrumento_tdc"]
-            if "instrumento_c2p" in payload_pasarela_pago["datos"].keys():
-                del payload_pasarela_pago["datos"]["instrumento_c2p"]
+            if "instrumento_tdc" in payload["datos"].keys():
+                del payload["datos"]["instrumento_tdc"]
+            if "instrumento_c2p" in payload["datos"].keys():
+                del payload["datos"]["instrumento_c2p"]
         case "C2P":
             tipo_instrumento = "instrumento_c2p"
-            if "instrumento_tdc" in payload_pasarela_pago["datos"].keys():
-                del payload_pasarela_pago["datos"]["instrumento_tdc"]
-            if "instrumento_tdd" in payload_pasarela_pago["datos"].keys():
-                del payload_pasarela_pago["datos"]["instrumento_tdd"]
+            if "instrumento_tdc" in payload["datos"].keys():
+                del payload["datos"]["instrumento_tdc"]
+            if "instrumento_tdd" in payload["datos"].keys():
+                del payload["datos"]["instrumento_tdd"]
         case "TDC":
             tipo_instrumento = "instrumento_tdc"
-            if "instrumento_tdd" in payload_pasarela_pago["datos"].keys():
-                del payload_pasarela_pago["datos"]["instrumento_tdd"]
-            if "instrumento_c2p" in payload_pasarela_pago["datos"].keys():
-                del payload_pasarela_pago["datos"]["instrumento_c2p"]
+            if "instrumento_tdd" in payload["datos"].keys():
+                del payload["datos"]["instrumento_tdd"]
+            if "instrumento_c2p" in payload["datos"].keys():
+                del payload["datos"]["instrumento_c2p"]
         case _:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,detail=TIPO_INSTRUMENTO_ERROR)
 
-    payload_pasarela_pago["datos"][tipo_instrumento] = instrumento
+    payload["datos"][tipo_instrumento] = instrumento
 
 
 
     try:
         # logger.info(f"URL:{url_registrar_pago}")
         # logger.info(f"HEADER: {headers_pasarela_ms}")
-        logger.info(f"Payload: {json.dumps(payload_pasarela_pago)}")
-        http_client = httpx.Client(verify=False)
-        response = http_client.post(
+        log_payload("Payload", payload)
+        response = await fetch_url(
+            "POST",
             url_registrar_pago,
-            headers=headers_pasarela_ms,
-            json=payload_pasarela_pago,
-            timeout=None
+            headers_pasarela_ms,
+            payload,
+            verify=False
+        )
+    except httpx.TimeoutException as e:
+        logger.error(f"Tiempo de espera excedido: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_408_REQUEST_TIMEOUT,
+            detail=TIMEOUT_ERROR,
         )
     except httpx.RequestError as e:
         logger.error(f"Error en la solicitud: {e}")
@@ -168,12 +205,6 @@ def registrar_pago(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=INTERNAL_ERROR,
         )
-    except httpx.ReadTimeout as e:
-        logger.error(f"Tiempo de espera excedido: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_408_REQUEST_TIMEOUT,
-            detail=TIMEOUT_ERROR,
-        )
     except httpx.HTTPError as e:
         logger.error(f"{e}")
         raise HTTPException(
@@ -183,24 +214,13 @@ def registrar_pago(
 
 
 
-    if response.status_code != 200:
-        logger.error(f"{response.text}")
-        detail = f"{response.text}"
-        raise HTTPException(status_code=response.status_code,
-                            detail=detail)
-
-    if response.json()["status"]["code"] != "EXITO":
-
-        logger.error(f"{response.text}")
-        detail = f"{response.text}"
-        raise HTTPException(status_code=response.status_code,
-                            detail=detail)
+    upstream = UpstreamResponse(response).ensure_success()
 
 
     # # Convierte la respuesta en JSON
-    response_json = response.json()
+    response_json = upstream.data
     result = response_json.get("datos")
-    logger.info(json.dumps(result))
+    log_response("Response", result)
     return result
 
 
@@ -212,7 +232,7 @@ def registrar_pago(
     status_code=status.HTTP_200_OK,
     summary="Generar OTP Banco Mercantil",
 )
-def otp_mbu(
+async def otp_mbu(
     request: OtpMbuBase,
     #client: httpx.AsyncClient = Depends(get_client),
     api_key: str = Security(api_key_verifier),
@@ -243,11 +263,11 @@ def otp_mbu(
             metadata like processing time and expiration information.
     """
     data = request.model_dump()
-    logger.info(f"Data: {data}")
+    log_payload("Data", data)
     tipo_instrumento = data.get("tipo_instrumento").value
 
     instrumento = data.get("instrumento")
-    payload = payload_pasarela_otp.copy()
+    payload = payload_pasarela_otp.build()
     payload["datos"]["tipo_instrumento_pago"] = tipo_instrumento
 
     match tipo_instrumento:
@@ -268,7 +288,7 @@ def otp_mbu(
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,detail=TIPO_INSTRUMENTO_ERROR)
 
 
-    logger.info(f"Payload: {json.dumps(payload)}")
+    log_payload("Payload", payload)
 
     if MOCKUP:
         # Mockup es  true.
@@ -283,13 +303,19 @@ def otp_mbu(
     try:
         # logger.info(f"URL: {url_otp_mbu}")
         # logger.info(f"Headers: {headers_pasarela_ms}")
-        logger.info(f"Payload: {json.dumps(payload)}")
-        http_client = httpx.Client(verify=False)
-        response = http_client.post(
+        log_payload("Payload", payload)
+        response = await fetch_url(
+            "POST",
             url_otp_mbu,
-            headers=headers_pasarela_ms,
-            json=payload,
-            timeout=None
+            headers_pasarela_ms,
+            payload,
+            verify=False
+        )
+    except httpx.TimeoutException as e:
+        logger.error(f"Tiempo de espera excedido: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_408_REQUEST_TIMEOUT,
+            detail=TIMEOUT_ERROR,
         )
     except httpx.RequestError as e:
         logger.error(f"Error en la solicitud: {e}")
@@ -298,12 +324,6 @@ def otp_mbu(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=INTERNAL_ERROR,
         )
-    except httpx.ReadTimeout as e:
-        logger.error(f"Tiempo de espera excedido: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_408_REQUEST_TIMEOUT,
-            detail=TIMEOUT_ERROR,
-        )
     except httpx.HTTPError as e:
         logger.error(f"{e}")
         raise HTTPException(
@@ -312,27 +332,71 @@ def otp_mbu(
         )
 
 
-    if response.status_code != 200:
-        logger.error(f"{response.text}")
-        detail = f"{response.text}"
-        raise HTTPException(status_code=response.status_code,
-                            detail=detail)
+    resp = UpstreamResponse(response).ensure_success(failure_status=status.HTTP_400_BAD_REQUEST).data
 
-    resp = response.json()
+    log_response("Response", resp)
+    return resp["datos"]
 
-    if resp["status"]["code"] != "EXITO":
 
 
-        detail = f"{response.text}"
-        logger.error(detail)
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
-                            detail=detail)
 
-    logger.info(f"Response: {resp}")
-    return resp["datos"]
 
+async def _consultar_tasa_bcv(fe_tasa: str) -> dict:
+    """
+    Consulta la tasa BCV de `fe_tasa` al servicio de suscripción (sin caché).
+
+    Raises:
+        HTTPException: Si la llamada falla o la respuesta no es exitosa.
+    """
+    payload = payload_tasa_bcv.build()
+
+    payload["tasa"]["fe_tasa"] = fe_tasa
+
+    # logger.info(f"Header:{headers_suscripcion_ms}")
+    # logger.info(f"URL: {url_suscripcion_tasa_bcv}")
+    log_payload("Payload", payload)
+
+    try:
+        response = await fetch_url(
+            "POST",
+            url_suscripcion_tasa_bcv,
+            headers_suscripcion_ms,
+            payload,
+            verify=False
+        )
+    except httpx.TimeoutException as e:
+        logger.error(f"Tiempo de espera excedido: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_408_REQUEST_TIMEOUT,
+            detail=TIMEOUT_ERROR,
+        )
+    except httpx.RequestError as e:
+        logger.error(f"Error en la solicitud: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=INTERNAL_ERROR,
+        )
+    except httpx.HTTPError as e:
+        logger.error(f"{e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"{e}",
+        )
+
+    resp = UpstreamResponse(response).ensure_success(failure_status=status.HTTP_400_BAD_REQUEST).data
 
+    return resp["tasa"][0]
+
+
+async def precargar_tasa_bcv() -> dict:
+    """
+    Carga en la caché la tasa BCV del día (paso opcional del calentamiento del worker).
 
+    Returns:
+        dict: Tasa del día.
+    """
+    hoy = datetime.now(VET).strftime("%d/%m/%Y")
+    return await tasa_bcv_cache.get_or_load(hoy, lambda: _consultar_tasa_bcv(hoy), ttl=tasa_bcv_ttl(hoy))
 
 
 @router.post(
@@ -341,7 +405,7 @@ def otp_mbu(
     status_code=status.HTTP_200_OK,
     summary="Consulta Tasa BCV",
 )
-def consulta_tasa_bcv(
+async def consulta_tasa_bcv(
     request: TasaBCVBase,
     #client: httpx.AsyncClient = Depends(get_client),
     api_key: str = Security(api_key_verifier),
@@ -353,6 +417,9 @@ def consulta_tasa_bcv(
     steps, including payload details and error scenarios, while ensuring proper exception
     handling for request failures or server errors.
 
+    The rate is cached per `fe_tasa`: past dates never expire and today's rate is kept for
+    `TASA_BCV_CACHE_TTL` seconds. Concurrent misses for the same date share one upstream call.
+
     Args:
         request (TasaBCVBase): The request object containing the data required for the
             BCV exchange rate query, such as the 'fe_tasa' field.
@@ -371,62 +438,15 @@ def consulta_tasa_bcv(
             - The response status code is not 200.
     """
     data = request.model_dump()
-    logger.info(f"Data: {data}")
-    payload = payload_tasa_bcv.copy()
+    log_payload("Data", data)
 
-    payload["tasa"]["fe_tasa"] = data["fe_tasa"]
-
-    # logger.info(f"Header:{headers_suscripcion_ms}")
-    # logger.info(f"URL: {url_suscripcion_tasa_bcv}")
-    logger.info(f"Payload: {payload}")
-
-    try:
-        http_client = httpx.Client(verify=False)
-        response = http_client.post(
-            url_suscripcion_tasa_bcv,
-            headers=headers_suscripcion_ms,
-            json=payload,
-            timeout=None
-        )
-    except httpx.RequestError as e:
-        logger.error(f"Error en la solicitud: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=INTERNAL_ERROR,
-        )
-    except httpx.ReadTimeout as e:
-        logger.error(f"Tiempo de espera excedido: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_408_REQUEST_TIMEOUT,
-            detail=TIMEOUT_ERROR,
-        )
-    except httpx.HTTPError as e:
-        logger.error(f"{e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"{e}",
-        )
-
-    if response.status_code != 200:
-        logger.error(f"{response.text}")
-        try:
-            detail = f"{response.json()['status']['code']} {response.json()['status']['descripcion']}"
-        except KeyError:
-            detail = f"{response.text}"
-        raise HTTPException(status_code=response.status_code,
-                            detail=detail)
-
-    resp = response.json()
-
-    if resp["status"]["code"] != "EXITO":
-
-        detail = f"{response.text}"
-        logger.error(detail)
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
-                            detail=detail)
-
-    logger.info(f"Response: {resp['tasa'][0]}")
-    return resp["tasa"][0]
+    tasa = await tasa_bcv_cache.get_or_load(
+        data["fe_tasa"],
+        lambda: _consultar_tasa_bcv(data["fe_tasa"]),
+        ttl=tasa_bcv_ttl(data["fe_tasa"]),
+    )
+    log_response("Response", tasa)
+    return tasa
 
 
 
@@ -436,7 +456,7 @@ def consulta_tasa_bcv(
     status_code=status.HTTP_200_OK,
     summary="Registrar Notificacion Pago a MS",
 )
-def notificacion_pago(
+async def notificacion_pago(
     request: NotificacionPagoBase,
     #client: httpx.AsyncClient = Depends(get_client),
     api_key: str = Security(api_key_verifier),
@@ -466,12 +486,12 @@ def notificacion_pago(
         extracted from the "datos" key in the server's JSON response.
     """
     data = request.model_dump()
-    logger.info(f"Data: {data}")
+    log_payload("Data", data)
 
 
     tipo_pago = data.get("tipo_pago").value
 
-    payload = payload_notificacion_pago.copy()
+    payload = payload_notificacion_pago.build()
     payload["datos"]["poliza_recibo_cuota"] = data["poliza_recibo_cuota"]
     payload["datos"]["tipo_instrumento_pago"] = data["tipo_instrumento_pago"]
     payload["datos"]["nombre_pagador"] = data["nombre_pagador"]
@@ -504,15 +524,21 @@ def notificacion_pago(
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,detail=TIPO_PAGO_ERROR)
 
     try:
-        logger.info(f"Payload: {json.dumps(payload)}")
+        log_payload("Payload", payload)
         # logger.info(f"URL:{url_notificacion_pago}")
         # logger.info(f"HEADER: {headers_notificacion_pago_ms}")
-        http_client = httpx.Client(verify=False)
-        response = http_client.post(
+        response = await fetch_url(
+            "POST",
             url_notificacion_pago,
-            headers=headers_notificacion_pago_ms,
-            json=payload,
-            timeout=None
+            headers_notificacion_pago_ms,
+            payload,
+            verify=False
+        )
+    except httpx.TimeoutException as e:
+        logger.error(f"Tiempo de espera excedido: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_408_REQUEST_TIMEOUT,
+            detail=TIMEOUT_ERROR,
         )
     except httpx.RequestError as e:
         logger.error(f"Error en la solicitud: {e}")
@@ -520,12 +546,6 @@ def notificacion_pago(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=INTERNAL_ERROR,
         )
-    except httpx.ReadTimeout as e:
-        logger.error(f"Tiempo de espera excedido: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_408_REQUEST_TIMEOUT,
-            detail=TIMEOUT_ERROR,
-        )
     except httpx.HTTPError as e:
         logger.error(f"{e}")
         raise HTTPException(
@@ -533,18 +553,10 @@ def notificacion_pago(
             detail=f"{e}",
         )
 
-    if response.status_code != 200:
-        logger.error(f"{response.text}")
-        raise HTTPException(status_code=response.status_code,
-                            detail=f"{response.text}")
-
-    if response.json()["status"]["code"] != "EXITO":
-        logger.error(f"{response.text}")
-        raise HTTPException(status_code=response.status_code,
-                            detail=f"{response.text} ")
+    upstream = UpstreamResponse(response).ensure_success()
 
 
     # # Convierte la respuesta en JSON
-    response_json = response.json()
+    response_json = upstream.data
     result = response_json.get("datos")
     return result
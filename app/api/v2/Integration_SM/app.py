@@ -1,5 +1,4 @@
 import base64
-import json
 from ast import Bytes
 from io import BytesIO
 
@@ -17,11 +16,15 @@ from app.schemas.v1.Integration_SM.ResponseModelAPI import EmisionResponse
 from app.schemas.v2.Integracion_SM.ModelRequestBase import CrearPolizaBase, SolicitudCuadroPolizaBase, \
     ConsultarCotizacionBase
 from app.schemas.v2.Integracion_SM.ModelResponseBase import CotizacionResponse, CuadroPolizaResponse
-from app.utils.v1.AsyncHttpx import fetch_url, get_client
+from app.utils.v1.AsyncHttpx import fetch_url, open_stream
+from app.utils.v1.UpstreamResponse import UpstreamResponse
+from app.utils.v1.RequestCoalescing import coalesce_requests
+from app.utils.v1.CotizacionCache import invalidate_cotizacion
+from app.utils.v1.LookupCache import invalidate_poliza, invalidates
 from app.utils.v1.messages_error import INTERNAL_ERROR, TIMEOUT_ERROR
-from app.utils.v2.SyncHttpx import get_sync_client, sync_fetch_url
 
-from app.utils.v1.configs import API_KEY_AUTH, SUMA_ASEGURADA, get_valid_api_keys
+from app.utils.v1.configs import (API_KEY_AUTH, SUMA_ASEGURADA, CUADRO_POLIZA_CACHE_DIR, CUADRO_POLIZA_CACHE_TTL,
+                                  get_valid_api_keys)
 from app.utils.v1.constants import (
     frecuencia_cuota,
     headers,
@@ -32,8 +35,10 @@ from app.utils.v1.constants import (
     url_consultar_cotizacion, url_emitir_poliza
 )
 from app.utils.v2.LoggerSingletonDB import logger
+from app.utils.v1.PayloadLogging import log_payload, log_response
 from app.utils.v1.payload_templates import payload_emitir_poliza
 from app.utils.v2.mockup_response_cotizacion import cotizacion
+from app.utils.v2.ReportStream import ReportDiskCache, ReportStreamError, start_report, stream_report
 
 from app.utils.v2.payload_templates import payload_cotizacion, payload_cuadro_poliza, payload_consultar_cotizacion
 
@@ -43,6 +48,11 @@ router = APIRouter(
 
 api_key_verifier = APIKeyVerifier(get_valid_api_keys())
 
+# Caché opcional en disco de los PDF de cuadro de póliza (por datos_poliza)
+cuadro_poliza_cache = (
+    ReportDiskCache(CUADRO_POLIZA_CACHE_DIR, CUADRO_POLIZA_CACHE_TTL) if CUADRO_POLIZA_CACHE_DIR else None
+)
+
 
 @router.post(
     "/crear_cotizacion_global",
@@ -52,19 +62,17 @@ api_key_verifier = APIKeyVerifier(get_valid_api_keys())
 )
 async def crear_cotizacion(
     request: CrearPolizaBase,
-    client: httpx.AsyncClient = Depends(get_client),
     api_key: str = Security(api_key_verifier),
 ):
     """
     crear_cotizacion is an asynchronous function that creates a policy based on the provided request data.
     Args:
         request: Object containing the request data for policy creation.
-        client: Async HTTP client dependency used to make network requests.
         api_key: API key for security verification.
     """
     try:
         data = request.model_dump(exclude_unset=True)
-        logger.info(f"data: {data}")
+        log_payload("data", data)
 
 
         fecha_nacimiento = data["persona"]["fecha_nacimiento"]
@@ -84,7 +92,7 @@ async def crear_cotizacion(
         )
         sexo = data['persona']['sexo'].value
 
-        body = payload_cotizacion.copy()
+        body = payload_cotizacion.build()
 
         body["coll_bienes"]["bienes"][0]["de_bien"] = fullname
 
@@ -110,7 +118,7 @@ async def crear_cotizacion(
             coll_datos["datos"].append(item)
 
         body["coll_datos"] = coll_datos
-        logger.info(f"Payload: {body}")
+        log_payload("Payload", body)
 
     except Exception as e:
         logger.error(f"{e}")
@@ -129,18 +137,18 @@ async def crear_cotizacion(
         )
 
 
+    except httpx.TimeoutException as e:
+        logger.error(f"Tiempo de espera excedido: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_408_REQUEST_TIMEOUT,
+            detail=TIMEOUT_ERROR,
+        )
     except httpx.RequestError as e:
         logger.error(f"Error en la solicitud: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=INTERNAL_ERROR,
         )
-    except httpx.ReadTimeout as e:
-        logger.error(f"Tiempo de espera excedido: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_408_REQUEST_TIMEOUT,
-            detail=TIMEOUT_ERROR,
-        )
     except httpx.HTTPError as e:
         logger.error(f"{e}")
         raise HTTPException(
@@ -149,24 +157,12 @@ async def crear_cotizacion(
         )
 
     # verificar si el request fue exitoso
-    if response.status_code != 200:
-
-        detail = f"{response.text}"
-        logger.error(detail)
-        raise HTTPException(status_code=response.status_code,
-                            detail=detail)
-
-    if response.json()["status"]["code"] != "EXITO":
-
-        detail = f"{response.text}"
-        logger.error(detail)
-        raise HTTPException(status_code=response.status_code,
-                            detail=detail)
+    upstream = UpstreamResponse(response).ensure_success()
 
 
     # convertir response to JSON
-    response_json = response.json()
-    logger.info(f"Response: {response_json}")
+    response_json = upstream.data
+    log_response("Response", response_json)
     return response_json["cotizacion"]
 
 
@@ -190,10 +186,10 @@ async def get_cuadro_poliza(
     """
 
     data = request.model_dump(exclude_unset=True)
-    logger.info(f"data: {data}")
-    body = payload_cuadro_poliza.copy()
+    log_payload("data", data)
+    body = payload_cuadro_poliza.build()
     body["datos_poliza"] = data["datos_poliza"]
-    logger.info(f"Payload:: {body}")
+    log_payload("Payload", body)
 
 
     try:
@@ -205,19 +201,19 @@ async def get_cuadro_poliza(
         )
 
 
-    except httpx.RequestError as e:
-        logger.error(f"Error en la solicitud: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=INTERNAL_ERROR,
-        )
-    except httpx.ReadTimeout as e:
+    except httpx.TimeoutException as e:
         logger.error(f"Tiempo de espera excedido: {e}")
         raise HTTPException(
             status_code=status.HTTP_408_REQUEST_TIMEOUT,
             detail=TIMEOUT_ERROR,
         )
 
+    except httpx.RequestError as e:
+        logger.error(f"Error en la solicitud: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=INTERNAL_ERROR,
+        )
     except httpx.HTTPError as e:
         logger.error(f"{e}")
         raise HTTPException(
@@ -225,25 +221,9 @@ async def get_cuadro_poliza(
             detail=f"{e}",
         )
 
-    response_json = response.json()
-
-    if response.status_code != 200:
-
-        detail = f"{response.text}"
-        logger.error(detail)
-        raise HTTPException(status_code=response.status_code,
-                            detail=detail)
-
-    if response.json()["status"]["code"] != "EXITO":
+    upstream = UpstreamResponse(response).ensure_success()
 
-        detail = f"{response.text}"
-        logger.error(detail)
-        raise HTTPException(status_code=response.status_code,
-                            detail=detail)
-
-
-
-    reporte_codificado = response_json["reporte_codificado"]
+    reporte_codificado = upstream["reporte_codificado"]
     response = {
         "status": {
             "code": "EXITO",
@@ -255,6 +235,88 @@ async def get_cuadro_poliza(
     return response
 
 
+@router.post(
+    "/cuadro_poliza/pdf",
+    response_class=StreamingResponse,
+    status_code=status.HTTP_200_OK,
+    responses={200: {"content": {"application/pdf": {}}}},
+    summary="Descarga el pdf del cuadro de póliza (streaming)",
+)
+async def get_cuadro_poliza_pdf(
+    request: SolicitudCuadroPolizaBase,
+    api_key: str = Security(api_key_verifier),
+):
+    """
+    Variante de `/cuadro_poliza` que entrega el PDF decodificado como `application/pdf`.
+
+    El `reporte_codificado` se extrae y decodifica a medida que llega del upstream, sin
+    cargar el JSON ni el base64 completos en memoria. Con `CUADRO_POLIZA_CACHE_DIR`
+    configurado, el PDF se guarda en disco y las siguientes solicitudes con los mismos
+    `datos_poliza` se sirven desde el archivo.
+
+    Args:
+        request: An instance of `SolicitudCuadroPolizaBase` containing the input data needed to generate the policy frame PDF.
+        api_key: A string used for API key verification via security dependency.
+    """
+    data = request.model_dump(exclude_unset=True)
+    log_payload("data", data)
+    filename = f"cuadro_poliza_{data['datos_poliza']['nu_poliza']}.pdf"
+    content_disposition = {"Content-Disposition": f'inline; filename="{filename}"'}
+
+    cache_path = None
+    if cuadro_poliza_cache is not None:
+        cached = cuadro_poliza_cache.get(data["datos_poliza"])
+        if cached is not None:
+            logger.info(f"Cuadro de póliza desde disco: {cached.name}")
+            return FileResponse(cached, media_type="application/pdf", headers=content_disposition)
+        cache_path = cuadro_poliza_cache.path_for(data["datos_poliza"])
+
+    body = payload_cuadro_poliza.build()
+    body["datos_poliza"] = data["datos_poliza"]
+    log_payload("Payload", body)
+
+    try:
+        response = await open_stream(
+            "POST",
+            url_cuadro_poliza,
+            headers,
+            body
+        )
+    except httpx.TimeoutException as e:
+        logger.error(f"Tiempo de espera excedido: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_408_REQUEST_TIMEOUT,
+            detail=TIMEOUT_ERROR,
+        )
+    except httpx.RequestError as e:
+        logger.error(f"Error en la solicitud: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=INTERNAL_ERROR,
+        )
+
+    try:
+        if response.status_code != 200:
+            detail = (await response.aread()).decode(errors="replace")
+            logger.error(detail)
+            raise HTTPException(status_code=response.status_code, detail=detail)
+        decoder, chunks, head = await start_report(response)
+    except ReportStreamError as e:
+        await response.aclose()
+        detail = e.body.decode(errors="replace") or str(e)
+        logger.error(f"{e}: {detail}")
+        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=detail)
+    except BaseException:
+        await response.aclose()
+        raise
+
+    return StreamingResponse(
+        stream_report(response, decoder, chunks, head, cache_path),
+        media_type="application/pdf",
+        headers=content_disposition,
+    )
+
+
 
 
 
@@ -265,14 +327,15 @@ async def get_cuadro_poliza(
     status_code=status.HTTP_200_OK,
     summary="Consultar cotizacion de persona en Seguros Mercantil",
 )
+@coalesce_requests()
 async def consultar_cotizacion(request: ConsultarCotizacionBase, api_key: str = Security(api_key_verifier)):
     data = request.model_dump(exclude_unset=True)
-    logger.info(f"Data: {data}")
+    log_payload("Data", data)
     cd_entidad = data.get("cd_entidad")
-    body = payload_consultar_cotizacion.copy()
+    body = payload_consultar_cotizacion.build()
     body["nu_cotizacion"] = data.get("nu_cotizacion")
     body["cd_entidad"] = cd_entidad
-    logger.info(f"Payload: {body}")
+    log_payload("Payload", body)
     try:
         response = await fetch_url(
             "POST",
@@ -281,18 +344,18 @@ async def consultar_cotizacion(request: ConsultarCotizacionBase, api_key: str =
             body
         )
 
+    except httpx.TimeoutException as e:
+        logger.error(f"Tiempo de espera excedido: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_408_REQUEST_TIMEOUT,
+            detail=TIMEOUT_ERROR,
+        )
     except httpx.RequestError as e:
         logger.error(f"Error en la solicitud: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=INTERNAL_ERROR,
         )
-    except httpx.ReadTimeout as e:
-        logger.error(f"Tiempo de espera excedido: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_408_REQUEST_TIMEOUT,
-            detail=TIMEOUT_ERROR,
-        )
     except httpx.HTTPError as e:
         logger.error(f"{e}")
         raise HTTPException(
@@ -307,61 +370,54 @@ async def consultar_cotizacion(request: ConsultarCotizacionBase, api_key: str =
             detail=f"Error: {response.text}"
         )
 
-    try:
-        response_json = response.json()
-        if response.status_code == 200 and len(response_json["mensajes"]) > 0:
-            # try:
-            #     detail = response_json["mensajes"][0]["mensaje"]
-            # except KeyError:
-            detail = f"{response.text}"
-            logger.error(detail)
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=detail,
-            )
-
-        cotizacion = response_json["cotizacion"][0]
-        bienes = []
-        for bien in response_json["cotizacion"][0]["bienes"]:
-            temp = bien.copy()
-            del (
-                temp["fe_fallecimiento"],
-                temp["datos"],
-                temp["fe_exclusion"],
-                temp["preguntas"],
-                temp["nu_consec_tp_doc_asegurado"],
-            )
-            bienes.append(temp)
-
-        response_data = {
-            "de_plan_pago": cotizacion["de_plan_pago"],
-            "fe_desde": cotizacion["fe_desde"],
-            "fe_hasta": cotizacion["fe_hasta"],
-            "cd_entidad": cotizacion["cd_entidad"],
-            "nu_cotizacion": cotizacion["nu_cotizacion"],
-            "nu_documento_contratante": cotizacion["nu_documento_contratante"],
-            "tp_documento_contratante": cotizacion["tp_documento_contratante"],
-            "nu_documento": cotizacion["nu_documento"],
-            "tp_documento": cotizacion["tp_documento"],
-            "nu_poliza": cotizacion["nu_poliza"],
-            "mt_prima_total": cotizacion["mt_prima_total"],
-            "cd_region": cotizacion["cd_region"],
-            "nu_total_cuota": cotizacion["nu_total_cuota"],
-            "cd_area": cotizacion["cd_area"],
-            "nm_cliente": cotizacion["nm_cliente"],
-            "de_st_cotizacion": cotizacion["de_st_cotizacion"],
-            "bienes": bienes,
-        }
-        logger.info(f"Response: {response_data}")
-        return response_data
-
-    except json.JSONDecodeError as e:
-        logger.error(f"Error: {response.text}")
+    upstream = UpstreamResponse(response)
+    response_json = upstream.data
+    if len(response_json["mensajes"]) > 0:
+        # try:
+        #     detail = response_json["mensajes"][0]["mensaje"]
+        # except KeyError:
+        detail = f"{response.text}"
+        logger.error(detail)
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error al decodificar la respuesta JSON: {e}: {response.text}",
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=detail,
         )
 
+    cotizacion = response_json["cotizacion"][0]
+    bienes = []
+    for bien in response_json["cotizacion"][0]["bienes"]:
+        temp = bien.copy()
+        del (
+            temp["fe_fallecimiento"],
+            temp["datos"],
+            temp["fe_exclusion"],
+            temp["preguntas"],
+            temp["nu_consec_tp_doc_asegurado"],
+        )
+        bienes.append(temp)
+
+    response_data = {
+        "de_plan_pago": cotizacion["de_plan_pago"],
+        "fe_desde": cotizacion["fe_desde"],
+        "fe_hasta": cotizacion["fe_hasta"],
+        "cd_entidad": cotizacion["cd_entidad"],
+        "nu_cotizacion": cotizacion["nu_cotizacion"],
+        "nu_documento_contratante": cotizacion["nu_documento_contratante"],
+        "tp_documento_contratante": cotizacion["tp_documento_contratante"],
+        "nu_documento": cotizacion["nu_documento"],
+        "tp_documento": cotizacion["tp_documento"],
+        "nu_poliza": cotizacion["nu_poliza"],
+        "mt_prima_total": cotizacion["mt_prima_total"],
+        "cd_region": cotizacion["cd_region"],
+        "nu_total_cuota": cotizacion["nu_total_cuota"],
+        "cd_area": cotizacion["cd_area"],
+        "nm_cliente": cotizacion["nm_cliente"],
+        "de_st_cotizacion": cotizacion["de_st_cotizacion"],
+        "bienes": bienes,
+    }
+    log_response("Response", response_data)
+    return response_data
+
 
 
 
@@ -371,21 +427,23 @@ async def consultar_cotizacion(request: ConsultarCotizacionBase, api_key: str =
     status_code=status.HTTP_201_CREATED,
     summary="Emitir poliza de persona en Seguros Mercantil",
 )
-def emitir_poliza(
+@invalidates(
+    lambda request, result: invalidate_poliza(result["cd_entidad"], result["cd_area"], result["nu_poliza"]),
+    lambda request, result: invalidate_cotizacion(request.nu_cotizacion),
+)
+async def emitir_poliza(
     request: EmitirPolizaBase,
-    client: httpx.Client = Depends(get_sync_client),
     api_key: str = Security(api_key_verifier),
 ) -> dict:
     """
     Args:
         request: Contiene los datos de la solicitud para emitir la póliza.
-        client: Cliente HTTP sincrónico utilizado para hacer solicitudes.
         api_key: Clave de API utilizada para la verificación de seguridad.
     """
     try:
         data = request.model_dump(exclude_unset=True)
-        logger.info(f"data: {data}")
-        body = payload_emitir_poliza.copy()
+        log_payload("data", data)
+        body = payload_emitir_poliza.build()
         body["coll_generales"]["generales"][0]["cd_entidad"] = data["cd_entidad"]
         body["coll_generales"]["generales"][0]["nu_cotizacion"] = data["nu_cotizacion"]
 
@@ -398,25 +456,25 @@ def emitir_poliza(
 
     try:
 
-        response = sync_fetch_url(
+        response = await fetch_url(
             "POST",
             url_emitir_poliza,
             headers,
             body
         )
 
+    except httpx.TimeoutException as e:
+        logger.error(f"Tiempo de espera excedido: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_408_REQUEST_TIMEOUT,
+            detail=TIMEOUT_ERROR,
+        )
     except httpx.RequestError as e:
         logger.error(f"Error en la solicitud: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=INTERNAL_ERROR,
         )
-    except httpx.ReadTimeout as e:
-        logger.error(f"Tiempo de espera excedido: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_408_REQUEST_TIMEOUT,
-            detail=TIMEOUT_ERROR,
-        )
     except httpx.HTTPError as e:
         logger.error(f"{e}")
         raise HTTPException(
@@ -424,26 +482,13 @@ def emitir_poliza(
             detail=f"{e}",
         )
 
-    logger.info(response.text)
-    logger.info(response.status_code)
+    logger.info(f"Status code: {response.status_code}")
 
-    if response.status_code != 200:
-
-        detail = f"{response.text}"
-        logger.error(detail)
-        raise HTTPException(status_code=response.status_code,
-                            detail=detail)
-
-    if response.json()["status"]["code"] != "EXITO":
-
-        detail = f"{response.text}"
-        logger.error(detail)
-        raise HTTPException(status_code=response.status_code,
-                            detail=detail)
+    upstream = UpstreamResponse(response).ensure_success()
 
 
-    response_json = response.json()
-    logger.info(f"Response: {response_json}")
+    response_json = upstream.data
+    log_response("Response", response_json)
 
 
     return response_json["emision"]
\ No newline at end of file
@@ -1,5 +1,3 @@
-import json
-
 
 import httpx
 from fastapi import APIRouter, HTTPException, Security, status
@@ -13,6 +11,10 @@ from app.utils.v1.constants import (
     headers_pasarela_ms
 )
 from app.utils.v2.LoggerSingletonDB import logger
+from app.utils.v1.PayloadLogging import log_payload, log_response
+from app.utils.v1.AsyncHttpx import fetch_url
+from app.utils.v1.UpstreamResponse import UpstreamResponse
+from app.utils.v1.LookupCache import invalidate_recibos, invalidates
 from app.utils.v1.messages_error import (
     INTERNAL_ERROR,
     TIMEOUT_ERROR,
@@ -36,7 +38,9 @@ api_key_verifier = APIKeyVerifier(get_valid_api_keys())
     status_code=status.HTTP_200_OK,
     summary="Registrar Pago Pasarela MS v2",
 )
-def registrar_pago(
+# En v2 `recibo_poliza_pago` es una lista: un pago puede cubrir recibos de varias pólizas
+@invalidates(lambda request, result: invalidate_recibos(request.recibo_poliza_pago))
+async def registrar_pago(
     request: RegistroPagoBase,
     api_key: str = Security(api_key_verifier),
 ):
@@ -61,7 +65,7 @@ def registrar_pago(
             and with other statuses and messages specific to the payment gateway response.
     """
     data = request.model_dump()
-    logger.info(f"Data: {data}")
+    log_payload("Data", data)
 
 
     recibo_poliza_pago = data.get("recibo_poliza_pago")
@@ -109,45 +113,52 @@ def registrar_pago(
     # logger.info(f"Moneda: {moneda_pago}")
     # logger.info(f"Tipo de instrumento de pago:{tipo_instrumento_pago}")
     # logger.info(f"Instrumento de pago: {instrumento}")
-    payload_pasarela_pago["datos"]["poliza_recibo_cuota"] = recibo_poliza_pago
-    payload_pasarela_pago["datos"]["tipo_instrumento_pago"] = tipo_instrumento_pago
-    payload_pasarela_pago["datos"]["moneda_pago"] = moneda_pago
+    payload = payload_pasarela_pago.build()
+    payload["datos"]["poliza_recibo_cuota"] = recibo_poliza_pago
+    payload["datos"]["tipo_instrumento_pago"] = tipo_instrumento_pago
+    payload["datos"]["moneda_pago"] = moneda_pago
     match tipo_instrumento_pago:
         case "TDD":
             tipo_instrumento = "instrumento_tdd"
-            if "instrumento_tdc" in payload_pasarela_pago["datos"].keys():
-                del payload_pasarela_pago["datos"]["instrumento_tdc"]
-            if "instrumento_c2p" in payload_pasarela_pago["datos"].keys():
-                del payload_pasarela_pago["datos"]["instrumento_c2p"]
+            if "instrumento_tdc" in payload["datos"].keys():
+                del payload["datos"]["instrumento_tdc"]
+            if "instrumento_c2p" in payload["datos"].keys():
+                del payload["datos"]["instrumento_c2p"]
         case "C2P":
             tipo_instrumento = "instrumento_c2p"
-            if "instrumento_tdc" in payload_pasarela_pago["datos"].keys():
-                del payload_pasarela_pago["datos"]["instrumento_tdc"]
-            if "instrumento_tdd" in payload_pasarela_pago["datos"].keys():
-                del payload_pasarela_pago["datos"]["instrumento_tdd"]
+            if "instrumento_tdc" in payload["datos"].keys():
+                del payload["datos"]["instrumento_tdc"]
+            if "instrumento_tdd" in payload["datos"].keys():
+                del payload["datos"]["instrumento_tdd"]
         case "TDC":
             tipo_instrumento = "instrumento_tdc"
-            if "instrumento_tdd" in payload_pasarela_pago["datos"].keys():
-                del payload_pasarela_pago["datos"]["instrumento_tdd"]
-            if "instrumento_c2p" in payload_pasarela_pago["datos"].keys():
-                del payload_pasarela_pago["datos"]["instrumento_c2p"]
+            if "instrumento_tdd" in payload["datos"].keys():
+                del payload["datos"]["instrumento_tdd"]
+            if "instrumento_c2p" in payload["datos"].keys():
+                del payload["datos"]["instrumento_c2p"]
         case _:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,detail=TIPO_INSTRUMENTO_ERROR)
 
-    payload_pasarela_pago["datos"][tipo_instrumento] = instrumento
+    payload["datos"][tipo_instrumento] = instrumento
 
 
 
     try:
         # logger.info(f"URL:{url_registrar_pago}")
         # logger.info(f"HEADER: {headers_pasarela_ms}")
-        logger.info(f"Payload: {json.dumps(payload_pasarela_pago)}")
-        http_client = httpx.Client(verify=False)
-        response = http_client.post(
+        log_payload("Payload", payload)
+        response = await fetch_url(
+            "POST",
             url_registrar_pago,
-            headers=headers_pasarela_ms,
-            json=payload_pasarela_pago,
-            timeout=None
+            headers_pasarela_ms,
+            payload,
+            verify=False
+        )
+    except httpx.TimeoutException as e:
+        logger.error(f"Tiempo de espera excedido: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_408_REQUEST_TIMEOUT,
+            detail=TIMEOUT_ERROR,
         )
     except httpx.RequestError as e:
         logger.error(f"Error en la solicitud: {e}")
@@ -155,12 +166,6 @@ def registrar_pago(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=INTERNAL_ERROR,
         )
-    except httpx.ReadTimeout as e:
-        logger.error(f"Tiempo de espera excedido: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_408_REQUEST_TIMEOUT,
-            detail=TIMEOUT_ERROR,
-        )
     except httpx.HTTPError as e:
         logger.error(f"{e}")
         raise HTTPException(
@@ -170,24 +175,13 @@ def registrar_pago(
 
 
 
-    if response.status_code != 200:
-        logger.error(f"{response.text}")
-        detail = f"{response.text}"
-        raise HTTPException(status_code=response.status_code,
-                            detail=detail)
-
-    if response.json()["status"]["code"] != "EXITO":
-
-        logger.error(f"{response.text}")
-        detail = f"{response.text}"
-        raise HTTPException(status_code=response.status_code,
-                            detail=detail)
+    upstream = UpstreamResponse(response).ensure_success()
 
 
     # # Convierte la respuesta en JSON
-    response_json = response.json()
+    response_json = upstream.data
     result = response_json.get("datos")
-    logger.info(json.dumps(result))
+    log_response("Response", result)
     return result
 
 
@@ -1,14 +1,14 @@
-import json
-
 import httpx
-from fastapi import APIRouter, Depends, HTTPException, Security, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Security, status
 
 
 
 from app.middlewares.verify_api_key import APIKeyVerifier
 from app.schemas.v2.Integracion_SM.ModelResponseBase import CotizacionResponse
 from app.schemas.v3.Integracion_SM.ModelRequestBase import CrearPolizaBase
-from app.utils.v1.AsyncHttpx import fetch_url, get_client
+from app.utils.v1.AsyncHttpx import fetch_url
+from app.utils.v1.UpstreamResponse import UpstreamResponse
+from app.utils.v1.CotizacionCache import BYPASS_HEADER, cached_cotizacion
 
 from app.utils.v1.configs import API_KEY_AUTH, SUMA_ASEGURADA, get_valid_api_keys
 from app.utils.v1.constants import (
@@ -18,6 +18,7 @@ from app.utils.v1.constants import (
     url_cotizar, PARENTESCO
 )
 from app.utils.v2.LoggerSingletonDB import logger
+from app.utils.v1.PayloadLogging import log_payload, log_response
 
 
 from app.utils.v3.payload_templates import payload_cotizacion
@@ -37,12 +38,12 @@ api_key_verifier = APIKeyVerifier(get_valid_api_keys())
 )
 async def crear_cotizacion(
         request: CrearPolizaBase,
-        client: httpx.AsyncClient = Depends(get_client),
         api_key: str = Security(api_key_verifier),
+        cache_bypass: bool = Header(False, alias=BYPASS_HEADER),
 ):
     data = request.model_dump(exclude_unset=True)
-    logger.info(f"data: {data}")
-    payload = payload_cotizacion.copy()
+    log_payload("data", data)
+    payload = payload_cotizacion.build()
     datos = payload.get("coll_datos").get("datos").copy()
     generales = payload.get("coll_generales").get("generales")
 
@@ -142,7 +143,7 @@ async def crear_cotizacion(
             }
         ]
     )
-    logger.info(f"Datos: {json.dumps(datos)}")
+    log_payload("Datos", datos)
     bien = {
         "in_seleccion": "1",
         "nu_bien": "1",
@@ -190,26 +191,36 @@ async def crear_cotizacion(
     payload["coll_bienes"] = {"bienes": [bien]}
     payload["coll_generales"] = {"generales": [general]}
     payload["coll_grpaseg"] = {"grpaseg": grpasegs}
+    return await cached_cotizacion("v3", payload, lambda: cotizar(payload), bypass=cache_bypass)
+
+
+async def cotizar(payload: dict):
+    """
+    Envía el payload a `cotizarglobal` y devuelve la cotización.
+
+    Raises:
+        HTTPException: Timeout, error de red o respuesta sin EXITO del upstream.
+    """
     try:
-        logger.info(f"Payload-> {json.dumps(payload)}")
+        log_payload("Payload", payload)
         response = await  fetch_url(
             "POST",
             url_cotizar,
             headers,
             payload
         )
+    except httpx.TimeoutException as e:
+        logger.error(f"Tiempo de espera excedido: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_408_REQUEST_TIMEOUT,
+            detail="Tiempo de espera excedido",
+        )
     except httpx.RequestError as e:
         logger.error(f"Error en la solicitud: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error interno del servidor",
         )
-    except httpx.ReadTimeout as e:
-        logger.error(f"Tiempo de espera excedido: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_408_REQUEST_TIMEOUT,
-            detail="Tiempo de espera excedido",
-        )
     except httpx.HTTPError as e:
         logger.error(f"{e}")
         raise HTTPException(
@@ -218,20 +229,9 @@ async def crear_cotizacion(
         )
 
     # verificar si el request fue exitoso
-    if response.status_code != 200:
-        detail = f"{response.text}"
-        logger.error(detail)
-        raise HTTPException(status_code=response.status_code,
-                            detail=detail)
-
-    if response.json()["status"]["code"] != "EXITO":
-
-        detail = f"{response.text}"
-        logger.error(detail)
-        raise HTTPException(status_code=response.status_code,
-                            detail=detail)
+    upstream = UpstreamResponse(response).ensure_success()
 
     # convertir response to JSON
-    response_json = response.json()
-    logger.info(f"Response: {response_json}")
+    response_json = upstream.data
+    log_response("Response", response_json)
     return response_json["cotizacion"]
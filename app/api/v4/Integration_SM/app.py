@@ -1,7 +1,5 @@
-import json
-
 import httpx
-from fastapi import APIRouter, Depends, HTTPException, Security, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Security, status
 
 
 
@@ -19,7 +17,10 @@ from app.utils.v1.constants import (
     url_cotizar, PARENTESCO
 )
 from app.utils.v2.LoggerSingletonDB import logger
-from app.utils.v2.SyncHttpx import sync_fetch_url
+from app.utils.v1.PayloadLogging import log_payload, log_response
+from app.utils.v1.AsyncHttpx import fetch_url
+from app.utils.v1.UpstreamResponse import UpstreamResponse
+from app.utils.v1.CotizacionCache import BYPASS_HEADER, cached_cotizacion
 
 from app.utils.v3.payload_templates import payload_cotizacion
 
@@ -36,15 +37,16 @@ api_key_verifier = APIKeyVerifier(get_valid_api_keys())
     status_code=status.HTTP_200_OK,
     summary="Crear cotizacion de persona en Seguros Mercantil",
 )
-def crear_cotizacion(
+async def crear_cotizacion(
         request: CrearPolizaBase,
         #client: httpx.AsyncClient = Depends(get_client),
         api_key: str = Security(api_key_verifier),
+        cache_bypass: bool = Header(False, alias=BYPASS_HEADER),
 ):
     data = request.model_dump(exclude_unset=True)
 
     # logger.info(f"data: {data}")
-    payload = payload_cotizacion.copy()
+    payload = payload_cotizacion.build()
     # logger.info(f"Payload:{payload}")
 
     datos = payload.get("coll_datos").get("datos").copy()
@@ -168,7 +170,7 @@ def crear_cotizacion(
             }
         ]
     )
-    logger.info(f"Datos: {json.dumps(datos)}")
+    log_payload("Datos", datos)
     bien = {
         "in_seleccion": "1",
         "nu_bien": "1",
@@ -216,28 +218,38 @@ def crear_cotizacion(
     payload["coll_bienes"] = {"bienes": [bien]}
     payload["coll_generales"] = {"generales": [general]}
     payload["coll_grpaseg"] = {"grpaseg": grpasegs}
+    return await cached_cotizacion("v4", payload, lambda: cotizar(payload), bypass=cache_bypass)
+
+
+async def cotizar(payload: dict):
+    """
+    Envía el payload a `cotizarglobal` y devuelve la cotización.
+
+    Raises:
+        HTTPException: Timeout, error de red o respuesta sin EXITO del upstream.
+    """
     try:
         # logger.info(f"URL-> {url_cotizar}")
-        logger.info(f"Payload-> {json.dumps(payload)}")
+        log_payload("Payload", payload)
         # logger.info(f"headers-> {headers}")
-        response = sync_fetch_url(
+        response = await fetch_url(
             "POST",
             url_cotizar,
             headers,
             payload
         )
+    except httpx.TimeoutException as e:
+        logger.error(f"Tiempo de espera excedido: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_408_REQUEST_TIMEOUT,
+            detail="Tiempo de espera excedido",
+        )
     except httpx.RequestError as e:
         logger.error(f"Error en la solicitud: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error interno del servidor",
         )
-    except httpx.ReadTimeout as e:
-        logger.error(f"Tiempo de espera excedido: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_408_REQUEST_TIMEOUT,
-            detail="Tiempo de espera excedido",
-        )
     except httpx.HTTPError as e:
         logger.error(f"{e}")
         raise HTTPException(
@@ -246,21 +258,9 @@ def crear_cotizacion(
         )
 
     # verificar si el request fue exitoso
-    if response.status_code != 200:
-
-        detail = f"{response.text}"
-        logger.error(detail)
-        raise HTTPException(status_code=response.status_code,
-                            detail=detail)
-
-    if response.json()["status"]["code"] != "EXITO":
-
-        detail = f"{response.text}"
-        logger.error(detail)
-        raise HTTPException(status_code=response.status_code,
-                            detail=detail)
+    upstream = UpstreamResponse(response).ensure_success()
 
     # convertir response to JSON
-    response_json = response.json()
-    logger.info(f"Response: {response_json}")
+    response_json = upstream.data
+    log_response("Response", response_json)
     return response_json["cotizacion"]
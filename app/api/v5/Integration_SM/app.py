@@ -1,17 +1,19 @@
 import json
 
+import anyio
 import httpx
-from fastapi import APIRouter, HTTPException, Security, status
+from fastapi import APIRouter, Header, HTTPException, Security, status
 
 
 
 from app.middlewares.verify_api_key import APIKeyVerifier
 
 
-from app.schemas.v5.Integracion_SM.ModelRequestBase import CrearPolizaBase
+from app.schemas.v5.Integracion_SM.ModelRequestBase import CotizacionLoteBase, CrearPolizaBase
+from app.schemas.v5.Integracion_SM.ModelResponseBase import CotizacionLoteResponse
 
 
-from app.utils.v1.configs import API_KEY_AUTH, get_valid_api_keys
+from app.utils.v1.configs import API_KEY_AUTH, COTIZACION_LOTE_CONCURRENCIA, COTIZACION_LOTE_MAX, get_valid_api_keys
 from app.utils.v1.constants import (
     frecuencia_cuota,
     headers,
@@ -21,7 +23,11 @@ from app.utils.v1.constants import (
     plan, CD_PERSONA_MED,
 )
 from app.utils.v2.LoggerSingletonDB import logger
-from app.utils.v2.SyncHttpx import sync_fetch_url
+from app.utils.v1.PayloadLogging import log_payload, log_response
+from app.utils.v1.AsyncHttpx import fetch_url
+from app.utils.v1.UpstreamPolicy import CircuitOpenError
+from app.utils.v1.UpstreamResponse import UpstreamResponse
+from app.utils.v1.CotizacionCache import BYPASS_HEADER, cached_cotizacion
 
 from app.utils.v5.payload_templates import payload_cotizacion
 
@@ -32,22 +38,22 @@ router = APIRouter(
 api_key_verifier = APIKeyVerifier(get_valid_api_keys())
 
 
-@router.post(
-    "/crear_cotizacion_global",
-    status_code=status.HTTP_200_OK,
-    summary="Crear cotizacion de persona en Seguros Mercantil",
-)
-def crear_cotizacion(
-        request: CrearPolizaBase,
-        #client: httpx.AsyncClient = Depends(get_client),
-        api_key: str = Security(api_key_verifier),
-):
+def build_payload_cotizacion(request: CrearPolizaBase) -> dict:
+    """
+    Construye el payload de `cotizarglobal` para una combinación titular/grupo familiar.
+
+    Args:
+        request (CrearPolizaBase): Datos de la cotización.
+
+    Returns:
+        dict: Payload listo para enviar a `url_cotizar`.
+    """
     data = request.model_dump(exclude_unset=True)
     temporal_field = data.get('cd_persona_med')
     cd_persona_med = f"{CD_PERSONA_MED}" if temporal_field is None else f"{temporal_field}"
     #cd_persona_med = f"{data.get('cd_persona_med',CD_PERSONA_MED)}"
     # logger.info(f"data: {data}")
-    payload = payload_cotizacion.copy()
+    payload = payload_cotizacion.build()
     # logger.info(f"Payload:{payload}")
     datos = payload.get("coll_datos").get("datos").copy()
     generales = payload.get("coll_generales").get("generales")
@@ -211,28 +217,41 @@ def crear_cotizacion(
     payload["coll_bienes"] = {"bienes": [bien]}
     payload["coll_generales"] = {"generales": [general]}
     payload["coll_grpaseg"] = {"grpaseg": grpasegs}
+    return payload
+
+
+async def cotizar(payload: dict):
+    """
+    Envía el payload a `cotizarglobal` y devuelve la cotización.
+
+    Args:
+        payload (dict): Payload construido con `build_payload_cotizacion`.
+
+    Raises:
+        HTTPException: Timeout, error de red o respuesta sin EXITO del upstream.
+    """
     try:
         # logger.info(f"URL-> {url_cotizar}")
-        logger.info(f"Payload-> {json.dumps(payload)}")
+        log_payload("Payload", payload)
         # logger.info(f"headers-> {headers}")
-        response = sync_fetch_url(
+        response = await fetch_url(
             "POST",
             url_cotizar,
             headers,
             payload
         )
+    except httpx.TimeoutException as e:
+        logger.error(f"Tiempo de espera excedido: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_408_REQUEST_TIMEOUT,
+            detail="Tiempo de espera excedido",
+        )
     except httpx.RequestError as e:
         logger.error(f"Error en la solicitud: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error interno del servidor",
         )
-    except httpx.ReadTimeout as e:
-        logger.error(f"Tiempo de espera excedido: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_408_REQUEST_TIMEOUT,
-            detail="Tiempo de espera excedido",
-        )
     except httpx.HTTPError as e:
         logger.error(f"{e}")
         raise HTTPException(
@@ -241,21 +260,95 @@ def crear_cotizacion(
         )
 
     # verificar si el request fue exitoso
-    if response.status_code != 200:
+    upstream = UpstreamResponse(response).ensure_success()
 
-        detail = f"{response.text}"
-        logger.error(detail)
-        raise HTTPException(status_code=response.status_code,
-                            detail=detail)
+    # convertir response to JSON
+    response_json = upstream.data
+    log_response("Response", response_json)
+    return response_json["cotizacion"]
 
-    if response.json()["status"]["code"] != "EXITO":
 
-        detail = f"{response.text}"
-        logger.error(detail)
-        raise HTTPException(status_code=response.status_code,
-                            detail=detail)
+@router.post(
+    "/crear_cotizacion_global",
+    status_code=status.HTTP_200_OK,
+    summary="Crear cotizacion de persona en Seguros Mercantil",
+)
+async def crear_cotizacion(
+        request: CrearPolizaBase,
+        #client: httpx.AsyncClient = Depends(get_client),
+        api_key: str = Security(api_key_verifier),
+        cache_bypass: bool = Header(False, alias=BYPASS_HEADER),
+):
+    payload = build_payload_cotizacion(request)
+    return await cached_cotizacion("v5", payload, lambda: cotizar(payload), bypass=cache_bypass)
 
-    # convertir response to JSON
-    response_json = response.json()
-    logger.info(f"Response: {response_json}")
-    return response_json["cotizacion"]
+
+@router.post(
+    "/crear_cotizacion_global/lote",
+    status_code=status.HTTP_200_OK,
+    summary="Cotizar varias combinaciones de grupo familiar en una sola petición",
+    response_model=CotizacionLoteResponse,
+)
+async def crear_cotizacion_lote(
+        request: CotizacionLoteBase,
+        api_key: str = Security(api_key_verifier),
+        cache_bypass: bool = Header(False, alias=BYPASS_HEADER),
+):
+    """
+    Cotiza cada variante con la misma lógica de `/crear_cotizacion_global`.
+
+    Cada variante pasa por la caché de cotizaciones (y respeta `X-Cache-Bypass`). Las
+    variantes que producen el mismo payload se cotizan una sola vez, y como máximo
+    `COTIZACION_LOTE_CONCURRENCIA` llamadas a `cotizarglobal` van en paralelo. Los
+    resultados vuelven en el orden de `variantes`; el fallo de una variante se informa en
+    su propio elemento (`status_code` y `detail`) sin afectar a las demás; un rechazo de
+    negocio del upstream (`status.code` distinto de EXITO) se informa como 400.
+    """
+    if len(request.variantes) > COTIZACION_LOTE_MAX:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"El lote admite como máximo {COTIZACION_LOTE_MAX} variantes",
+        )
+
+    claves = []
+    pendientes = {}
+    resultados = {}
+    for variante in request.variantes:
+        try:
+            payload = build_payload_cotizacion(variante)
+        except (KeyError, ValueError) as e:
+            clave = f"invalida:{len(claves)}"
+            resultados[clave] = {"status_code": status.HTTP_400_BAD_REQUEST, "detail": f"Variante inválida: {e}"}
+        else:
+            clave = json.dumps(payload, sort_keys=True)
+            pendientes.setdefault(clave, payload)
+        claves.append(clave)
+
+    limiter = anyio.CapacityLimiter(COTIZACION_LOTE_CONCURRENCIA)
+
+    async def cotizar_variante(clave: str, payload: dict):
+        async with limiter:
+            try:
+                cotizacion = await cached_cotizacion("v5", payload, lambda: cotizar(payload), bypass=cache_bypass)
+                resultados[clave] = {"status_code": status.HTTP_200_OK, "cotizacion": cotizacion}
+            except HTTPException as e:
+                # La carga se comparte con `/crear_cotizacion_global` (misma clave y misma
+                # coalescencia), así que falla igual que allí y el 400 se aplica aquí: un
+                # rechazo de negocio llega con el HTTP 200 del upstream
+                status_code = status.HTTP_400_BAD_REQUEST if e.status_code == status.HTTP_200_OK else e.status_code
+                resultados[clave] = {"status_code": status_code, "detail": e.detail}
+            except CircuitOpenError as e:
+                resultados[clave] = {"status_code": status.HTTP_503_SERVICE_UNAVAILABLE, "detail": str(e)}
+            except Exception as e:
+                logger.exception(f"Error no controlado cotizando una variante del lote: {e}")
+                resultados[clave] = {
+                    "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    "detail": "Error interno del servidor",
+                }
+
+    async with anyio.create_task_group() as tg:
+        for clave, payload in pendientes.items():
+            tg.start_soon(cotizar_variante, clave, payload)
+
+    logger.info(f"Lote de cotización: {len(claves)} variantes, {len(pendientes)} llamadas al upstream")
+    return {"resultados": [{"indice": indice, **resultados[clave]} for indice, clave in enumerate(claves)]}
@@ -2,6 +2,9 @@
 
 from fastapi import HTTPException, Security, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from app.utils.v1.configs import get_mcp_local_token
 from app.mcp.exceptions import AuthenticationError
@@ -62,3 +65,32 @@ async def verify_mcp_token_async(credentials: HTTPAuthorizationCredentials = Sec
         AuthenticationError: Si hay error en la autenticación
     """
     return verify_mcp_token(credentials)
+
+
+class MCPTokenMiddleware:
+    """
+    Middleware ASGI del transporte HTTP del servidor MCP: cada petición debe traer
+    `Authorization: Bearer <MCP_LOCAL_TOKEN>`, validado con `verify_mcp_token`.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            credentials = await security(Request(scope))
+            verify_mcp_token(credentials)
+        except HTTPException as e:
+            response = JSONResponse({"detail": e.detail}, status_code=e.status_code, headers=e.headers)
+            await response(scope, receive, send)
+            return
+        except AuthenticationError as e:
+            response = JSONResponse({"detail": e.message}, status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
@@ -1,23 +1,70 @@
+from typing import TYPE_CHECKING, Any, Optional, Dict
 
+from app.mcp.exceptions import BackendError, MCPError, NotFoundError
+from app.mcp.runtime import get_logger, get_settings
 
-import httpx
-from typing import Any, Optional, Dict
+if TYPE_CHECKING:
+    import httpx
 
-from app.mcp.exceptions import BackendError, NotFoundError
-from app.utils.v1.configs import get_settings
-from app.utils.v1.LoggerSingleton import logger
+    from app.mcp.dispatch import InProcessBackend
+
+
+def backend_error(status_code: int, detail: Any) -> MCPError:
+    """
+    Excepción de la herramienta para una respuesta de error del backend; compartida por el
+    cliente HTTP y el despacho en proceso para que ambos modos fallen igual.
+    """
+    if status_code == 404:
+        return NotFoundError("Recurso no encontrado")
+    return BackendError(f"Error del backend: {detail}", status_code=status_code)
 
 
 class BackendClient:
+    """
+    Cliente HTTP del servidor MCP hacia el backend (`BACKEND_BASE_URL`).
+
+    Mantiene un único `httpx.AsyncClient` con keep-alive para todas las llamadas de las
+    herramientas; se crea en la primera petición y se cierra con `aclose()` al terminar
+    el servidor. `httpx` también se importa en el primer uso.
+    """
+
     def __init__(
         self,
         base_url: str,
-        timeout: float = 180.0,
-        headers: Optional[Dict[str, str]] = None
+        timeout: Optional[float] = None,
+        headers: Optional[Dict[str, str]] = None,
+        limits: Optional["httpx.Limits"] = None,
+        transport: Optional["httpx.AsyncBaseTransport"] = None,
     ):
         self.base_url = base_url.rstrip("/")
-        self.timeout = timeout
+        self.timeout = timeout if timeout is not None else get_settings().MCP_BACKEND_TIMEOUT
         self.default_headers = headers or {}
+        self.limits = limits
+        self.transport = transport
+        self._client: "httpx.AsyncClient | None" = None
+
+    @property
+    def client(self) -> "httpx.AsyncClient":
+        if self._client is None or self._client.is_closed:
+            import httpx
+
+            settings = get_settings()
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout, connect=settings.MCP_BACKEND_CONNECT_TIMEOUT),
+                limits=self.limits or httpx.Limits(
+                    max_connections=settings.MCP_BACKEND_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.MCP_BACKEND_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=settings.MCP_BACKEND_KEEPALIVE_EXPIRY,
+                ),
+                transport=self.transport,
+            )
+            get_logger().info(f"Cliente HTTP del MCP creado para {self.base_url}")
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
     async def post(
         self,
@@ -25,48 +72,51 @@ class BackendClient:
         data: Dict[str, Any],
         headers: Optional[Dict[str, str]] = None,
         token: Optional[str] = None,
-        api_key: Optional[str] = None
+        api_key: Optional[str] = None,
+        timeout: Optional[float] = None,
     ) -> Dict[str, Any]:
+        import httpx
+
+        logger = get_logger()
         url = f"{self.base_url}{endpoint}"
         request_headers = {**self.default_headers}
 
         if api_key:
             request_headers["X-API-Key"] = api_key
-            logger.info(f"X-API-Key configurada: {api_key[:10]}...{api_key[-5:] if len(api_key) > 15 else ''}")
         elif token:
             request_headers["Authorization"] = f"Bearer {token}"
 
         if headers:
             request_headers.update(headers)
 
+        # El timeout de la herramienta reemplaza el de lectura; la conexión conserva el suyo
+        request_timeout = (
+            httpx.Timeout(timeout, connect=get_settings().MCP_BACKEND_CONNECT_TIMEOUT)
+            if timeout is not None else httpx.USE_CLIENT_DEFAULT
+        )
+
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                logger.info(f"Request POST {url}")
-                logger.info(f"Headers enviados: {list(request_headers.keys())}")
-                logger.info(f"Data: {data}")
-                response = await client.post(
-                    url,
-                    json=data,
-                    headers=request_headers,
-                )
-                logger.info(f"Response {response.status_code}: {response.text[:500]}")
-
-                if response.status_code == 404:
-                    raise NotFoundError("Recurso no encontrado")
-                
-                if response.status_code >= 400:
-                    error_detail = response.text
-                    try:
-                        error_json = response.json()
-                        error_detail = error_json.get("detail", error_json.get("message", error_detail))
-                    except Exception:
-                        pass
-                    raise BackendError(
-                        f"Error del backend: {error_detail}",
-                        status_code=response.status_code
-                    )
-                return response.json()
-        
+            logger.info(f"Request POST {url}")
+            logger.info(f"Headers enviados: {list(request_headers.keys())}")
+            logger.info(f"Data: {data}")
+            response = await self.client.post(
+                url,
+                json=data,
+                headers=request_headers,
+                timeout=request_timeout,
+            )
+            logger.info(f"Response {response.status_code}: {response.text[:500]}")
+
+            if response.status_code >= 400:
+                error_detail = response.text
+                try:
+                    error_json = response.json()
+                    error_detail = error_json.get("detail", error_json.get("message", error_detail))
+                except Exception:
+                    pass
+                raise backend_error(response.status_code, error_detail)
+            return response.json()
+
         except httpx.TimeoutException as e:
             logger.error(f"Timeout al conectar con el backend: {e}")
             raise BackendError("Timeout al conectar con el backend", status_code=408)
@@ -82,8 +132,36 @@ class BackendClient:
             logger.error(f"Error inesperado: {e}")
             raise BackendError("Error inesperado al realizar la peticion", status_code=500)
 
-def get_backend_client() -> BackendClient:
-    """Obtiene una instancia del cliente backend."""
+
+_backend_client: "BackendClient | InProcessBackend | None" = None
+
+
+def get_backend_client() -> "BackendClient | InProcessBackend":
+    """
+    Obtiene el cliente backend del proceso (se crea en la primera llamada): HTTP hacia
+    `BACKEND_BASE_URL` o, con `MCP_DISPATCH=inprocess`, los routers en el propio proceso.
+    """
+    global _backend_client
+    if _backend_client is None and get_settings().MCP_DISPATCH == "inprocess":
+        from app.mcp.dispatch import InProcessBackend
+
+        _backend_client = InProcessBackend()
+    elif _backend_client is None:
+        settings = get_settings()
+        base_url = getattr(settings, "BACKEND_BASE_URL", None) or "http://localhost:9000"
+        _backend_client = BackendClient(base_url=base_url)
+    return _backend_client
+
+
+async def close_backend_client():
+    """Cierra las conexiones del cliente backend (al apagar el servidor MCP)."""
+    global _backend_client
+    if _backend_client is not None:
+        await _backend_client.aclose()
+        _backend_client = None
+
+
+def tool_timeout(tool: str) -> float:
+    """Timeout de lectura de la herramienta `tool` (`MCP_TOOL_TIMEOUTS`) o el general."""
     settings = get_settings()
-    base_url = getattr(settings, "BACKEND_BASE_URL", None) or "http://localhost:9000"
-    return BackendClient(base_url=base_url)
\ No newline at end of file
+    return settings.MCP_TOOL_TIMEOUTS.get(tool, settings.MCP_BACKEND_TIMEOUT)
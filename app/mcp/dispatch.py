@@ -0,0 +1,93 @@
+"""Despacho en proceso de las herramientas MCP (`MCP_DISPATCH=inprocess`)."""
+
+import importlib
+import inspect
+import json
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import anyio
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, ValidationError
+
+from app.mcp.client import backend_error
+from app.mcp.exceptions import BackendError
+from app.utils.v1.AsyncHttpx import http_pool
+from app.utils.v1.LoggerSingleton import logger
+from app.utils.v1.UpstreamPolicy import CircuitOpenError
+
+# Endpoint del backend -> (módulo del router, función del endpoint)
+ROUTES = {
+    "/api/v1/sm/consultar_persona": ("app.api.v1.Integration_SM.app", "consultar_persona"),
+    "/api/v1/sm/consultar_poliza": ("app.api.v1.Integration_SM.app", "consultar_poliza"),
+    "/api/v2/sm/consultar_cotizacion": ("app.api.v2.Integration_SM.app", "consultar_cotizacion"),
+}
+
+
+class InProcessBackend:
+    """
+    Sustituto de `BackendClient` que ejecuta los endpoints de los routers en el propio
+    proceso del servidor MCP: sin serializar, sin la vuelta HTTP por loopback y sin validar
+    la API key. Comparte el pool de upstreams (`http_pool`), las cachés de consultas y la
+    coalescencia con cualquier otra llamada del proceso.
+
+    Los errores se traducen igual que en modo HTTP: `HTTPException` con el código y el
+    `detail` que habría respondido la API, `CircuitOpenError` como 503, la validación como
+    422 y cualquier otra excepción como el 500 de `ErrorHandlingMiddleware`.
+    """
+
+    def __init__(self):
+        self._endpoints: dict[str, tuple[Callable[..., Awaitable[Any]], type[BaseModel]]] = {}
+
+    def _resolve(self, endpoint: str) -> tuple[Callable[..., Awaitable[Any]], type[BaseModel]]:
+        if endpoint not in self._endpoints:
+            module_name, function_name = ROUTES[endpoint]
+            function = getattr(importlib.import_module(module_name), function_name)
+            # Sin `@trusted_response`: se necesita el dict, no la respuesta HTTP ya codificada
+            function = getattr(function, "raw_endpoint", function)
+            model = inspect.signature(function).parameters["request"].annotation
+            self._endpoints[endpoint] = (function, model)
+        return self._endpoints[endpoint]
+
+    async def post(
+        self,
+        endpoint: str,
+        data: Dict[str, Any],
+        headers: Optional[Dict[str, str]] = None,
+        token: Optional[str] = None,
+        api_key: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        if endpoint not in ROUTES:
+            raise backend_error(status.HTTP_404_NOT_FOUND, "Not Found")
+        function, model = self._resolve(endpoint)
+        logger.info(f"Llamada en proceso {endpoint}")
+
+        try:
+            request = model(**data)
+        except ValidationError as e:
+            # Mismo `detail` que el manejador de RequestValidationError, ya pasado por JSON
+            errors = [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)]
+            raise backend_error(status.HTTP_422_UNPROCESSABLE_ENTITY, jsonable_encoder(errors))
+
+        try:
+            with anyio.fail_after(timeout):
+                return await function(request=request, api_key=api_key)
+        except HTTPException as e:
+            if e.status_code < 400:
+                # Fallo de negocio con HTTP 200 del upstream: la API responde ese código con
+                # `{"detail": ...}` y el cliente HTTP lo entrega como resultado
+                return {"detail": e.detail}
+            raise backend_error(e.status_code, e.detail)
+        except CircuitOpenError as e:
+            raise backend_error(status.HTTP_503_SERVICE_UNAVAILABLE, str(e))
+        except TimeoutError as e:
+            logger.error(f"Timeout al conectar con el backend: {e}")
+            raise BackendError("Timeout al conectar con el backend", status_code=408)
+        except Exception as e:
+            logger.exception(f"Error no controlado en POST {endpoint}: {e}")
+            detail = json.dumps({"error": "Error interno del servidor"}, ensure_ascii=False, separators=(",", ":"))
+            raise backend_error(status.HTTP_500_INTERNAL_SERVER_ERROR, detail)
+
+    async def aclose(self):
+        await http_pool.aclose()
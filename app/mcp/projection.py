@@ -0,0 +1,188 @@
+"""Proyección, resumen y paginación de los resultados de las herramientas MCP."""
+
+from typing import Any, Iterable, Optional
+
+from app.mcp.runtime import get_settings
+
+# Campos del modo resumen por herramienta: identificación, estado, fechas y montos
+RESUMENES: dict[str, tuple[str, ...]] = {
+    "consultar_persona": (
+        "persona.cd_persona",
+        "persona.tp_documento",
+        "persona.nu_documento",
+        "persona.nm_primer_nombre",
+        "persona.nm_segundo_nombre",
+        "persona.nm_primer_apellido",
+        "persona.nm_segundo_apellido",
+        "persona.fe_nacimiento",
+    ),
+    "consultar_poliza": (
+        "polizas.nu_poliza",
+        "polizas.cd_entidad",
+        "polizas.cd_area",
+        "polizas.de_moneda",
+        "polizas.fe_emision_poliza",
+        "polizas.certificados.nu_certificado",
+        "polizas.certificados.des_producto",
+        "polizas.certificados.de_plan_pago",
+        "polizas.certificados.de_status_cert",
+        "polizas.certificados.fe_desde_cert",
+        "polizas.certificados.fe_hasta_cert",
+        "polizas.certificados.fe_proxima_facturacion",
+        "polizas.certificados.recibos.cd_recibo",
+        "polizas.certificados.recibos.de_status_recibo",
+        "polizas.certificados.recibos.fe_desde_recibo",
+        "polizas.certificados.recibos.fe_hasta_recibo",
+        "polizas.certificados.recibos.mt_recibo",
+    ),
+    "consultar_cotizacion": (
+        "nu_cotizacion",
+        "cd_entidad",
+        "nu_poliza",
+        "nm_cliente",
+        "de_plan_pago",
+        "de_st_cotizacion",
+        "fe_desde",
+        "fe_hasta",
+        "mt_prima_total",
+        "nu_total_cuota",
+        "bienes.nu_bien",
+        "bienes.de_bien",
+    ),
+}
+
+# Listas que se recorren por páginas (`pagina`/`por_pagina`); el resto solo se recorta
+LISTAS_PAGINADAS: dict[str, frozenset[str]] = {
+    "consultar_poliza": frozenset({"recibos", "cuotas"}),
+}
+
+
+def _field_tree(campos: Iterable[str]) -> dict[str, Any]:
+    """Convierte rutas con puntos en un árbol; `None` conserva el subárbol completo."""
+    tree: dict[str, Any] = {}
+    for campo in campos:
+        node = tree
+        *padres, hoja = campo.strip().split(".")
+        for parte in padres:
+            hijo = node.get(parte, {})
+            if hijo is None:
+                # Ya se pidió el subárbol completo
+                break
+            node = node.setdefault(parte, hijo)
+        else:
+            node[hoja] = None
+    return tree
+
+
+def _project(value: Any, tree: dict[str, Any]) -> Any:
+    if isinstance(value, list):
+        return [_project(item, tree) for item in value]
+    if not isinstance(value, dict):
+        return value
+    result = {}
+    for key, subtree in tree.items():
+        if key in value:
+            result[key] = value[key] if subtree is None else _project(value[key], subtree)
+    return result
+
+
+def project(value: Any, campos: Iterable[str]) -> Any:
+    """
+    Deja en el resultado solo los campos indicados.
+
+    Las rutas usan puntos (`polizas.certificados.recibos.mt_recibo`), las listas se
+    recorren de forma transparente y un prefijo conserva todo su contenido. Se construyen
+    objetos nuevos: el resultado puede venir de una caché y no se modifica.
+
+    Args:
+        value: Resultado de la herramienta
+        campos: Rutas de los campos a conservar
+
+    Returns:
+        Any: El resultado proyectado
+    """
+    return _project(value, _field_tree(campos))
+
+
+def trim_lists(
+    value: Any,
+    max_items: int,
+    paged: frozenset[str] = frozenset(),
+    offset: int = 0,
+    page_size: Optional[int] = None,
+) -> Any:
+    """
+    Recorta las listas del resultado a `max_items` elementos.
+
+    Las listas de `paged` se cortan en `[offset, offset + page_size)`. Cuando una lista no
+    se entrega completa se agrega a su lado `<lista>_total` con el número de elementos.
+
+    Args:
+        value: Resultado (ya proyectado) de la herramienta
+        max_items: Máximo de elementos por lista
+        paged: Nombres de las listas paginadas
+        offset: Primer elemento de la página en las listas paginadas
+        page_size: Elementos por página; por defecto `max_items`
+
+    Returns:
+        Any: El resultado con las listas recortadas
+    """
+    if isinstance(value, list):
+        return [trim_lists(item, max_items, paged, offset, page_size) for item in value[:max_items]]
+    if not isinstance(value, dict):
+        return value
+    result = {}
+    for key, item in value.items():
+        if not isinstance(item, list):
+            result[key] = trim_lists(item, max_items, paged, offset, page_size)
+            continue
+        if key in paged:
+            start, size = offset, page_size or max_items
+        else:
+            start, size = 0, max_items
+        page = item[start:start + size]
+        result[key] = [trim_lists(element, max_items, paged, offset, page_size) for element in page]
+        if len(page) < len(item):
+            result[f"{key}_total"] = len(item)
+    return result
+
+
+def shape_result(
+    tool: str,
+    result: dict[str, Any],
+    campos: Optional[list[str]] = None,
+    resumen: bool = False,
+    pagina: int = 1,
+    por_pagina: Optional[int] = None,
+) -> dict[str, Any]:
+    """
+    Aplica la selección de campos (o el resumen) y el recorte de listas al resultado de
+    una herramienta antes de serializarlo.
+
+    Args:
+        tool: Nombre de la herramienta
+        result: Respuesta del backend
+        campos: Rutas de los campos a devolver; tienen prioridad sobre `resumen`
+        resumen: Devolver solo los campos de `RESUMENES[tool]`
+        pagina: Página (desde 1) de las listas paginadas
+        por_pagina: Elementos por página; por defecto `MCP_RESULT_PAGE_SIZE`
+
+    Returns:
+        dict: El resultado listo para el cliente MCP
+    """
+    if set(result) == {"detail"}:
+        # Fallo de negocio: el mensaje se entrega tal cual
+        return result
+    if campos:
+        result = project(result, campos)
+    elif resumen:
+        result = project(result, RESUMENES.get(tool, ()))
+    settings = get_settings()
+    page_size = min(por_pagina or settings.MCP_RESULT_PAGE_SIZE, settings.MCP_RESULT_MAX_ITEMS)
+    return trim_lists(
+        result,
+        max_items=settings.MCP_RESULT_MAX_ITEMS,
+        paged=LISTAS_PAGINADAS.get(tool, frozenset()),
+        offset=(max(pagina, 1) - 1) * page_size,
+        page_size=page_size,
+    )
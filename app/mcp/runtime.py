@@ -0,0 +1,28 @@
+"""
+Configuración y logger del servidor MCP, cargados en el primer uso.
+
+Importar `app.utils.v1.configs` construye `Settings` y el logger (handlers, carpeta y
+archivo de logs); los clientes stdio reinician el proceso a menudo, así que los módulos
+de `app.mcp` no lo importan al cargarse sino desde estas funciones.
+"""
+
+
+def get_settings():
+    """`Settings` de la aplicación (se construye en la primera llamada)."""
+    from app.utils.v1.configs import get_settings
+
+    return get_settings()
+
+
+def get_logger():
+    """Logger de la aplicación (se configura en la primera llamada)."""
+    from app.utils.v1.LoggerSingleton import logger
+
+    return logger
+
+
+def get_mcp_api_token() -> str:
+    """API key del MCP hacia el backend (`API_TOKEN_MCP`)."""
+    from app.utils.v1.configs import get_mcp_api_token
+
+    return get_mcp_api_token()
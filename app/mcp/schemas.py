@@ -3,8 +3,21 @@ from pydantic import BaseModel, Field, field_validator
 from typing import Optional
 
 
+# Opciones comunes de tamaño del resultado
+class ResultadoInput(BaseModel):
+    campos: Optional[list[str]] = Field(
+        default=None,
+        description="Campos a devolver, con puntos para los anidados (opcional)",
+        examples=[["polizas.nu_poliza", "polizas.certificados.recibos.mt_recibo"]]
+    )
+    resumen: bool = Field(
+        default=False,
+        description="Devolver solo los campos principales (se ignora si se indican campos)"
+    )
+
+
 #Schema de entrada para la consulta de una persona
-class ConsultarPersonaInput(BaseModel):
+class ConsultarPersonaInput(ResultadoInput):
     num_documento: str = Field(
         ...,
         description= "Numero de documento de la persona (Formato: V-, E- o J- seguido de 5 a 30 digitos)",
@@ -24,7 +37,7 @@ class ConsultarPersonaInput(BaseModel):
         return v
 
 # Schema de entrada para la consulta de una cotizacion
-class ConsultarCotizacionInput(BaseModel):
+class ConsultarCotizacionInput(ResultadoInput):
     nu_cotizacion: int = Field(
         ...,
         description="Numero de cotizacion de la poliza",
@@ -51,7 +64,7 @@ class ConsultarCotizacionInput(BaseModel):
             raise ValueError("El codigo de entidad debe ser mayor a 0")
         return v
 
-class ConsultarPolizaInput(BaseModel):
+class ConsultarPolizaInput(ResultadoInput):
     cd_entidad: int = Field(
         ...,
         description= "Codigo de entidad de la poliza",
@@ -77,6 +90,16 @@ class ConsultarPolizaInput(BaseModel):
         description="Numero de recibo (opcional)",
         examples=[1]
     )
+    pagina: int = Field(
+        default=1,
+        ge=1,
+        description="Pagina de recibos y cuotas"
+    )
+    por_pagina: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Recibos y cuotas por pagina (opcional)"
+    )
     
     @field_validator("cd_entidad", "cd_area", "poliza", "certificado")
     @classmethod
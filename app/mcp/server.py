@@ -7,32 +7,60 @@ import sys
 # Los servidores MCP usan stdout para JSON, así que los logs deben ir a stderr y sin colores
 os.environ["MCP_SERVER_MODE"] = "true"
 
+from contextlib import asynccontextmanager
+
 from fastmcp import FastMCP
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
 from typing import Optional
+from app.mcp.client import close_backend_client
+from app.mcp.sessions import SessionConcurrencyMiddleware
 from app.mcp.tools import (
     consultar_persona_handler,
     consultar_cotizacion_handler,
     consultar_poliza_handler,
 )
+from app.mcp.runtime import get_settings
+
+
+@asynccontextmanager
+async def lifespan(server: FastMCP):
+    """
+    Un cliente backend con keep-alive para todo el proceso (se crea en la primera llamada
+    a una herramienta); se cierra al apagar el servidor.
+    """
+    try:
+        yield
+    finally:
+        await close_backend_client()
 
-mcp = FastMCP("Seguros Mercantil MCP Server")
+
+# Configuración, logger y httpx se cargan en la primera llamada, no al importar (arranque en frío)
+session_limits = SessionConcurrencyMiddleware()
+mcp = FastMCP("Seguros Mercantil MCP Server", lifespan=lifespan, middleware=[session_limits])
 
 
 @mcp.tool()
 async def consultar_persona(
     num_documento: str,
+    campos: Optional[list[str]] = None,
+    resumen: bool = False,
 ) -> dict:
     """
     Consulta información de una persona en Seguros Mercantil utilizando su número de documento.
     
     Args:
         num_documento: Número de documento de la persona (formato: V-12345678, E-12345678, P-12345678)
+        campos: Campos a devolver, con puntos para los anidados (ej. persona.nm_primer_nombre)
+        resumen: Devolver solo los datos de identificación de la persona
     
     Returns:
         dict: Respuesta estructurada con la información de la persona
     """
     return await consultar_persona_handler({
         "num_documento": num_documento,
+        "campos": campos,
+        "resumen": resumen,
     })
 
 
@@ -40,6 +68,8 @@ async def consultar_persona(
 async def consultar_cotizacion(
     nu_cotizacion: int,
     cd_entidad: int,
+    campos: Optional[list[str]] = None,
+    resumen: bool = False,
 ) -> dict:
     """
     Consulta información de una cotización en Seguros Mercantil.
@@ -47,6 +77,8 @@ async def consultar_cotizacion(
     Args:
         nu_cotizacion: Número de cotización
         cd_entidad: Código de entidad
+        campos: Campos a devolver, con puntos para los anidados (ej. bienes.de_bien)
+        resumen: Devolver solo el estado, las fechas, la prima y los bienes
     
     Returns:
         dict: Respuesta estructurada con la información de la cotización
@@ -54,6 +86,8 @@ async def consultar_cotizacion(
     return await consultar_cotizacion_handler({
         "nu_cotizacion": nu_cotizacion,
         "cd_entidad": cd_entidad,
+        "campos": campos,
+        "resumen": resumen,
     })
 
 
@@ -63,7 +97,11 @@ async def consultar_poliza(
     cd_area: int,
     poliza: int,
     certificado: int,
-    nu_recibo: Optional[int] = None
+    nu_recibo: Optional[int] = None,
+    campos: Optional[list[str]] = None,
+    resumen: bool = False,
+    pagina: int = 1,
+    por_pagina: Optional[int] = None,
 ) -> dict:
     """
     Consulta información de una póliza en Seguros Mercantil.
@@ -74,6 +112,10 @@ async def consultar_poliza(
         poliza: Número de póliza
         certificado: Número de certificado
         nu_recibo: Número de recibo (opcional)
+        campos: Campos a devolver, con puntos para los anidados (ej. polizas.certificados.recibos.mt_recibo)
+        resumen: Devolver solo los datos principales de la póliza, certificados y recibos
+        pagina: Página de recibos y cuotas (desde 1); `recibos_total` indica cuántos hay
+        por_pagina: Recibos y cuotas por página (por defecto MCP_RESULT_PAGE_SIZE)
     
     Returns:
         dict: Respuesta estructurada con la información de la póliza
@@ -83,11 +125,55 @@ async def consultar_poliza(
         "cd_area": cd_area,
         "poliza": poliza,
         "certificado": certificado,
+        "campos": campos,
+        "resumen": resumen,
+        "pagina": pagina,
+        "por_pagina": por_pagina,
     }
     if nu_recibo is not None:
         args["nu_recibo"] = nu_recibo
     return await consultar_poliza_handler(args)
 
 
+def create_http_app() -> Starlette:
+    """
+    Aplicación ASGI del transporte streamable-HTTP: un proceso atiende muchas sesiones
+    MCP con el mismo cliente backend, pool de upstreams y cachés.
+
+    Returns:
+        Starlette: La aplicación, protegida con el token Bearer de `verify_mcp_token`
+    """
+    # FastAPI solo se necesita para autenticar el transporte HTTP
+    from app.mcp.auth import MCPTokenMiddleware
+
+    settings = get_settings()
+    return mcp.http_app(
+        path=settings.MCP_HTTP_PATH,
+        middleware=[Middleware(MCPTokenMiddleware)],
+        session_idle_timeout=settings.MCP_SESSION_IDLE_TIMEOUT,
+    )
+
+
+def run(transport: Optional[str] = None):
+    """
+    Ejecuta el servidor MCP con el transporte indicado.
+
+    Args:
+        transport: `stdio` (un proceso por cliente) o `http` (MCP_HTTP_HOST:MCP_HTTP_PORT);
+            por defecto MCP_TRANSPORT
+    """
+    transport = transport or get_settings().MCP_TRANSPORT
+    if transport == "http":
+        import uvicorn
+        from app.utils.v1.configs import get_mcp_local_token
+
+        # Sin MCP_LOCAL_TOKEN ninguna petición podría autenticarse: fallar al arrancar
+        get_mcp_local_token()
+        settings = get_settings()
+        uvicorn.run(create_http_app(), host=settings.MCP_HTTP_HOST, port=settings.MCP_HTTP_PORT)
+    else:
+        mcp.run()
+
+
 if __name__ == "__main__":
-    mcp.run()
+    run()
\ No newline at end of file
@@ -0,0 +1,62 @@
+"""Límite de llamadas concurrentes por sesión MCP."""
+
+from typing import Any, Optional
+
+import anyio
+from fastmcp.server.dependencies import get_http_request
+from fastmcp.server.middleware import CallNext, Middleware, MiddlewareContext
+
+from app.mcp.runtime import get_settings
+
+HTTP_TRANSPORTS = ("streamable-http", "sse")
+
+
+def _session_key(context: MiddlewareContext) -> str:
+    ctx = context.fastmcp_context
+    if ctx is None or ctx.transport not in HTTP_TRANSPORTS:
+        return ""
+    request = get_http_request()
+    session_id = request.headers.get("mcp-session-id")
+    if session_id:
+        return session_id
+    return request.client.host if request.client else ""
+
+
+class SessionConcurrencyMiddleware(Middleware):
+    """
+    Limita las llamadas a herramientas en curso de cada sesión MCP.
+
+    Con el transporte HTTP un solo proceso atiende a todos los clientes; sin límite, una
+    sesión que lanza muchas llamadas a la vez ocupa todas las conexiones del backend. Las
+    llamadas que exceden el límite esperan su turno dentro de la misma sesión y no
+    afectan a las demás. El limitador de una sesión se descarta cuando no tiene llamadas.
+
+    La sesión HTTP se identifica por la cabecera `mcp-session-id`; los clientes del
+    protocolo sin sesiones (2026-07-28) no la envían y se agrupan por dirección de origen.
+    Con stdio el proceso atiende a un único cliente y todas sus llamadas comparten el
+    mismo límite.
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None):
+        # Sin valor: MCP_SESSION_MAX_CONCURRENCY, leído en la primera llamada
+        self.max_concurrency = max_concurrency
+        # session_id -> [limitador, llamadas que lo usan]
+        self._limiters: dict[str, list[Any]] = {}
+
+    def active_sessions(self) -> int:
+        """Sesiones con llamadas en curso o en espera."""
+        return len(self._limiters)
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next: CallNext) -> Any:
+        if self.max_concurrency is None:
+            self.max_concurrency = get_settings().MCP_SESSION_MAX_CONCURRENCY
+        session_id = _session_key(context)
+        entry = self._limiters.setdefault(session_id, [anyio.CapacityLimiter(self.max_concurrency), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                return await call_next(context)
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._limiters[session_id]
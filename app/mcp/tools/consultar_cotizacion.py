@@ -1,7 +1,8 @@
 from typing import Any
 from app.mcp.schemas import ConsultarCotizacionInput
-from app.mcp.client import get_backend_client
-from app.utils.v1.configs import get_mcp_api_token
+from app.mcp.client import get_backend_client, tool_timeout
+from app.mcp.projection import shape_result
+from app.mcp.runtime import get_mcp_api_token
 
 
 # Schema JSON para la herramienta
@@ -17,6 +18,15 @@ CONSULTAR_COTIZACION_SCHEMA = {
             "type": "integer",
             "description": "Código de entidad",
             "minimum": 1
+        },
+        "campos": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "Campos a devolver, con puntos para los anidados (opcional)"
+        },
+        "resumen": {
+            "type": "boolean",
+            "description": "Devolver solo los campos principales"
         }
     },
     "required": ["nu_cotizacion", "cd_entidad"]
@@ -39,8 +49,9 @@ async def consultar_cotizacion_handler(arguments: dict[str, Any]) -> dict[str, A
     response = await client.post(
         endpoint="/api/v2/sm/consultar_cotizacion",
         data=backend_data,
-        api_key=api_token
+        api_key=api_token,
+        timeout=tool_timeout("consultar_cotizacion"),
     )
 
-    # Devolver directamente los datos (FastMCP maneja los errores con excepciones)
-    return response
\ No newline at end of file
+    # Proyectar y recortar antes de serializar (FastMCP maneja los errores con excepciones)
+    return shape_result("consultar_cotizacion", response, input_data.campos, input_data.resumen)
\ No newline at end of file
@@ -1,7 +1,8 @@
 from typing import Any
 from app.mcp.schemas import ConsultarPersonaInput
-from app.mcp.client import get_backend_client
-from app.utils.v1.configs import get_mcp_api_token
+from app.mcp.client import get_backend_client, tool_timeout
+from app.mcp.projection import shape_result
+from app.mcp.runtime import get_mcp_api_token
 
 
 # Schema JSON para la herramienta
@@ -12,6 +13,15 @@ CONSULTAR_PERSONA_SCHEMA = {
             "type": "string",
             "description": "Número de documento de la persona (formato: V-12345678, E-12345678, P-12345678)",
             "pattern": "^[VEP]-\\d{5,30}$"
+        },
+        "campos": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "Campos a devolver, con puntos para los anidados (opcional)"
+        },
+        "resumen": {
+            "type": "boolean",
+            "description": "Devolver solo los campos principales"
         }
     },
     "required": ["num_documento"]
@@ -33,8 +43,11 @@ async def consultar_persona_handler(arguments: dict[str, Any]) -> dict[str, Any]
     response = await client.post(
         endpoint="/api/v1/sm/consultar_persona",
         data=backend_data,
-        api_key=api_token  
+        api_key=api_token,
+        timeout=tool_timeout("consultar_persona"),
     )
 
-    # Devolver directamente los datos (FastMCP maneja los errores con excepciones)
-    return response
\ No newline at end of file
+    # El backend devuelve la lista de personas; la herramienta declara un objeto
+    # (FastMCP maneja los errores con excepciones)
+    result = response if isinstance(response, dict) else {"persona": response}
+    return shape_result("consultar_persona", result, input_data.campos, input_data.resumen)
\ No newline at end of file
@@ -1,7 +1,8 @@
 from typing import Any
 from app.mcp.schemas import ConsultarPolizaInput
-from app.mcp.client import get_backend_client
-from app.utils.v1.configs import get_mcp_api_token
+from app.mcp.client import get_backend_client, tool_timeout
+from app.mcp.projection import shape_result
+from app.mcp.runtime import get_mcp_api_token
 
 # Schema JSON para la herramienta
 CONSULTAR_POLIZA_SCHEMA = {
@@ -31,6 +32,25 @@ CONSULTAR_POLIZA_SCHEMA = {
             "type": "integer",
             "description": "Número de recibo (opcional)",
             "minimum": 1
+        },
+        "campos": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "Campos a devolver, con puntos para los anidados (opcional)"
+        },
+        "resumen": {
+            "type": "boolean",
+            "description": "Devolver solo los campos principales"
+        },
+        "pagina": {
+            "type": "integer",
+            "description": "Página de recibos y cuotas",
+            "minimum": 1
+        },
+        "por_pagina": {
+            "type": "integer",
+            "description": "Recibos y cuotas por página (opcional)",
+            "minimum": 1
         }
     },
     "required": ["cd_entidad", "cd_area", "poliza", "certificado"]
@@ -58,8 +78,17 @@ async def consultar_poliza_handler(arguments: dict[str, Any]) -> dict[str, Any]:
     response = await client.post(
         endpoint="/api/v1/sm/consultar_poliza",
         data=backend_data,
-        api_key=api_token
+        api_key=api_token,
+        timeout=tool_timeout("consultar_poliza"),
     )
 
-    # Devolver directamente los datos (FastMCP maneja los errores con excepciones)
-    return response
\ No newline at end of file
+    # Proyectar, paginar los recibos y cuotas y recortar antes de serializar
+    # (FastMCP maneja los errores con excepciones)
+    return shape_result(
+        "consultar_poliza",
+        response,
+        input_data.campos,
+        input_data.resumen,
+        pagina=input_data.pagina,
+        por_pagina=input_data.por_pagina,
+    )
\ No newline at end of file
@@ -1,26 +1,49 @@
+import inspect
+
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 
 from app import middlewares
+from app.utils.v1.configs import REQUEST_LOGGING
 from app.utils.v1.constants import CORS_CONFIG
 
 # from starlette_csrf import CSRFMiddleware
 
 
 
+def gzip_exclusions() -> dict:
+    """
+    Los PDF ya vienen comprimidos: se excluyen de GZip cuando la versión de Starlette
+    permite configurar los content-types excluidos.
+    """
+    if "exclude_content_types" not in inspect.signature(GZipMiddleware.__init__).parameters:
+        return {}
+    from starlette.middleware.gzip import DEFAULT_EXCLUDED_CONTENT_TYPES
+
+    return {"exclude_content_types": DEFAULT_EXCLUDED_CONTENT_TYPES + ("application/pdf",)}
+
+
 def configure_middleware(app):
-    """Configure middleware for the FastAPI app."""
+    """
+    Configure middleware for the FastAPI app.
+
+    El último agregado es el más externo. Los middlewares propios son ASGI puros (sin
+    `BaseHTTPMiddleware`), así que no agregan una tarea por petición ni rompen los streaming.
+    """
+    # El más interno: los errores no controlados llegan como 500 JSON al resto de la cadena
+    app.add_middleware(middlewares.ErrorHandlingMiddleware)
     app.add_middleware(CORSMiddleware, **CORS_CONFIG)
     app.add_middleware(
-        GZipMiddleware, minimum_size=1000
+        GZipMiddleware, minimum_size=1000, **gzip_exclusions()
     )  # Compress responses larger than 1000 bytes
+    if REQUEST_LOGGING:
+        app.add_middleware(middlewares.LoggingMiddleware)
+    app.add_middleware(middlewares.ProcessTimeHeaderMiddleware)
+    # Mide también CORS y GZip
+    app.add_middleware(middlewares.MetricsMiddleware)
 
 
     # app.add_middleware(CSRFMiddleware, secret="__CHANGE_ME__")
-    # Los middlewares personalizados
-    #app.add_middleware(middlewares.ErrorHandlingMiddleware)
-    #app.add_middleware(middlewares.LoggingMiddleware)
-    # app.add_middleware(middlewares.ProcessTimeHeaderMiddleware)
     # if ENV in ["production", "staging"]:
         # app.add_middleware(TrustedHostMiddleware, allowed_hosts=ALLOWED_HOST)
         #app.add_middleware(HTTPSRedirectMiddleware)
@@ -1,12 +1,38 @@
-from fastapi import Request
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from app.utils.v2.LoggerSingletonDB import logger
+
+
+class ErrorHandlingMiddleware:
+    """
+    Middleware ASGI que convierte las excepciones no controladas en una respuesta JSON 500
+    `{"error": "Error interno del servidor"}`; el detalle de la excepción solo va al log.
+    Si la respuesta ya comenzó a enviarse (p. ej. un streaming) no se puede reemplazar y la
+    excepción se propaga.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = False
+
+        async def send_wrapper(message: Message):
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
 
-class ErrorHandlingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
         try:
-            response = await call_next(request)
+            await self.app(scope, receive, send_wrapper)
         except Exception as e:
-            response = JSONResponse({"error": str(e)}, status_code=500)
-        return response
+            if started:
+                raise
+            logger.exception(f"Error no controlado en {scope['method']} {scope['path']}: {e}")
+            response = JSONResponse({"error": "Error interno del servidor"}, status_code=500)
+            await response(scope, receive, send)
@@ -1,13 +1,25 @@
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-
+from starlette.datastructures import URL
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.utils.v2.LoggerSingletonDB import logger
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        logger.info(f"Request: {request.method} {request.url}")
-        response = await call_next(request)
-        logger.info(f"Response: {response}")
-        logger.info(f"Response status: {response.status_code}")
-        return response
+
+class LoggingMiddleware:
+    """Middleware ASGI que registra cada petición y el código de su respuesta."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        logger.info(f"Request: {scope['method']} {URL(scope=scope)}")
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                logger.info(f"Response status: {message['status']}")
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,62 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.utils.v1.Metrics import http_request_duration, http_requests_in_flight, track_in_flight
+
+# Las rutas que no existen se agrupan para no crear una serie por cada URL desconocida
+UNMATCHED_ROUTE = "__unmatched__"
+
+# Prefijo con el que se montó cada ruta de los routers versionados (FastAPI deja en el
+# scope la ruta original del router, cuya plantilla no incluye el prefijo)
+_route_prefixes: dict[int, str] = {}
+
+
+def register_router_prefix(router, prefix: str):
+    """Registra el prefijo de montaje de las rutas de `router` para etiquetar las métricas."""
+    for route in router.routes:
+        _route_prefixes[id(route)] = prefix
+
+
+def route_label(scope: Scope) -> str:
+    """Plantilla completa de la ruta resuelta (p. ej. `/api/v1/sm/consultar_poliza`)."""
+    route = scope.get("route")
+    path = getattr(route, "path_format", None) or getattr(route, "path", None)
+    if path is None:
+        return UNMATCHED_ROUTE
+    return _route_prefixes.get(id(route), "") + path
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI que mide la duración real (reloj de pared) de cada petición, etiquetada
+    con la plantilla de la ruta, el método y el código de respuesta, y las peticiones en
+    curso. A diferencia de `ProcessTimeHeaderMiddleware` incluye la espera a los upstreams.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        with track_in_flight(http_requests_in_flight, method):
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                # el router deja la ruta resuelta en el scope
+                http_request_duration.observe(
+                    method, route_label(scope), str(status_code), value=time.perf_counter() - started
+                )
@@ -1,15 +1,33 @@
 import time
 
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.utils.v2.LoggerSingletonDB import logger
 
-class ProcessTimeHeaderMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.process_time()
-        response = await call_next(request)
-        process_time = (time.process_time() - start_time) * 10**3
-        response.headers["X-Process-Time"] = str(process_time)
-        logger.info(f"Response Process Time: {str(process_time)} ms")
-        return response
+
+class ProcessTimeHeaderMiddleware:
+    """
+    Middleware ASGI que agrega `X-Process-Time` (milisegundos de reloj de pared, incluida
+    la espera a los upstreams) hasta el inicio de la respuesta. En un streaming el encabezado
+    refleja el tiempo hasta el primer byte.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                process_time = (time.perf_counter() - start_time) * 10**3
+                MutableHeaders(scope=message).append("X-Process-Time", str(process_time))
+                logger.debug(f"Response Process Time: {str(process_time)} ms")
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
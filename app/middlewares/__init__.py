@@ -1,5 +1,6 @@
 from app.middlewares.ErrorMiddleware import ErrorHandlingMiddleware
 from app.middlewares.LoggingMiddleware import LoggingMiddleware
+from app.middlewares.MetricsMiddleware import MetricsMiddleware
 from app.middlewares.ProcessTimeHeaderMiddleware import \
     ProcessTimeHeaderMiddleware
 from app.middlewares.verify_api_key import APIKeyVerifier
@@ -7,6 +8,7 @@ from app.middlewares.verify_api_key import APIKeyVerifier
 __all__ = [
     "ErrorHandlingMiddleware",
     "LoggingMiddleware",
+    "MetricsMiddleware",
     "APIKeyVerifier",
     "ProcessTimeHeaderMiddleware",
 ]
\ No newline at end of file
@@ -478,6 +478,11 @@ class TasaBCVBase(BaseModel):
     def validate_fe_tasa(cls, value):
         if not cls.fecha_regex.match(value):
             raise ValueError('El formato de fe_tasa debe ser dd/mm/yyyy')
+        # El formato no basta: la vigencia en caché se calcula con la fecha (p. ej. 31/02)
+        try:
+            datetime.strptime(value, "%d/%m/%Y")
+        except ValueError:
+            raise ValueError('fe_tasa no es una fecha valida')
         return value
 
 
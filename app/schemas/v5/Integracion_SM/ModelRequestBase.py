@@ -111,6 +111,17 @@ class CrearPolizaBase(BaseModel):
     beneficiarios: Optional[List[BeneficiariosBase]] = []
 
 
+class CotizacionLoteBase(BaseModel):
+    """
+    Lote de cotizaciones para un mismo titular.
+
+    Attributes:
+        variantes (List[CrearPolizaBase]): Combinaciones a cotizar (plan, hijos, conyuge,
+            padres, frecuencia de cuota...).
+    """
+    variantes: List[CrearPolizaBase] = Field(..., min_length=1)
+
+
 class DatosPolizaBase(BaseModel):
     cd_entidad: int
     cd_area: int
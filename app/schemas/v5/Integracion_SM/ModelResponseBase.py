@@ -0,0 +1,24 @@
+from typing import Any, List, Optional
+
+from pydantic import BaseModel
+
+
+class CotizacionLoteItem(BaseModel):
+    """
+    Resultado de una variante del lote.
+
+    Attributes:
+        indice (int): Posición de la variante en la petición.
+        status_code (int): 200 si se cotizó; si no, el código con que habría fallado
+            `/crear_cotizacion_global`.
+        cotizacion (Any): Cotización devuelta por el upstream.
+        detail (Any): Motivo del fallo.
+    """
+    indice: int
+    status_code: int
+    cotizacion: Optional[Any] = None
+    detail: Optional[Any] = None
+
+
+class CotizacionLoteResponse(BaseModel):
+    resultados: List[CotizacionLoteItem]
@@ -1,29 +1,255 @@
+import time
+from urllib.parse import urlsplit
+
+import anyio
 import httpx
-#from tenacity import retry, wait_fixed, stop_after_attempt, retry_if_exception_type
+from tenacity import AsyncRetrying
+
+from app.utils.v1.configs import (
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP2_ENABLED,
+)
+from app.utils.v1.constants import UNVERIFIED_TLS_URLS, UPSTREAM_POLICIES
+from app.utils.v1.LoggerSingleton import logger
+from app.utils.v1.Metrics import observe_upstream, track_in_flight, upstream_requests_in_flight
+from app.utils.v1.UpstreamPolicy import DEFAULT_POLICY, UpstreamPolicy, get_breaker
+
+
+def http2_available() -> bool:
+    """
+    Indica si se puede negociar HTTP/2: requiere `HTTP2_ENABLED` y el paquete opcional `h2`
+    (se instala con `httpx[http2]`).
+    """
+    if not HTTP2_ENABLED:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logger.warning("HTTP2_ENABLED=true pero el paquete 'h2' no está instalado; se usará HTTP/1.1")
+        return False
+    return True
+
+
+def build_limits() -> httpx.Limits:
+    """Límites del pool de conexiones configurados en Settings."""
+    return httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+    )
+
+
+def upstream_key(url: str, verify: bool = True) -> tuple[str, bool]:
+    """Clave del pool: esquema + host (+ puerto) del upstream y si se verifica TLS."""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}", verify
+
+
+def upstream_hosts() -> list[tuple[str, bool]]:
+    """
+    Hosts distintos de los upstreams declarados en `UPSTREAM_POLICIES`, con su opción de
+    verificación TLS, en el formato de `upstream_key`. Omite las URLs sin host configurado.
+    """
+    hosts = {}
+    for url in UPSTREAM_POLICIES:
+        key = upstream_key(url, url not in UNVERIFIED_TLS_URLS)
+        if urlsplit(key[0]).netloc:
+            hosts.setdefault(key, None)
+    return list(hosts)
+
+
+class AsyncHttpClientPool:
+    """
+    Mantiene un `httpx.AsyncClient` reutilizable por cada host upstream dentro del worker.
+
+    Los clientes se crean de forma perezosa la primera vez que se usa un host, de modo que
+    las conexiones TCP/TLS abiertas hacia el gateway APIM de Seguros Mercantil se reutilizan
+    (keep-alive) entre peticiones. El cierre se hace en el lifespan de `app.api.app`.
+
+    Attributes:
+        clients (dict): Clientes abiertos indexados por (host, verify).
+    """
+
+    def __init__(self):
+        self.clients: dict[tuple[str, bool], httpx.AsyncClient] = {}
+
+    def get(self, url: str, verify: bool = True) -> httpx.AsyncClient:
+        """
+        Devuelve el cliente compartido para el host de `url`, creándolo si no existe.
+
+        Args:
+            url (str): URL completa del upstream.
+            verify (bool): Verificar el certificado TLS (PasarelaPagoMS usa `False`).
+
+        Returns:
+            httpx.AsyncClient: Cliente con pool de conexiones para ese host.
+        """
+        key = upstream_key(url, verify)
+        client = self.clients.get(key)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                base_url=key[0],
+                verify=verify,
+                http2=http2_available(),
+                limits=build_limits(),
+                timeout=None,
+            )
+            self.clients[key] = client
+            logger.info(f"Cliente HTTP async creado para {key[0]} (verify={verify})")
+        return client
+
+    async def warm(self, url: str, verify: bool = True, connections: int = 1, timeout: float = 5.0) -> int:
+        """
+        Abre `connections` conexiones keep-alive hacia el host de `url` (DNS, TCP y TLS)
+        con peticiones `HEAD /` concurrentes; el código de respuesta no importa.
+
+        Returns:
+            int: Conexiones que se lograron abrir.
+        """
+        client = self.get(url, verify)
+        root = f"{upstream_key(url, verify)[0]}/"
+        opened = 0
+
+        async def open_connection():
+            nonlocal opened
+            try:
+                await client.request("HEAD", root, timeout=timeout)
+                opened += 1
+            except httpx.HTTPError as e:
+                logger.warning(f"No se pudo precalentar la conexión a {root}: {e!r}")
+
+        async with anyio.create_task_group() as tg:
+            for _ in range(connections):
+                tg.start_soon(open_connection)
+        return opened
+
+    async def aclose(self):
+        """Cierra todos los clientes abiertos (se invoca al apagar el worker)."""
+        for key, client in list(self.clients.items()):
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"Error cerrando cliente HTTP async {key[0]}: {e}")
+        self.clients.clear()
+
+    def connection_stats(self) -> dict[tuple[str, str], int]:
+        """
+        Conexiones abiertas por host y estado (`active` / `idle`), leídas del pool de
+        httpcore de cada cliente (para métricas).
+        """
+        stats = {}
+        for (host, _), client in self.clients.items():
+            pool = getattr(getattr(client, "_transport", None), "_pool", None)
+            for connection in getattr(pool, "connections", ()):
+                state = "idle" if connection.is_idle() else "active"
+                stats[(host, state)] = stats.get((host, state), 0) + 1
+        return stats
+
+
+http_pool = AsyncHttpClientPool()
 
 
 async def get_client():
-    # create a new client for each request
-    async with httpx.AsyncClient() as client:
-        # yield the client to the endpoint function
-        yield client
-        # close the client when the request is done
-
-
-
-#@retry(wait=wait_fixed(2), stop=stop_after_attempt(3), retry=retry_if_exception_type(httpx.RequestError))
-async def fetch_url(method: str, url: str, headers: dict = None, payload: dict = None):
-    async with httpx.AsyncClient() as client:
-        if method.upper() == 'GET':
-            response = await client.get(url, headers=headers,timeout=None)
-        elif method.upper() == 'POST':
-            response = await client.post(url, headers=headers, json=payload,timeout=None)
-        elif method.upper() == 'PUT':
-            response = await client.put(url, headers=headers, json=payload,timeout=None)
-        elif method.upper() == 'DELETE':
-            response = await client.delete(url, headers=headers, json=payload,timeout=None)
-        else:
-            raise ValueError("Unsupported HTTP method")
+    # entrega el pool compartido; los clientes viven mientras viva el worker
+    yield http_pool
+
+
+
+def get_policy(url: str) -> UpstreamPolicy:
+    """Política declarada en `constants.UPSTREAM_POLICIES` para la URL (o la política por defecto)."""
+    return UPSTREAM_POLICIES.get(url, DEFAULT_POLICY)
+
+
+async def _send(client: httpx.AsyncClient, method: str, url: str, headers: dict, payload: dict, timeout):
+    if method == 'GET':
+        return await client.get(url, headers=headers, timeout=timeout)
+    elif method == 'POST':
+        return await client.post(url, headers=headers, json=payload, timeout=timeout)
+    elif method == 'PUT':
+        return await client.put(url, headers=headers, json=payload, timeout=timeout)
+    elif method == 'DELETE':
+        return await client.request('DELETE', url, headers=headers, json=payload, timeout=timeout)
+    raise ValueError("Unsupported HTTP method")
 
-        #response.raise_for_status()  # Raise an exception for 4xx and 5xx statuses
+
+async def fetch_url(method: str, url: str, headers: dict = None, payload: dict = None, verify: bool = True):
+    """
+    Llama al upstream aplicando la política declarada para la URL: timeouts de conexión y
+    lectura, circuit breaker y, solo para lecturas idempotentes, reintentos con jitter.
+
+    Raises:
+        CircuitOpenError: Si el circuito del upstream está abierto.
+        httpx.HTTPError: Errores de transporte o timeouts tras agotar los intentos.
+    """
+    method = method.upper()
+    if method not in ('GET', 'POST', 'PUT', 'DELETE'):
+        raise ValueError("Unsupported HTTP method")
+
+    policy = get_policy(url)
+    breaker = get_breaker(policy)
+    client = http_pool.get(url, verify)
+
+    async def attempt():
+        breaker.before_call()
+        started = time.perf_counter()
+        try:
+            response = await _send(client, method, url, headers, payload, policy.timeout)
+        except httpx.TransportError as e:
+            breaker.record_failure()
+            observe_upstream(policy.name, started, type(e).__name__)
+            logger.warning(f"Upstream {policy.name}: {type(e).__name__} {e}")
+            raise
+        except BaseException:
+            # p. ej. cancelación del request: no es un fallo del upstream
+            breaker.release_probe()
+            raise
+        observe_upstream(policy.name, started, response.status_code)
+        if response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
         return response
+
+    with track_in_flight(upstream_requests_in_flight, policy.name):
+        if policy.attempts == 1:
+            return await attempt()
+        return await AsyncRetrying(**policy.retry_kwargs())(attempt)
+
+
+async def open_stream(method: str, url: str, headers: dict = None, payload: dict = None, verify: bool = True):
+    """
+    Igual que `fetch_url` pero sin leer el cuerpo: devuelve la respuesta abierta en modo
+    streaming para consumirla por partes (`aiter_bytes`). No se reintenta, porque el cuerpo
+    se entrega al cliente a medida que llega. El llamador debe cerrarla con `aclose()`.
+
+    Raises:
+        CircuitOpenError: Si el circuito del upstream está abierto.
+        httpx.HTTPError: Errores de transporte o timeouts al abrir la respuesta.
+    """
+    method = method.upper()
+    policy = get_policy(url)
+    breaker = get_breaker(policy)
+    client = http_pool.get(url, verify)
+    request = client.build_request(method, url, headers=headers, json=payload, timeout=policy.timeout)
+
+    breaker.before_call()
+    started = time.perf_counter()
+    try:
+        response = await client.send(request, stream=True)
+    except httpx.TransportError as e:
+        breaker.record_failure()
+        observe_upstream(policy.name, started, type(e).__name__)
+        logger.warning(f"Upstream {policy.name}: {type(e).__name__} {e}")
+        raise
+    except BaseException:
+        breaker.release_probe()
+        raise
+    # en streaming se mide hasta recibir los encabezados
+    observe_upstream(policy.name, started, response.status_code)
+    if response.status_code >= 500:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    return response
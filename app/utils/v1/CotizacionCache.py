@@ -0,0 +1,146 @@
+import copy
+import hashlib
+import json
+from datetime import datetime, time, timedelta
+from typing import Any, Awaitable, Callable
+
+from app.utils.v1.configs import COTIZACION_CACHE_MAXSIZE, COTIZACION_CACHE_TTL
+from app.utils.v1.constants import VET
+from app.utils.v1.LookupCache import SHARED_LOCAL_TTL
+from app.utils.v1.ResponseCache import ResponseCache, register_cache, shared_backend
+
+# Header con el que el cliente pide una cotización nueva (la respuesta reemplaza la cacheada)
+BYPASS_HEADER = "X-Cache-Bypass"
+
+# Nombres que quedan fuera de la clave. Los documentos del titular y del contratante sí
+# forman parte de ella: `cotizarglobal` registra la cotización a nombre de esa persona y
+# su `nu_cotizacion` es el que usan después los flujos de emisión, así que una entrada
+# nunca se comparte entre identidades distintas
+_CAMPOS_EXCLUIDOS = frozenset({
+    "nm_cliente",
+    "nm_primer_nombre",
+    "nm_primer_apellido",
+})
+
+# La cotización devuelta incluye `de_bien` (el nombre enviado en coll_bienes), por eso la
+# caché se trata como sensible: solo se comparte entre workers cifrada. Con almacén
+# compartido la copia local dura poco, para que una emisión en otro worker se vea pronto
+_shared = shared_backend("crear_cotizacion", sensitive=True)
+cotizacion_cache = register_cache(ResponseCache(
+    "crear_cotizacion",
+    maxsize=COTIZACION_CACHE_MAXSIZE,
+    shared=_shared,
+    local_ttl=SHARED_LOCAL_TTL if _shared is not None else None,
+))
+
+
+def _sin_identificacion(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: _sin_identificacion(item) for key, item in value.items() if key not in _CAMPOS_EXCLUIDOS}
+    if isinstance(value, list):
+        return [_sin_identificacion(item) for item in value]
+    return value
+
+
+def cotizacion_key(version: str, payload: dict) -> str:
+    """
+    Clave de una cotización: hash canónico de `coll_datos`, `coll_generales` y
+    `coll_grpaseg` del payload ya construido, con los documentos pero sin los nombres.
+
+    Args:
+        version (str): Versión del endpoint (v3, v4, v5); cada una arma el payload distinto.
+        payload (dict): Payload de `cotizarglobal`.
+
+    Returns:
+        str: `<version>:<sha256>`.
+    """
+    canonical = {
+        "funcionalidad": payload.get("funcionalidad"),
+        **{coll: _sin_identificacion(payload.get(coll)) for coll in ("coll_datos", "coll_generales", "coll_grpaseg")},
+    }
+    digest = hashlib.sha256(json.dumps(canonical, sort_keys=True, default=str).encode()).hexdigest()
+    return f"{version}:{digest}"
+
+
+def cotizacion_ttl(now: datetime | None = None) -> float:
+    """
+    Vigencia de una cotización en caché. La tarifa se calcula con la edad a la fecha de la
+    cotización, así que una entrada nunca pasa del fin del día en Venezuela; dentro del día
+    se acota a `COTIZACION_CACHE_TTL` por si cambia la tarifa.
+
+    Args:
+        now (datetime | None): Momento actual (para pruebas); por defecto la hora de Venezuela.
+
+    Returns:
+        float: Segundos de vigencia.
+    """
+    now = now or datetime.now(VET)
+    fin_del_dia = datetime.combine(now.date() + timedelta(days=1), time.min, tzinfo=now.tzinfo)
+    return min(COTIZACION_CACHE_TTL, (fin_del_dia - now).total_seconds())
+
+
+def _indice(nu_cotizacion: Any) -> str:
+    """Entrada que apunta de un `nu_cotizacion` a la clave de la cotización que lo devolvió."""
+    return f"nu_cotizacion:{nu_cotizacion}"
+
+
+def _nu_cotizaciones(cotizacion: Any) -> list:
+    items = cotizacion if isinstance(cotizacion, list) else [cotizacion]
+    return [item["nu_cotizacion"] for item in items if isinstance(item, dict) and item.get("nu_cotizacion") is not None]
+
+
+def _personalizar(cotizacion: Any, payload: dict) -> Any:
+    # Una entrada puede venir de otra petición del mismo documento con el nombre escrito
+    # de otra forma: `de_bien` se toma del payload de esta petición
+    nombres = {str(bien.get("nu_bien")): bien.get("de_bien") for bien in payload["coll_bienes"]["bienes"]}
+    cotizacion = copy.deepcopy(cotizacion)
+    for item in cotizacion if isinstance(cotizacion, list) else [cotizacion]:
+        if not isinstance(item, dict):
+            continue
+        for bien in item.get("bienes") or []:
+            nombre = nombres.get(str(bien.get("nu_bien")))
+            if nombre is not None:
+                bien["de_bien"] = nombre
+    return cotizacion
+
+
+async def cached_cotizacion(version: str, payload: dict, loader: Callable[[], Awaitable[Any]],
+                            bypass: bool = False) -> Any:
+    """
+    Devuelve la cotización cacheada para `payload` o la obtiene con `loader`.
+
+    Los errores del upstream no se cachean. Con `bypass` se consulta siempre al upstream y
+    el resultado reemplaza la entrada.
+
+    Args:
+        version (str): Versión del endpoint (parte de la clave).
+        payload (dict): Payload de `cotizarglobal` ya construido.
+        loader: Corrutina sin argumentos que llama al upstream.
+        bypass (bool): Valor del header `X-Cache-Bypass`.
+    """
+    key = cotizacion_key(version, payload)
+    ttl = cotizacion_ttl()
+
+    async def load():
+        cotizacion = await loader()
+        # Al emitir se busca la entrada por su `nu_cotizacion` (ver `invalidate_cotizacion`)
+        for nu_cotizacion in _nu_cotizaciones(cotizacion):
+            await cotizacion_cache.set(_indice(nu_cotizacion), key, ttl)
+        return cotizacion
+
+    if bypass:
+        cotizacion = await cotizacion_cache.refresh(key, load, ttl=ttl)
+    else:
+        cotizacion = await cotizacion_cache.get_or_load(key, load, ttl=ttl)
+    return _personalizar(cotizacion, payload)
+
+
+async def invalidate_cotizacion(nu_cotizacion: Any):
+    """
+    Descarta la cotización cacheada que devolvió `nu_cotizacion`. Se invoca al emitirla:
+    una cotización emitida no se puede volver a entregar.
+    """
+    key = await cotizacion_cache.get(_indice(nu_cotizacion))
+    if key is not None:
+        await cotizacion_cache.invalidate(key=key)
+    await cotizacion_cache.delete(_indice(nu_cotizacion))
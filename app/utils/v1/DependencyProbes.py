@@ -0,0 +1,127 @@
+import time
+from typing import Awaitable, Callable
+
+import anyio
+import httpx
+
+from app.utils.v1.AsyncHttpx import http_pool, upstream_hosts
+from app.utils.v1.configs import CACHE_BACKEND, PROBE_CRITICAL_HOSTS, PROBE_INTERVAL, PROBE_TIMEOUT
+from app.utils.v1.LoggerSingleton import logger
+
+UP = "up"
+DOWN = "down"
+UNKNOWN = "unknown"
+
+
+class DependencyProbes:
+    """
+    Sondeo periódico en segundo plano de las dependencias del worker (MongoDB y cada host
+    upstream). Todas se informan en `/health/dependencies`; solo las críticas afectan `/ready`.
+
+    Los endpoints de salud solo leen el último resultado guardado, así que nunca esperan a
+    una dependencia lenta; y como el sondeo corre cada `interval` segundos, la cantidad de
+    scrapes del balanceador no multiplica las llamadas a las dependencias.
+
+    Args:
+        probes (dict): Nombre -> (corrutina que lanza una excepción si la dependencia no
+            responde, True si su caída deja al worker no listo).
+        interval (float): Segundos entre rondas de sondeo.
+        timeout (float): Segundos máximos por sonda.
+    """
+
+    def __init__(self, probes: dict[str, tuple[Callable[[], Awaitable[None]], bool]],
+                 interval: float = PROBE_INTERVAL, timeout: float = PROBE_TIMEOUT):
+        self.probes = probes
+        self.interval = interval
+        self.timeout = timeout
+        self.results: dict[str, dict] = {
+            name: {"state": UNKNOWN, "critical": critical} for name, (_, critical) in probes.items()
+        }
+
+    async def _probe(self, name: str, check: Callable[[], Awaitable[None]]):
+        started = time.perf_counter()
+        result = self.results[name]
+        try:
+            with anyio.fail_after(self.timeout):
+                await check()
+        except Exception as e:
+            error = f"sin respuesta en {self.timeout:g}s" if isinstance(e, TimeoutError) else repr(e)
+            if result["state"] != DOWN:
+                logger.warning(f"Dependencia {name} no disponible: {error}")
+            result.update(state=DOWN, error=error)
+        else:
+            if result["state"] == DOWN:
+                logger.info(f"Dependencia {name} disponible de nuevo")
+            result.update(state=UP, error=None)
+        result.update(latency_ms=round((time.perf_counter() - started) * 1000, 1), checked_at=time.time())
+
+    async def check_all(self):
+        """Una ronda de sondeo: todas las dependencias en paralelo."""
+        async with anyio.create_task_group() as tg:
+            for name, (check, _) in self.probes.items():
+                tg.start_soon(self._probe, name, check)
+
+    async def run(self):
+        """Sondea cada `interval` segundos hasta que se cancela (lo lanza el lifespan)."""
+        while True:
+            await self.check_all()
+            await anyio.sleep(self.interval)
+
+    def failing(self) -> list[str]:
+        """Dependencias críticas caídas según el último sondeo (las aún no sondeadas no cuentan)."""
+        return [name for name, result in self.results.items() if result["critical"] and result["state"] == DOWN]
+
+    def report(self) -> dict[str, dict]:
+        """Último resultado por dependencia, con su antigüedad en segundos."""
+        now = time.time()
+        return {
+            name: {
+                **{key: value for key, value in result.items() if key != "checked_at"},
+                "age_s": round(now - result["checked_at"], 1) if "checked_at" in result else None,
+            }
+            for name, result in self.results.items()
+        }
+
+
+def upstream_probe(host: str, verify: bool) -> Callable[[], Awaitable[None]]:
+    """
+    Sonda de un host upstream: `HEAD /` por el pool compartido. Cualquier respuesta HTTP
+    (incluso 404) indica que el gateway está accesible; solo fallan la red y el timeout.
+    """
+
+    async def check():
+        await http_pool.get(host, verify).request("HEAD", f"{host}/", timeout=httpx.Timeout(PROBE_TIMEOUT))
+
+    return check
+
+
+async def mongodb_probe():
+    """Sonda de MongoDB: comando `ping` en un hilo (pymongo es bloqueante)."""
+    from app.utils.v1.database import DatabaseSingleton
+
+    await anyio.to_thread.run_sync(lambda: DatabaseSingleton().ping(), abandon_on_cancel=True)
+
+
+def default_probes(
+    critical_hosts: list[str] = PROBE_CRITICAL_HOSTS,
+) -> dict[str, tuple[Callable[[], Awaitable[None]], bool]]:
+    """
+    MongoDB (crítico solo si es el almacén de la caché compartida; si no, solo recibe logs)
+    y cada host de `UPSTREAM_POLICIES`.
+
+    Los upstreams son compartidos por todos los workers: si uno cae, sacar a cada worker del
+    balanceador no lo arregla y deja sin servicio a los endpoints que no lo usan. Por eso
+    solo son críticos los hosts de `critical_hosts`; el resto se informa sin afectar `/ready`.
+
+    Args:
+        critical_hosts (list[str]): Hosts (`esquema://host[:puerto]`) críticos para `/ready`.
+    """
+    critical = {host.rstrip("/") for host in critical_hosts}
+    probes = {"mongodb": (mongodb_probe, CACHE_BACKEND == "mongo")}
+    for host, verify in upstream_hosts():
+        name = host if verify else f"{host} (verify=False)"
+        probes[name] = (upstream_probe(host, verify), host in critical)
+    return probes
+
+
+dependency_probes = DependencyProbes(default_probes())
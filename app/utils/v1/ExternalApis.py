@@ -2,6 +2,8 @@ import httpx
 from dataclasses import dataclass
 
 from app.utils.v2.LoggerSingletonDB import logger
+from app.utils.v1.AsyncHttpx import fetch_url
+from app.utils.v1.UpstreamResponse import UpstreamResponse
 from fastapi import HTTPException, status
 
 
@@ -12,14 +14,13 @@ class ResponseAnularPoliza:
     descripcion: str
     code: str
 
-def request_anular_poliza(url: str, data: dict, headers: dict)-> ResponseAnularPoliza:
+async def request_anular_poliza(url: str, data: dict, headers: dict)-> ResponseAnularPoliza:
 
-    response = httpx.post(url, headers=headers, json=data)
-    result = response.json()
+    upstream = UpstreamResponse(await fetch_url("POST", url, headers, data))
 
     return ResponseAnularPoliza(
-        message=result["response"]["message"],
-        status_code=response.status_code,
-        descripcion=result["status"]["descripcion"],
-        code=result["status"]["code"]
+        message=upstream["response"]["message"],
+        status_code=upstream.status_code,
+        descripcion=upstream.descripcion,
+        code=upstream.code
     )
@@ -0,0 +1,60 @@
+import functools
+import json
+from typing import Any, Awaitable, Callable
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+try:
+    # orjson es opcional: codifica y decodifica varias veces más rápido que `json`
+    import orjson
+
+    def json_loads(data: bytes | str) -> Any:
+        return orjson.loads(data)
+
+    def json_dumps(content: Any) -> bytes:
+        # Los tipos que orjson no conoce (Decimal, modelos Pydantic...) pasan por el
+        # encoder de FastAPI, igual que en la ruta por defecto
+        return orjson.dumps(content, default=jsonable_encoder, option=orjson.OPT_NON_STR_KEYS)
+
+    JSONDecodeError = (orjson.JSONDecodeError, UnicodeDecodeError)
+except ImportError:  # pragma: no cover - depende del entorno
+    def json_loads(data: bytes | str) -> Any:
+        return json.loads(data)
+
+    def json_dumps(content: Any) -> bytes:
+        return json.dumps(
+            jsonable_encoder(content), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode("utf-8")
+
+    JSONDecodeError = (json.JSONDecodeError, UnicodeDecodeError)
+
+
+class FastJSONResponse(JSONResponse):
+    """`JSONResponse` que serializa con `json_dumps` (orjson si está instalado)."""
+
+    def render(self, content: Any) -> bytes:
+        return json_dumps(content)
+
+
+def trusted_response(endpoint: Callable[..., Awaitable[Any]]):
+    """
+    Decorador para endpoints que devuelven datos del upstream tal cual: entrega el
+    resultado como `FastJSONResponse` sin pasar por la validación y serialización del
+    `response_model` de FastAPI.
+
+    Solo debe usarse cuando la respuesta ya viene de un upstream confiable (o de la caché
+    de consultas) y el modelo no filtra campos: el `response_model` que tenga la ruta queda
+    únicamente como documentación de OpenAPI. Se aplica justo debajo de `@router.post(...)`,
+    de modo que la caché y la coalescencia sigan trabajando con el dict original.
+
+    `wrapper.raw_endpoint` conserva el endpoint sin envolver, para las llamadas en proceso
+    que necesitan el dict y no la respuesta HTTP (despacho en proceso del servidor MCP).
+    """
+
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        return FastJSONResponse(await endpoint(*args, **kwargs))
+
+    wrapper.raw_endpoint = endpoint
+    return wrapper
@@ -0,0 +1,120 @@
+import functools
+from typing import Any, Awaitable, Callable, Iterable
+
+from pydantic import BaseModel
+
+from app.utils.v1.configs import LOOKUP_CACHE_MAXSIZE, LOOKUP_CACHE_TTL
+from app.utils.v1.LoggerSingleton import logger
+from app.utils.v1.RequestCoalescing import request_key
+from app.utils.v1.ResponseCache import ResponseCache, register_cache, shared_backend
+
+# Con almacén compartido, cada worker guarda su copia local solo unos segundos para que
+# las invalidaciones hechas en otro worker se vean pronto
+SHARED_LOCAL_TTL = 5.0
+
+# Las pruebas lo activan: un error al invalidar (p. ej. una clave mal construida) se
+# propaga en lugar de quedar en un warning
+STRICT_INVALIDATION = False
+
+
+def _lookup_cache(name: str) -> ResponseCache:
+    shared = shared_backend(name, sensitive=True)
+    return register_cache(ResponseCache(
+        name,
+        maxsize=LOOKUP_CACHE_MAXSIZE,
+        shared=shared,
+        local_ttl=SHARED_LOCAL_TTL if shared is not None else None,
+    ))
+
+
+# Datos de personas (por número de documento) y de pólizas/recibos (por entidad, área,
+# póliza y certificado). Solo se invalidan con las operaciones de esta misma API.
+persona_cache = _lookup_cache("consultar_persona")
+poliza_cache = _lookup_cache("consultar_poliza")
+
+
+def persona_key(num_documento: str) -> str:
+    """Clave de persona: el documento tal como lo reciben los endpoints (p. ej. `V-12345678`)."""
+    return num_documento.strip().upper()
+
+
+def poliza_prefix(cd_entidad, cd_area, nu_poliza, certificado=None) -> str:
+    """
+    Prefijo de las entradas de una póliza. Sin `certificado` abarca todos sus certificados.
+    """
+    prefix = f"{cd_entidad}:{cd_area}:{nu_poliza}:"
+    return prefix if certificado is None else f"{prefix}{certificado}:"
+
+
+def poliza_key(kind: str, request: BaseModel) -> str:
+    """Clave de una consulta de póliza (`kind`: poliza | recibos) con el cuerpo normalizado."""
+    data = request.model_dump()
+    prefix = poliza_prefix(data["cd_entidad"], data["cd_area"], data["poliza"], data["certificado"])
+    return f"{prefix}{kind}|{request_key(request)}"
+
+
+def cached_lookup(cache: ResponseCache, key: Callable[[BaseModel], str], param: str = "request",
+                  ttl: float | None = LOOKUP_CACHE_TTL):
+    """
+    Decorador read-through para endpoints de consulta: devuelve la respuesta cacheada o
+    ejecuta el endpoint y guarda su resultado. Los errores (`HTTPException`) no se cachean.
+
+    Args:
+        cache (ResponseCache): Caché donde se guardan las respuestas.
+        key: Función que obtiene la clave a partir del modelo del cuerpo.
+        param (str): Nombre del parámetro con el modelo del cuerpo.
+        ttl (float | None): Vigencia de las entradas en segundos.
+    """
+
+    def decorator(endpoint: Callable[..., Awaitable[Any]]):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            return await cache.get_or_load(
+                key(kwargs[param]), lambda: endpoint(*args, **kwargs), ttl=ttl
+            )
+
+        return wrapper
+
+    return decorator
+
+
+def invalidates(*targets: Callable[[BaseModel, Any], Awaitable[None]], param: str = "request"):
+    """
+    Decorador para endpoints que modifican datos: tras una respuesta exitosa invalida las
+    entradas afectadas. Cada `target` recibe (cuerpo, resultado). Un fallo al invalidar se
+    registra pero no altera la respuesta de la operación, que ya se realizó (salvo con
+    `STRICT_INVALIDATION`).
+    """
+
+    def decorator(endpoint: Callable[..., Awaitable[Any]]):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            result = await endpoint(*args, **kwargs)
+            for target in targets:
+                try:
+                    await target(kwargs[param], result)
+                except Exception as e:
+                    if STRICT_INVALIDATION:
+                        raise
+                    logger.warning(f"No se pudo invalidar la caché tras {endpoint.__name__}: {e}")
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+async def invalidate_persona(num_documento: str):
+    await persona_cache.invalidate(key=persona_key(num_documento))
+
+
+async def invalidate_poliza(cd_entidad, cd_area, nu_poliza, certificado=None):
+    await poliza_cache.invalidate(prefix=poliza_prefix(cd_entidad, cd_area, nu_poliza, certificado))
+
+
+async def invalidate_recibos(recibos: Iterable[BaseModel]):
+    """Invalida una vez cada póliza/certificado distinto de los recibos pagados."""
+    certificados = dict.fromkeys((r.cd_entidad, r.cd_area, r.nu_poliza, r.nu_certificado) for r in recibos)
+    for certificado in certificados:
+        await invalidate_poliza(*certificado)
+
@@ -0,0 +1,305 @@
+import bisect
+import json
+import math
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterable
+
+from app.utils.v1.configs import METRICS_DIR
+from app.utils.v1.LoggerSingleton import logger
+
+# Buckets en segundos: cubren desde respuestas en caché hasta las emisiones más lentas
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+Labels = tuple[str, ...]
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _check(self, labels: Labels) -> Labels:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} espera las etiquetas {self.labelnames}, recibió {labels}")
+        return tuple(str(label) for label in labels)
+
+
+class Counter(_Metric):
+    """Contador monótono por combinación de etiquetas."""
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        labels = self._check(labels)
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def collect(self) -> dict[Labels, float]:
+        with self._lock:
+            return dict(self._values)
+
+
+class Gauge(Counter):
+    """Valor que sube y baja (peticiones en curso, conexiones abiertas...)."""
+
+    type = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels: str, value: float):
+        labels = self._check(labels)
+        with self._lock:
+            self._values[labels] = value
+
+
+class CallbackGauge(_Metric):
+    """
+    Métrica cuyo valor se calcula al momento del scrape a partir de otro componente
+    (pool HTTP, cachés, breakers), sin instrumentar su camino crítico.
+
+    Args:
+        callback: Función sin argumentos que devuelve `{etiquetas: valor}`.
+        type (str): "gauge" o "counter" (los contadores del componente ya son monótonos).
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str],
+                 callback: Callable[[], dict[Labels, float]], type: str = "gauge"):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+        self.type = type
+
+    def collect(self) -> dict[Labels, float]:
+        try:
+            return {self._check(tuple(labels)): float(value) for labels, value in self.callback().items()}
+        except Exception as e:
+            logger.warning(f"No se pudo calcular la métrica {self.name}: {e}")
+            return {}
+
+
+class Histogram(_Metric):
+    """Histograma de latencias con buckets acumulados (formato Prometheus)."""
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values: dict[Labels, list] = {}
+
+    def observe(self, *labels: str, value: float):
+        labels = self._check(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(labels)
+            if counts is None:
+                # un contador por bucket + el de +Inf, luego la suma de las observaciones
+                counts = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            counts[index] += 1
+            counts[-1] += value
+
+    def collect(self) -> dict[Labels, list]:
+        with self._lock:
+            return {labels: list(counts) for labels, counts in self._values.items()}
+
+
+class MetricsRegistry:
+    """
+    Registro de métricas del worker y exportación en formato de texto de Prometheus.
+
+    Con `METRICS_DIR` configurado cada worker guarda periódicamente una instantánea en
+    `<METRICS_DIR>/<pid>.json`, y el worker que atiende `/metrics` suma las de todos:
+    contadores e histogramas de todos los procesos (también los que ya terminaron, para que
+    no retrocedan), y gauges solo de los procesos vivos.
+    """
+
+    def __init__(self, directory: str | None = METRICS_DIR):
+        self.directory = Path(directory) if directory else None
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def callback(self, name: str, documentation: str, labelnames: Iterable[str],
+                 callback: Callable[[], dict], type: str = "gauge") -> CallbackGauge:
+        return self.register(CallbackGauge(name, documentation, labelnames, callback, type))
+
+    def snapshot(self) -> dict:
+        """Valores actuales de este proceso, serializables a JSON."""
+        return {
+            "pid": os.getpid(),
+            "metrics": {
+                name: [[list(labels), value] for labels, value in metric.collect().items()]
+                for name, metric in self._metrics.items()
+            },
+        }
+
+    def write_snapshot(self):
+        """Publica la instantánea de este proceso en `directory` (reemplazo atómico)."""
+        if self.directory is None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{os.getpid()}.json"
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.snapshot()))
+        os.replace(tmp, path)
+
+    def _snapshots(self) -> list[tuple[dict, bool]]:
+        own = self.snapshot()
+        if self.directory is None:
+            return [(own, True)]
+        snapshots = [(own, True)]
+        for path in self.directory.glob("*.json"):
+            try:
+                pid = int(path.stem)
+                if pid == own["pid"]:
+                    continue
+                snapshots.append((json.loads(path.read_text()), _pid_alive(pid)))
+            except (ValueError, OSError) as e:
+                logger.warning(f"Instantánea de métricas ilegible {path.name}: {e}")
+        return snapshots
+
+    def aggregate(self) -> dict[str, dict[Labels, float | list]]:
+        """Suma las instantáneas de todos los workers."""
+        totals: dict[str, dict] = {name: {} for name in self._metrics}
+        for snapshot, alive in self._snapshots():
+            for name, samples in snapshot["metrics"].items():
+                metric = self._metrics.get(name)
+                if metric is None or (metric.type == "gauge" and not alive):
+                    continue
+                values = totals[name]
+                for labels, value in samples:
+                    labels = tuple(labels)
+                    if isinstance(value, list):
+                        current = values.get(labels)
+                        values[labels] = value if current is None else [a + b for a, b in zip(current, value)]
+                    else:
+                        values[labels] = values.get(labels, 0.0) + value
+        return totals
+
+    def render(self) -> str:
+        """Texto de exposición de Prometheus (versión 0.0.4) con los valores agregados."""
+        lines = []
+        for name, values in self.aggregate().items():
+            metric = self._metrics[name]
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.type}")
+            for labels, value in sorted(values.items()):
+                base = list(zip(metric.labelnames, labels))
+                if metric.type != "histogram":
+                    lines.append(f"{name}{_labels(base)} {_number(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip((*metric.buckets, math.inf), value[:-1]):
+                    cumulative += count
+                    le = "+Inf" if bound == math.inf else repr(float(bound))
+                    lines.append(f"{name}_bucket{_labels(base + [('le', le)])} {_number(cumulative)}")
+                lines.append(f"{name}_sum{_labels(base)} {_number(value[-1])}")
+                lines.append(f"{name}_count{_labels(base)} {_number(cumulative)}")
+        return "\n".join(lines) + "\n"
+
+    def reset_directory(self):
+        """Borra las instantáneas de una ejecución anterior (lo llama `run.py` antes de iniciar los workers)."""
+        if self.directory is None or not self.directory.exists():
+            return
+        for path in self.directory.glob("*.json"):
+            path.unlink(missing_ok=True)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(pairs: list[tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+registry = MetricsRegistry()
+
+# Peticiones atendidas por la API (la ruta es la plantilla, p. ej. /api/v1/sm/consultar_poliza)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "Duración (reloj de pared) de las peticiones por ruta",
+    ("method", "route", "status"),
+)
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight", "Peticiones en curso en la API", ("method",)
+)
+
+# Llamadas a los upstreams de Seguros Mercantil (la etiqueta es el nombre de su UpstreamPolicy)
+upstream_request_duration = registry.histogram(
+    "upstream_request_duration_seconds", "Duración de cada intento de llamada al upstream", ("upstream",)
+)
+upstream_responses = registry.counter(
+    "upstream_responses_total", "Respuestas del upstream por código HTTP o tipo de error", ("upstream", "status")
+)
+upstream_outcomes = registry.counter(
+    "upstream_outcomes_total", "Resultado de negocio del upstream (status.code: EXITO, FALLONEGOCIO, ERROR)",
+    ("upstream", "code"),
+)
+upstream_requests_in_flight = registry.gauge(
+    "upstream_requests_in_flight", "Llamadas en curso hacia el upstream", ("upstream",)
+)
+
+
+class track_in_flight:
+    """Context manager que suma 1 al gauge mientras dura el bloque."""
+
+    __slots__ = ("gauge", "labels")
+
+    def __init__(self, gauge: Gauge, *labels: str):
+        self.gauge = gauge
+        self.labels = labels
+
+    def __enter__(self):
+        self.gauge.inc(*self.labels)
+        return self
+
+    def __exit__(self, *exc):
+        self.gauge.dec(*self.labels)
+
+
+def observe_upstream(upstream: str, started: float, status: int | str):
+    """Registra la duración y el código (o tipo de error) de un intento contra el upstream."""
+    upstream_request_duration.observe(upstream, value=time.perf_counter() - started)
+    upstream_responses.inc(upstream, str(status))
@@ -1,8 +1,23 @@
 import sys
+import time
+import queue
 import datetime
+import threading
+
+from app.utils.v1.configs import (
+    MONGO_LOG_BATCH_SIZE,
+    MONGO_LOG_FLUSH_INTERVAL,
+    MONGO_LOG_QUEUE_SIZE,
+    MONGO_LOG_DROP_POLICY,
+)
 from app.utils.v1.database import DatabaseSingleton
 from app.utils.v1.LoggerSingleton import logger
 
+DROP_POLICIES = ("drop_newest", "drop_oldest", "block")
+
+# Marcador para detener el hilo de escritura
+_STOP = object()
+
 
 class MongoDBHandler:
     """Handles interaction with MongoDB database.
@@ -142,7 +157,118 @@ class MongoDBHandler:
             print(f"Error inserting log into MongoDB: {e}", file=sys.stderr)
 
 
+class BufferedMongoDBHandler(MongoDBHandler):
+    """Sink de loguru que no bloquea el request path.
+
+    Cada registro se serializa y se encola en memoria; un hilo en segundo plano los
+    escribe en lotes con `insert_many` cuando se alcanza `batch_size` registros o pasan
+    `flush_interval` segundos. Si la cola se llena se aplica `drop_policy`:
+
+    - ``drop_newest``: se descarta el registro nuevo (no bloquea nunca).
+    - ``drop_oldest``: se descarta el registro más antiguo de la cola.
+    - ``block``: se espera hasta `flush_interval` segundos (backpressure) y luego se descarta.
+
+    Los pendientes se vacían al cerrar la conexión mediante el hook atexit de `DatabaseSingleton`.
+
+    Attributes:
+        batch_size (int): Registros por `insert_many`.
+        flush_interval (float): Segundos máximos que un registro espera en la cola.
+        drop_policy (str): Política ante cola llena.
+        dropped (int): Registros descartados por cola llena.
+    """
+    def __init__(
+        self,
+        batch_size: int = MONGO_LOG_BATCH_SIZE,
+        flush_interval: float = MONGO_LOG_FLUSH_INTERVAL,
+        queue_size: int = MONGO_LOG_QUEUE_SIZE,
+        drop_policy: str = MONGO_LOG_DROP_POLICY,
+    ):
+        super().__init__()
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"drop_policy inválida: {drop_policy}. Opciones: {DROP_POLICIES}")
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.drop_policy = drop_policy
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="mongo-log-writer", daemon=True)
+        self._thread.start()
+        self.db_instance.register_close_hook(self.close)
+
+    def __call__(self, msg):
+        if self._closed:
+            return
+        try:
+            serialized_record = self._serialize_record(msg.record)
+        except Exception as e:
+            print(f"Error serializing log for MongoDB: {e}", file=sys.stderr)
+            return
+        self._enqueue(serialized_record)
+
+    def _enqueue(self, item):
+        try:
+            if self.drop_policy == "block":
+                self._queue.put(item, timeout=self.flush_interval)
+            else:
+                self._queue.put_nowait(item)
+            return
+        except queue.Full:
+            pass
+
+        if self.drop_policy == "drop_oldest":
+            try:
+                self._queue.get_nowait()
+                self._queue.put_nowait(item)
+            except (queue.Empty, queue.Full):
+                pass
+        self.dropped += 1
+
+    def _write(self, batch):
+        try:
+            self.db_instance.logs_integration_ms.insert_many(batch, ordered=False)
+        except Exception as e:
+            # Use print instead of logger to avoid deadlock
+            print(f"Error inserting {len(batch)} logs into MongoDB: {e}", file=sys.stderr)
+
+    def _run(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                if batch:
+                    self._write(batch)
+                return
+            if item is not None:
+                batch.append(item)
+
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                if batch:
+                    self._write(batch)
+                    batch = []
+                deadline = time.monotonic() + self.flush_interval
+
+    def close(self, timeout: float = 5.0):
+        """Vacía los registros pendientes y detiene el hilo de escritura."""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            print("MongoDB log queue full at shutdown; pending logs discarded", file=sys.stderr)
+            return
+        self._thread.join(timeout)
+        if self.dropped:
+            print(f"MongoDB log sink dropped {self.dropped} records (queue full)", file=sys.stderr)
+
+
 def setup_mongodb_handler():
-    handler = MongoDBHandler()
+    handler = BufferedMongoDBHandler()
     logger.info("Configurando handler de MongoDB para reutilizar la conexión Singleton...")
     return handler
\ No newline at end of file
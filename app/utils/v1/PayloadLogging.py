@@ -0,0 +1,124 @@
+import json
+import random
+from typing import Any
+
+from pydantic import BaseModel
+
+from app.utils.v1.configs import (
+    PAYLOAD_LOG_FIELD_MAX,
+    PAYLOAD_LOG_LIST_MAX,
+    PAYLOAD_LOG_MAX_CHARS,
+    PAYLOAD_LOG_SAMPLE_RATE,
+)
+from app.utils.v1.LoggerSingleton import logger
+
+MASK = "***"
+
+# Campos que nunca se registran en claro: datos de los instrumentos de PasarelaPagoMS
+# (OTP, CVV, vencimiento) y credenciales de los headers hacia los upstreams
+REDACTED_FIELDS = frozenset({
+    "otp",
+    "cd_verificacion",
+    "cvv",
+    "fe_vencimiento",
+    "clave",
+    "password",
+    "x-api-key",
+    "ocp-apim-subscription-key",
+    "authorization",
+    "api_key",
+})
+# Números de tarjeta: se conservan los últimos 4 dígitos para poder rastrear el pago
+CARD_NUMBER_FIELDS = frozenset({"numero", "nu_tarjeta"})
+
+
+def _mask_card(value: Any) -> str:
+    digits = str(value)
+    return f"{MASK}{digits[-4:]}" if len(digits) > 4 else MASK
+
+
+def sanitize(value: Any, field_max: int = PAYLOAD_LOG_FIELD_MAX, list_max: int = PAYLOAD_LOG_LIST_MAX) -> Any:
+    """
+    Copia de `value` apta para el log: oculta los campos sensibles y acota el tamaño de
+    cada string (p. ej. el base64 de un reporte) y de cada lista.
+
+    Args:
+        value: dict, lista, modelo Pydantic o valor simple.
+        field_max (int): Caracteres máximos por string.
+        list_max (int): Elementos máximos por lista.
+
+    Returns:
+        Any: Estructura equivalente con los campos ocultos o recortados.
+    """
+    if isinstance(value, BaseModel):
+        value = value.model_dump(mode="json")
+    if isinstance(value, dict):
+        result = {}
+        for key, item in value.items():
+            name = str(key).lower()
+            if name in REDACTED_FIELDS:
+                result[key] = MASK
+            elif name in CARD_NUMBER_FIELDS and item is not None and not isinstance(item, (dict, list)):
+                result[key] = _mask_card(item)
+            else:
+                result[key] = sanitize(item, field_max, list_max)
+        return result
+    if isinstance(value, (list, tuple)):
+        items = [sanitize(item, field_max, list_max) for item in value[:list_max]]
+        if len(value) > list_max:
+            items.append(f"…(+{len(value) - list_max} elementos)")
+        return items
+    if isinstance(value, (bytes, bytearray)):
+        return f"<{len(value)} bytes>"
+    if isinstance(value, str) and len(value) > field_max:
+        return f"{value[:field_max]}…(+{len(value) - field_max} caracteres)"
+    return value
+
+
+def format_payload(value: Any, max_chars: int = PAYLOAD_LOG_MAX_CHARS) -> str:
+    """
+    Texto del payload para el log, saneado con `sanitize` y acotado a `max_chars`.
+
+    Un cuerpo en bytes (p. ej. el de una petición rechazada) se decodifica como JSON para
+    poder ocultar sus campos; si no es JSON se registra solo su tamaño.
+    """
+    if isinstance(value, (bytes, bytearray)):
+        try:
+            value = json.loads(value)
+        except (ValueError, UnicodeDecodeError):
+            return f"<{len(value)} bytes no JSON>"
+    if isinstance(value, str):
+        text = value
+    else:
+        text = json.dumps(sanitize(value), ensure_ascii=False, default=str)
+    if len(text) > max_chars:
+        text = f"{text[:max_chars]}…(+{len(text) - max_chars} caracteres)"
+    return text
+
+
+def log_payload(label: str, value: Any, level: str = "INFO"):
+    """
+    Registra `label: payload` saneado. El texto se arma solo si algún sink acepta el nivel
+    (formateo perezoso de loguru), así que un DEBUG filtrado no cuesta nada.
+
+    Args:
+        label (str): Prefijo del mensaje (p. ej. "Payload", "Data").
+        value: Payload a registrar.
+        level (str): Nivel de loguru.
+    """
+    logger.opt(lazy=True, depth=1).log(level, f"{label}: {{}}", lambda: format_payload(value))
+
+
+def log_response(label: str, value: Any, level: str = "INFO", sample_rate: float | None = None):
+    """
+    Igual que `log_payload` para respuestas exitosas, pero registrando solo una fracción
+    (`PAYLOAD_LOG_SAMPLE_RATE`, por defecto todas). Los errores se registran siempre por
+    su propio camino.
+
+    Args:
+        sample_rate (float | None): Fracción de respuestas a registrar (0 a 1).
+    """
+    rate = PAYLOAD_LOG_SAMPLE_RATE if sample_rate is None else sample_rate
+    if rate < 1.0 and random.random() >= rate:
+        return
+    logger.opt(lazy=True, depth=1).log(level, f"{label}: {{}}", lambda: format_payload(value))
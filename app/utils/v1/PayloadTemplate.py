@@ -0,0 +1,101 @@
+from types import MappingProxyType
+from typing import Any, Callable, Mapping
+
+# Valores que se pueden compartir entre requests sin copiarlos
+_LEAF_TYPES = (str, int, float, bool, type(None))
+
+
+def freeze(value: Any) -> Any:
+    """
+    Convierte recursivamente una plantilla en una estructura inmutable.
+
+    Los dict pasan a `MappingProxyType` y las listas a `tuple`. Las hojas deben ser
+    inmutables (str, int, float, bool o None).
+
+    Args:
+        value: Plantilla (dict/list) o valor hoja.
+
+    Returns:
+        La misma estructura en versión de solo lectura.
+
+    Raises:
+        TypeError: Si la plantilla contiene un valor mutable que no es dict ni list.
+    """
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, _LEAF_TYPES):
+        return value
+    raise TypeError(f"Valor no soportado en plantilla de payload: {type(value).__name__}")
+
+
+def _compile(node: Any) -> Callable[[], Any] | None:
+    """
+    Genera una función que construye una copia mutable de `node`.
+
+    Devuelve `None` para las hojas: se comparten tal cual porque son inmutables.
+    Los contenedores cuyos hijos son todos hojas se copian con `dict.copy`/`list`,
+    que son operaciones en C; solo se recorre en Python lo que tiene anidamiento.
+    """
+    if isinstance(node, Mapping):
+        shallow = dict(node)
+        children = [(key, builder) for key, builder in ((k, _compile(v)) for k, v in node.items()) if builder]
+        if not children:
+            return shallow.copy
+
+        def build_dict():
+            result = shallow.copy()  # conserva el orden original de las llaves
+            for key, builder in children:
+                result[key] = builder()
+            return result
+
+        return build_dict
+
+    if isinstance(node, tuple):
+        builders = [_compile(item) for item in node]
+        if not any(builders):
+            return lambda: list(node)
+        items = [(builder, item) for builder, item in zip(builders, node)]
+        return lambda: [builder() if builder else item for builder, item in items]
+
+    return None
+
+
+class PayloadTemplate:
+    """
+    Plantilla de payload congelada una sola vez al importar el módulo.
+
+    Sustituye a los dict globales que los endpoints copiaban con `.copy()` (copia
+    superficial) y luego mutaban en niveles anidados, lo que hacía que requests
+    concurrentes se pisaran los datos. `build()` devuelve en cada llamada contenedores
+    nuevos (dict/list) compartiendo las hojas inmutables de la plantilla, sin el costo
+    de `copy.deepcopy` (memo, despacho por tipo) en las plantillas grandes de cotización.
+
+    Attributes:
+        template (Mapping): Vista de solo lectura de la plantilla.
+    """
+
+    __slots__ = ("template", "_build")
+
+    def __init__(self, template: dict):
+        self.template = freeze(template)
+        self._build = _compile(self.template)
+
+    def build(self) -> dict:
+        """
+        Construye un payload nuevo, seguro de mutar en cualquier nivel.
+
+        Returns:
+            dict: Copia mutable e independiente de la plantilla.
+        """
+        return self._build()
+
+    def __getitem__(self, key):
+        return self.template[key]
+
+    def get(self, key, default=None):
+        return self.template.get(key, default)
+
+    def __repr__(self):
+        return f"PayloadTemplate({dict(self.template)!r})"
@@ -0,0 +1,49 @@
+import functools
+import json
+from typing import Any, Awaitable, Callable
+
+from pydantic import BaseModel
+
+from app.utils.v1.ResponseCache import SingleFlight
+
+_flights: dict[str, SingleFlight] = {}
+
+
+def request_key(request: BaseModel) -> str:
+    """
+    Clave normalizada del cuerpo de la petición: solo los campos enviados, con las llaves
+    ordenadas, de modo que dos cuerpos equivalentes producen la misma clave.
+    """
+    return json.dumps(request.model_dump(exclude_unset=True, mode="json"), sort_keys=True)
+
+
+def coalesce_requests(param: str = "request"):
+    """
+    Decorador para endpoints de consulta idempotentes: las peticiones idénticas que llegan
+    mientras otra está en curso esperan su resultado en lugar de repetir la llamada al
+    upstream. Se aplica debajo de `@router.post(...)`.
+
+    La autenticación (`Security`) se resuelve antes de llamar al endpoint, así que cada
+    llamador sigue validando su propia API key; solo se comparte la ejecución del cuerpo.
+
+    Args:
+        param (str): Nombre del parámetro con el modelo Pydantic del cuerpo.
+    """
+
+    def decorator(endpoint: Callable[..., Awaitable[Any]]):
+        flight = _flights.setdefault(f"{endpoint.__module__}.{endpoint.__name__}", SingleFlight())
+
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            key = request_key(kwargs[param])
+            result, _ = await flight.do(key, lambda: endpoint(*args, **kwargs))
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def coalescing_stats() -> dict[str, dict]:
+    """Ejecuciones reales y peticiones que compartieron resultado, por endpoint."""
+    return {name: {"leaders": flight.leaders, "shared": flight.shared} for name, flight in _flights.items()}
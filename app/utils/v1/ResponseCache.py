@@ -0,0 +1,425 @@
+import asyncio
+import base64
+import hashlib
+import json
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from types import FunctionType
+from typing import Any, Awaitable, Callable
+
+import anyio
+
+from app.utils.v1.configs import CACHE_BACKEND, CACHE_ENCRYPTION_KEY
+from app.utils.v1.LoggerSingleton import logger
+
+
+class MemoryCacheBackend:
+    """
+    Almacén en memoria del worker con expiración por entrada y desalojo LRU.
+
+    Todos los almacenes exponen la misma interfaz async: `get` devuelve
+    `(valor, segundos_restantes)` o `None`, y `set`/`delete`/`clear`.
+
+    Attributes:
+        maxsize (int): Número máximo de entradas; al superarlo se desaloja la menos usada.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, tuple[Any, float | None]] = OrderedDict()
+
+    async def get(self, key: str) -> tuple[Any, float | None] | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        remaining = None if expires_at is None else expires_at - time.monotonic()
+        if remaining is not None and remaining <= 0:
+            self._data.pop(key, None)
+            return None
+        self._data.move_to_end(key)
+        return value, remaining
+
+    async def set(self, key: str, value: Any, ttl: float | None = None):
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    async def delete(self, key: str):
+        self._data.pop(key, None)
+
+    async def delete_prefix(self, prefix: str):
+        for key in [key for key in self._data if key.startswith(prefix)]:
+            del self._data[key]
+
+    async def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class MongoCacheBackend:
+    """
+    Almacén compartido entre workers sobre una colección de MongoDB.
+
+    Cada documento guarda `{_id: clave, value, expires_at}`; `expires_at=None` no expira.
+    Las llamadas a pymongo son bloqueantes, por eso se ejecutan en el threadpool.
+
+    Args:
+        collection: Colección de pymongo donde se guardan las entradas, o una función que
+            la devuelve; en ese caso la conexión se abre en el primer uso y no al importar.
+        namespace (str): Prefijo de las claves (permite compartir la colección).
+    """
+
+    def __init__(self, collection, namespace: str):
+        self._collection = collection
+        self.namespace = namespace
+        self._index_ready = False
+
+    @property
+    def collection(self):
+        # Una Collection de pymongo también es "callable", por eso se compara el tipo
+        if isinstance(self._collection, FunctionType):
+            self._collection = self._collection()
+        return self._collection
+
+    def _id(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def _ensure_index(self):
+        if not self._index_ready:
+            # Mongo borra en segundo plano los documentos cuyo expires_at ya pasó
+            self.collection.create_index("expires_at", expireAfterSeconds=0)
+            self._index_ready = True
+
+    def _get(self, key: str):
+        doc = self.collection.find_one({"_id": self._id(key)})
+        if doc is None:
+            return None
+        expires_at = doc.get("expires_at")
+        if expires_at is None:
+            return doc["value"], None
+        remaining = (expires_at.replace(tzinfo=timezone.utc) - datetime.now(timezone.utc)).total_seconds()
+        if remaining <= 0:
+            return None
+        return doc["value"], remaining
+
+    def _set(self, key: str, value: Any, ttl: float | None):
+        self._ensure_index()
+        expires_at = None if ttl is None else datetime.now(timezone.utc) + timedelta(seconds=ttl)
+        self.collection.replace_one(
+            {"_id": self._id(key)},
+            {"value": value, "expires_at": expires_at},
+            upsert=True,
+        )
+
+    async def get(self, key: str) -> tuple[Any, float | None] | None:
+        return await anyio.to_thread.run_sync(self._get, key)
+
+    async def set(self, key: str, value: Any, ttl: float | None = None):
+        await anyio.to_thread.run_sync(self._set, key, value, ttl)
+
+    async def delete(self, key: str):
+        await anyio.to_thread.run_sync(lambda: self.collection.delete_one({"_id": self._id(key)}))
+
+    async def delete_prefix(self, prefix: str):
+        pattern = f"^{re.escape(self._id(prefix))}"
+        await anyio.to_thread.run_sync(lambda: self.collection.delete_many({"_id": {"$regex": pattern}}))
+
+    async def clear(self):
+        await anyio.to_thread.run_sync(
+            lambda: self.collection.delete_many({"_id": {"$regex": f"^{re.escape(self.namespace)}:"}})
+        )
+
+
+class EncryptedCacheBackend:
+    """
+    Envuelve un almacén compartido cifrando los valores (Fernet) antes de guardarlos.
+
+    Se usa para las cachés con datos personales: fuera del proceso solo se persiste el
+    texto cifrado. Requiere el paquete opcional `cryptography`.
+
+    Args:
+        inner: Almacén real (p. ej. `MongoCacheBackend`).
+        secret (str): Secreto a partir del cual se deriva la llave de cifrado.
+    """
+
+    def __init__(self, inner, secret: str):
+        from cryptography.fernet import Fernet
+
+        self.inner = inner
+        self._fernet = Fernet(base64.urlsafe_b64encode(hashlib.sha256(secret.encode()).digest()))
+
+    async def get(self, key: str) -> tuple[Any, float | None] | None:
+        entry = await self.inner.get(key)
+        if entry is None:
+            return None
+        token, remaining = entry
+        return json.loads(self._fernet.decrypt(token.encode())), remaining
+
+    async def set(self, key: str, value: Any, ttl: float | None = None):
+        token = self._fernet.encrypt(json.dumps(value).encode()).decode()
+        await self.inner.set(key, token, ttl)
+
+    async def delete(self, key: str):
+        await self.inner.delete(key)
+
+    async def delete_prefix(self, prefix: str):
+        await self.inner.delete_prefix(prefix)
+
+    async def clear(self):
+        await self.inner.clear()
+
+
+class SingleFlight:
+    """
+    Agrupa llamadas concurrentes con la misma clave en una sola ejecución.
+
+    La primera llamada ejecuta `loader`; las que llegan mientras está en curso esperan el
+    mismo resultado (o la misma excepción) en lugar de repetir la llamada al upstream. Si
+    se cancela la llamada que ejecuta `loader` (cliente desconectado, timeout), las que
+    esperaban no se cancelan: vuelven a intentarlo y una de ellas pasa a ejecutarlo.
+    """
+
+    def __init__(self):
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.leaders = 0
+        self.shared = 0
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._inflight
+
+    async def do(self, key: str, loader: Callable[[], Awaitable[Any]]) -> tuple[Any, bool]:
+        """
+        Ejecuta `loader` una sola vez por clave entre los llamadores concurrentes.
+
+        Returns:
+            tuple: (resultado, True si se compartió el resultado de otra llamada en curso)
+        """
+        while (future := self._inflight.get(key)) is not None:
+            self.shared += 1
+            try:
+                return await asyncio.shield(future), True
+            except asyncio.CancelledError:
+                # Solo se reintenta si se canceló la llamada líder, no esta tarea
+                if not future.cancelled() or asyncio.current_task().cancelling():
+                    raise
+                self.shared -= 1
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        self.leaders += 1
+        try:
+            result = await loader()
+        except asyncio.CancelledError:
+            # Despierta a quienes esperaban para que uno de ellos tome el relevo
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # evita el aviso "exception was never retrieved" si nadie más esperaba
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            self._inflight.pop(key, None)
+
+
+class ResponseCache:
+    """
+    Caché read-through de respuestas de upstream con coalescencia de misses.
+
+    Consulta primero la memoria del worker y, si se configuró, un almacén compartido entre
+    workers. En un miss, las llamadas concurrentes con la misma clave comparten una única
+    llamada al upstream. Solo se guardan respuestas exitosas: si `loader` lanza una
+    excepción no se cachea nada.
+
+    Attributes:
+        name (str): Nombre de la caché (etiqueta en estadísticas).
+        local (MemoryCacheBackend): Nivel en memoria del worker.
+        shared: Nivel compartido opcional (p. ej. `MongoCacheBackend`).
+        local_ttl (float | None): Vigencia máxima en el nivel local. Con un nivel compartido
+            acota cuánto tarda un worker en ver una invalidación hecha por otro.
+        hits, misses, coalesced, bypasses (int): Contadores de uso.
+    """
+
+    def __init__(self, name: str, maxsize: int = 1024, shared=None, local_ttl: float | None = None):
+        self.name = name
+        self.local = MemoryCacheBackend(maxsize)
+        self.shared = shared
+        self.local_ttl = local_ttl
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.bypasses = 0
+        self.errors = 0
+        self.invalidations = 0
+        self._generation = 0
+        self._flight = SingleFlight()
+
+    def _local_ttl(self, ttl: float | None) -> float | None:
+        if self.local_ttl is None:
+            return ttl
+        return self.local_ttl if ttl is None else min(ttl, self.local_ttl)
+
+    async def get(self, key: str) -> Any | None:
+        entry = await self.local.get(key)
+        if entry is None and self.shared is not None:
+            try:
+                entry = await self.shared.get(key)
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"Caché {self.name}: error leyendo almacén compartido: {e}")
+                return None
+            if entry is not None:
+                # se copia al nivel local con la vigencia que le queda en el compartido
+                value, remaining = entry
+                await self.local.set(key, value, self._local_ttl(remaining))
+        return None if entry is None else entry[0]
+
+    async def set(self, key: str, value: Any, ttl: float | None = None):
+        await self.local.set(key, value, self._local_ttl(ttl))
+        if self.shared is not None:
+            try:
+                await self.shared.set(key, value, ttl)
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"Caché {self.name}: error escribiendo almacén compartido: {e}")
+
+    async def delete(self, key: str):
+        await self.local.delete(key)
+        if self.shared is not None:
+            try:
+                await self.shared.delete(key)
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"Caché {self.name}: error borrando del almacén compartido: {e}")
+
+    async def invalidate(self, key: str | None = None, prefix: str | None = None):
+        """
+        Invalida una entrada (`key`) o todas las que empiezan por `prefix`.
+
+        Las cargas que estaban en curso al invalidar no guardan su resultado, para no
+        reponer un dato anterior a la modificación.
+        """
+        self._generation += 1
+        self.invalidations += 1
+        if key is not None:
+            await self.delete(key)
+        if prefix is not None:
+            await self.local.delete_prefix(prefix)
+            if self.shared is not None:
+                try:
+                    await self.shared.delete_prefix(prefix)
+                except Exception as e:
+                    self.errors += 1
+                    logger.warning(f"Caché {self.name}: error invalidando almacén compartido: {e}")
+
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: float | None = None,
+    ) -> Any:
+        """
+        Devuelve el valor cacheado para `key` o lo obtiene con `loader` y lo guarda.
+
+        Args:
+            key (str): Clave de la entrada.
+            loader: Corrutina sin argumentos que consulta el upstream.
+            ttl (float | None): Segundos de vigencia; `None` no expira.
+
+        Returns:
+            El valor cacheado o recién obtenido.
+        """
+        value = await self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        async def load():
+            self.misses += 1
+            generation = self._generation
+            result = await loader()
+            if generation == self._generation:
+                await self.set(key, result, ttl)
+            return result
+
+        value, shared = await self._flight.do(key, load)
+        if shared:
+            self.coalesced += 1
+        return value
+
+    async def refresh(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: float | None = None) -> Any:
+        """
+        Ignora la entrada cacheada: consulta con `loader` y reemplaza la entrada con el
+        resultado (lo usa el header de bypass de los endpoints).
+        """
+        self.bypasses += 1
+        generation = self._generation
+        result = await loader()
+        if generation == self._generation:
+            await self.set(key, result, ttl)
+        return result
+
+    def stats(self) -> dict:
+        """Contadores de la caché (para health checks y métricas)."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "bypasses": self.bypasses,
+            "errors": self.errors,
+            "invalidations": self.invalidations,
+            "size": len(self.local),
+        }
+
+
+def shared_backend(namespace: str, sensitive: bool = False):
+    """
+    Almacén compartido según `CACHE_BACKEND`: con "mongo" usa la colección
+    `cache_integration_ms`; con "memory" (por defecto) cada worker tiene su propia caché.
+
+    Args:
+        namespace (str): Prefijo de las claves de esta caché.
+        sensitive (bool): La caché guarda datos personales. Solo se comparte si se configuró
+            `CACHE_ENCRYPTION_KEY` (y está instalado `cryptography`); si no, queda en memoria.
+    """
+    if CACHE_BACKEND == "mongo":
+        from app.utils.v1.database import DatabaseSingleton
+
+        backend = MongoCacheBackend(lambda: DatabaseSingleton().cache_integration_ms, namespace)
+        if not sensitive:
+            return backend
+        if not CACHE_ENCRYPTION_KEY:
+            logger.warning(f"Caché {namespace}: sin CACHE_ENCRYPTION_KEY los datos personales quedan solo en memoria")
+            return None
+        try:
+            return EncryptedCacheBackend(backend, CACHE_ENCRYPTION_KEY)
+        except ImportError:
+            logger.warning(f"Caché {namespace}: falta el paquete 'cryptography'; se usará solo memoria")
+            return None
+    if CACHE_BACKEND != "memory":
+        logger.warning(f"CACHE_BACKEND '{CACHE_BACKEND}' no soportado; se usará solo memoria")
+    return None
+
+
+_caches: dict[str, ResponseCache] = {}
+
+
+def register_cache(cache: ResponseCache) -> ResponseCache:
+    """Registra la caché para exponer sus contadores en `cache_stats()`."""
+    _caches[cache.name] = cache
+    return cache
+
+
+def cache_stats() -> dict[str, dict]:
+    """Contadores de todas las cachés registradas en este worker."""
+    return {name: cache.stats() for name, cache in _caches.items()}
@@ -0,0 +1,47 @@
+import importlib
+import sys
+import time
+from contextlib import contextmanager
+from types import ModuleType
+
+
+class StartupTimings:
+    """
+    Tiempos de arranque del worker: importación de módulos (routers) y pasos de
+    inicialización del lifespan.
+
+    Cada importación registra los segundos que tardó y cuántos módulos nuevos trajo
+    consigo (schemas, utilidades...), de modo que se ve qué router encarece el arranque.
+    """
+
+    def __init__(self):
+        self.imports: dict[str, dict] = {}
+        self.steps: dict[str, float] = {}
+
+    def import_module(self, name: str) -> ModuleType:
+        """Importa `name` registrando el tiempo y los módulos nuevos que cargó."""
+        loaded = len(sys.modules)
+        started = time.perf_counter()
+        module = importlib.import_module(name)
+        self.record(name, time.perf_counter() - started, len(sys.modules) - loaded)
+        return module
+
+    def record(self, name: str, seconds: float, modules: int | None = None):
+        self.imports[name] = {"ms": round(seconds * 1000, 1), "modules": modules}
+
+    @contextmanager
+    def step(self, name: str):
+        """Mide un paso de inicialización (p. ej. conectar el sink de logs en Mongo)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps[name] = round((time.perf_counter() - started) * 1000, 1)
+
+    def report(self) -> dict:
+        """Importaciones ordenadas de la más lenta a la más rápida y pasos del lifespan (ms)."""
+        imports = sorted(self.imports.items(), key=lambda item: item[1]["ms"], reverse=True)
+        return {"imports": dict(imports), "steps": dict(self.steps)}
+
+
+startup_timings = StartupTimings()
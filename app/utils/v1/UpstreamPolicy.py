@@ -0,0 +1,184 @@
+import threading
+import time
+from dataclasses import dataclass
+
+import httpx
+from tenacity import (
+    retry_if_exception_type,
+    retry_if_result,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+
+# Errores de transporte que se reintentan (solo en llamadas idempotentes)
+RETRYABLE_EXCEPTIONS = (
+    httpx.ConnectError,
+    httpx.ConnectTimeout,
+    httpx.ReadTimeout,
+    httpx.PoolTimeout,
+    httpx.RemoteProtocolError,
+)
+# Respuestas del gateway que indican un fallo transitorio
+RETRYABLE_STATUS = frozenset({502, 503, 504})
+
+
+class CircuitOpenError(Exception):
+    """El circuito del upstream está abierto: se rechaza la llamada sin contactarlo."""
+
+    def __init__(self, name: str, retry_after: float):
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(f"Servicio {name} no disponible temporalmente (reintentar en {retry_after:.0f}s)")
+
+
+@dataclass(frozen=True)
+class UpstreamPolicy:
+    """
+    Política declarativa para un endpoint upstream.
+
+    Attributes:
+        name (str): Nombre corto del upstream (etiqueta de logs, métricas y breaker).
+        connect_timeout (float): Segundos para establecer la conexión.
+        read_timeout (float): Segundos máximos esperando la respuesta.
+        write_timeout (float): Segundos para enviar el cuerpo.
+        pool_timeout (float): Segundos esperando una conexión libre del pool.
+        idempotent (bool): Si la operación es de solo lectura. Solo estas se reintentan.
+        max_retries (int): Reintentos adicionales ante errores transitorios (idempotentes).
+        backoff_base (float): Multiplicador del backoff exponencial con jitter.
+        backoff_max (float): Espera máxima entre reintentos.
+        failure_threshold (int): Fallos consecutivos que abren el circuito.
+        reset_timeout (float): Segundos que el circuito permanece abierto.
+    """
+    name: str
+    connect_timeout: float = 5.0
+    read_timeout: float = 60.0
+    write_timeout: float = 10.0
+    pool_timeout: float = 5.0
+    idempotent: bool = False
+    max_retries: int = 0
+    backoff_base: float = 0.5
+    backoff_max: float = 4.0
+    failure_threshold: int = 5
+    reset_timeout: float = 30.0
+
+    def __post_init__(self):
+        if self.max_retries and not self.idempotent:
+            raise ValueError(f"La política '{self.name}' no es idempotente y no puede tener reintentos")
+
+    @property
+    def timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(
+            connect=self.connect_timeout,
+            read=self.read_timeout,
+            write=self.write_timeout,
+            pool=self.pool_timeout,
+        )
+
+    @property
+    def attempts(self) -> int:
+        return 1 + (self.max_retries if self.idempotent else 0)
+
+    def retry_kwargs(self) -> dict:
+        """Argumentos para `tenacity.AsyncRetrying`/`Retrying` según la política."""
+        return {
+            "stop": stop_after_attempt(self.attempts),
+            "wait": wait_random_exponential(multiplier=self.backoff_base, max=self.backoff_max),
+            "retry": (
+                retry_if_exception_type(RETRYABLE_EXCEPTIONS)
+                | retry_if_result(lambda response: response.status_code in RETRYABLE_STATUS)
+            ),
+            # Al agotar los intentos se devuelve la última respuesta o se relanza la última excepción
+            "retry_error_callback": lambda retry_state: retry_state.outcome.result(),
+        }
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker por upstream y por worker.
+
+    - ``closed``: las llamadas pasan; `failure_threshold` fallos consecutivos lo abren.
+    - ``open``: se rechaza de inmediato con `CircuitOpenError` durante `reset_timeout`.
+    - ``half_open``: pasado ese tiempo se deja pasar una sola llamada de prueba; si funciona
+      se cierra y si falla se vuelve a abrir.
+
+    Se cuentan como fallos los errores de transporte/timeouts y las respuestas 5xx.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.total_failures = 0
+        self.rejected = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Valida si se puede llamar al upstream; lanza `CircuitOpenError` si no."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            elapsed = time.monotonic() - self.opened_at
+            if self.state == self.OPEN and elapsed >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+            self.rejected += 1
+            raise CircuitOpenError(self.name, max(0.0, self.reset_timeout - elapsed))
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.total_failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def release_probe(self):
+        """Libera la llamada de prueba si terminó sin resultado (p. ej. cancelada)."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def snapshot(self) -> dict:
+        """Estado actual del breaker (para health checks y métricas)."""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "total_failures": self.total_failures,
+            "rejected": self.rejected,
+        }
+
+
+DEFAULT_POLICY = UpstreamPolicy(name="default", connect_timeout=10.0, read_timeout=120.0)
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(policy: UpstreamPolicy) -> CircuitBreaker:
+    """Devuelve (creándolo si hace falta) el breaker asociado a la política."""
+    breaker = _breakers.get(policy.name)
+    if breaker is None:
+        breaker = _breakers.setdefault(
+            policy.name,
+            CircuitBreaker(policy.name, policy.failure_threshold, policy.reset_timeout),
+        )
+    return breaker
+
+
+def circuit_breaker_states() -> dict[str, dict]:
+    """Estado de todos los breakers creados en este worker."""
+    return {name: breaker.snapshot() for name, breaker in _breakers.items()}
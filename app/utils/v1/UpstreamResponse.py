@@ -0,0 +1,131 @@
+from typing import Any
+
+import httpx
+from fastapi import HTTPException, status
+
+from app.utils.v1.AsyncHttpx import get_policy
+from app.utils.v1.FastJSON import JSONDecodeError, json_loads
+from app.utils.v1.Metrics import upstream_outcomes
+from app.utils.v1.UpstreamPolicy import DEFAULT_POLICY
+from app.utils.v2.LoggerSingletonDB import logger
+
+# Códigos de `status.code` que devuelven los servicios de Seguros Mercantil
+EXITO = "EXITO"
+FALLONEGOCIO = "FALLONEGOCIO"
+ERROR = "ERROR"
+
+
+class UpstreamResponse:
+    """
+    Respuesta de un upstream de Seguros Mercantil decodificada una sola vez.
+
+    Los endpoints llamaban a `response.json()` en cada validación, y cada llamada volvía a
+    parsear el documento completo. Aquí el cuerpo se decodifica la primera vez que se usa
+    (con `orjson` si está instalado) y se reutiliza.
+
+    Attributes:
+        response (httpx.Response): Respuesta original.
+        status_code (int): Código HTTP del upstream.
+    """
+
+    __slots__ = ("response", "status_code", "_data")
+
+    def __init__(self, response: httpx.Response):
+        self.response = response
+        self.status_code = response.status_code
+        self._data = None
+
+    @property
+    def text(self) -> str:
+        return self.response.text
+
+    @property
+    def data(self) -> dict:
+        """Cuerpo JSON decodificado (una sola vez)."""
+        if self._data is None:
+            try:
+                self._data = json_loads(self.response.content)
+            except JSONDecodeError as e:
+                logger.error(f"Respuesta no JSON del upstream ({self.status_code}): {self.text}")
+                raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=self.text) from e
+            if self.code is not None:
+                upstream_outcomes.inc(self.upstream, self.code)
+        return self._data
+
+    @property
+    def upstream(self) -> str:
+        """Nombre del upstream según su `UpstreamPolicy` (etiqueta de métricas)."""
+        try:
+            return get_policy(str(self.response.request.url)).name
+        except RuntimeError:
+            # respuesta construida sin request (p. ej. en pruebas)
+            return DEFAULT_POLICY.name
+
+    @property
+    def status(self) -> dict:
+        status_ = self.data.get("status") if isinstance(self.data, dict) else None
+        return status_ if isinstance(status_, dict) else {}
+
+    @property
+    def code(self) -> str | None:
+        """`status.code` del cuerpo (EXITO, FALLONEGOCIO, ERROR...)."""
+        return self.status.get("code")
+
+    @property
+    def descripcion(self) -> str | None:
+        """`status.descripcion` del cuerpo."""
+        return self.status.get("descripcion")
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code == 200 and self.code == EXITO
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.data.get(key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        return self.data[key]
+
+    def failure_detail(self, status_detail: bool = False) -> str:
+        """
+        Detalle del error para el cliente: el cuerpo del upstream o, con `status_detail`,
+        `"<status.code> <status.descripcion>"` (el cuerpo si no trae esos campos).
+        """
+        if status_detail:
+            try:
+                return f"{self.data['status']['code']} {self.data['status']['descripcion']}"
+            except (HTTPException, KeyError, TypeError):
+                pass
+        return self.text
+
+    def ensure_success(
+        self, failure_status: int | dict[str, int] | None = None, status_detail: bool = False
+    ) -> "UpstreamResponse":
+        """
+        Valida la respuesta como lo hacían los endpoints: HTTP 200 y `status.code == EXITO`.
+
+        Args:
+            failure_status: Código HTTP a devolver cuando `status.code` no es EXITO. Puede
+                ser un entero o un dict por código (p. ej. `{FALLONEGOCIO: 400}`). Por
+                defecto se usa el código HTTP del upstream.
+            status_detail: Responder `"<status.code> <status.descripcion>"` en lugar del
+                cuerpo del upstream (ver `failure_detail`).
+
+        Returns:
+            UpstreamResponse: La misma respuesta, para encadenar.
+
+        Raises:
+            HTTPException: Con el cuerpo del upstream (o su código y descripción) como detalle.
+        """
+        if self.status_code != 200:
+            logger.error(self.text)
+            raise HTTPException(status_code=self.status_code, detail=self.failure_detail(status_detail))
+        code = self.code
+        if code != EXITO:
+            logger.error(self.text)
+            if isinstance(failure_status, dict):
+                failure_status = failure_status.get(code)
+            raise HTTPException(
+                status_code=failure_status or self.status_code, detail=self.failure_detail(status_detail)
+            )
+        return self
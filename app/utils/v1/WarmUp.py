@@ -0,0 +1,108 @@
+import time
+from typing import Any, Awaitable, Callable
+
+import anyio
+from fastapi import FastAPI
+
+from app.utils.v1.AsyncHttpx import http_pool, upstream_hosts
+from app.utils.v1.configs import WARMUP_CONNECTIONS, WARMUP_TIMEOUT
+from app.utils.v1.LoggerSingleton import logger
+
+
+class WarmUp:
+    """
+    Calentamiento del worker: pasos que se ejecutan en segundo plano al iniciar (conexiones a
+    los upstreams, Mongo, schemas) para que las primeras peticiones no paguen ese costo.
+
+    Mientras está en curso `ready` es False y `/health` responde 503, de modo que el
+    balanceador no envía tráfico al worker. Sin lifespan (p. ej. en las pruebas) no hay
+    calentamiento y el worker se considera listo.
+    """
+
+    def __init__(self):
+        self.in_progress = False
+        self.steps: dict[str, dict] = {}
+
+    @property
+    def ready(self) -> bool:
+        return not self.in_progress
+
+    def begin(self):
+        """Marca el worker como no listo; se llama antes de aceptar peticiones."""
+        self.in_progress = True
+
+    async def run(self, steps: dict[str, Callable[[], Awaitable[Any]]]):
+        """
+        Ejecuta los pasos en paralelo. El fallo de un paso se registra y no impide que el
+        worker quede listo: solo se pierde la ventaja del calentamiento.
+
+        Args:
+            steps (dict): Nombre del paso -> corrutina sin argumentos.
+        """
+        self.begin()
+        started = time.perf_counter()
+        try:
+            async with anyio.create_task_group() as tg:
+                for name, step in steps.items():
+                    tg.start_soon(self._run_step, name, step)
+        finally:
+            self.in_progress = False
+        logger.info(f"Calentamiento terminado en {(time.perf_counter() - started) * 1000:.0f} ms: {self.steps}")
+
+    async def _run_step(self, name: str, step: Callable[[], Awaitable[Any]]):
+        started = time.perf_counter()
+        try:
+            result = await step()
+        except Exception as e:
+            logger.warning(f"Calentamiento: falló el paso {name}: {e!r}")
+            self.steps[name] = {"ok": False, "ms": _ms(started), "error": str(e)}
+        else:
+            self.steps[name] = {"ok": True, "ms": _ms(started), "result": result}
+
+    def report(self) -> dict:
+        return {"ready": self.ready, "steps": dict(self.steps)}
+
+
+def _ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+async def open_upstream_connections(connections: int = WARMUP_CONNECTIONS,
+                                    timeout: float = WARMUP_TIMEOUT) -> dict[str, int]:
+    """
+    Abre conexiones del pool hacia cada host upstream de `constants.py`.
+
+    Returns:
+        dict: Conexiones abiertas por host.
+    """
+    opened = {}
+
+    async def warm(host: str, verify: bool):
+        opened[host] = await http_pool.warm(host, verify, connections, timeout)
+
+    async with anyio.create_task_group() as tg:
+        for host, verify in upstream_hosts():
+            tg.start_soon(warm, host, verify)
+    return opened
+
+
+async def ping_mongodb():
+    """Selección de servidor y conexión a MongoDB (en un hilo: pymongo es bloqueante)."""
+    from app.utils.v1.database import DatabaseSingleton
+
+    await anyio.to_thread.run_sync(lambda: DatabaseSingleton().ping())
+
+
+async def build_response_models(app: FastAPI) -> int:
+    """
+    Genera el esquema OpenAPI (JSON schema de todos los modelos de request y response de
+    los routers montados), que FastAPI construye de forma perezosa en la primera consulta.
+
+    Returns:
+        int: Cantidad de schemas generados.
+    """
+    schema = await anyio.to_thread.run_sync(app.openapi)
+    return len(schema.get("components", {}).get("schemas", {}))
+
+
+warm_up = WarmUp()
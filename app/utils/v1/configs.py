@@ -43,6 +43,91 @@ class Settings(BaseSettings):
     BACKEND_BASE_URL: str | None = None
     API_TOKEN_MCP: str | None = None
 
+    # Pool de conexiones HTTP hacia los upstreams (un cliente por host y por worker)
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP2_ENABLED: bool = False
+
+    # Sink de logs en MongoDB (buffer en memoria + insert_many en segundo plano)
+    MONGO_LOG_BATCH_SIZE: int = 100
+    MONGO_LOG_FLUSH_INTERVAL: float = 1.0
+    MONGO_LOG_QUEUE_SIZE: int = 10000
+    MONGO_LOG_DROP_POLICY: str = "drop_newest"  # drop_newest | drop_oldest | block
+
+    # Caché de respuestas de upstream; "mongo" la comparte entre los workers
+    CACHE_BACKEND: str = "memory"  # memory | mongo
+    TASA_BCV_CACHE_TTL: float = 300.0  # segundos, solo para la tasa del día en curso
+    LOOKUP_CACHE_TTL: float = 60.0  # segundos, consultas de persona/póliza/recibos
+    LOOKUP_CACHE_MAXSIZE: int = 2048
+    CACHE_ENCRYPTION_KEY: str | None = None  # requerido para compartir datos personales en Mongo
+    CUADRO_POLIZA_CACHE_DIR: str | None = None  # directorio para guardar los PDF; vacío = sin caché
+    CUADRO_POLIZA_CACHE_TTL: float = 86400.0
+    COTIZACION_CACHE_TTL: float = 21600.0  # segundos; además nunca pasa del fin del día (hora de Venezuela)
+    COTIZACION_CACHE_MAXSIZE: int = 4096
+
+    # Cotización por lote (v5): variantes por petición y llamadas simultáneas a cotizarglobal
+    COTIZACION_LOTE_MAX: int = 50
+    COTIZACION_LOTE_CONCURRENCIA: int = 4
+
+    # Métricas de Prometheus en /metrics; con METRICS_DIR se suman las de todos los workers
+    METRICS_DIR: str | None = None
+    METRICS_FLUSH_INTERVAL: float = 5.0  # segundos entre instantáneas de cada worker
+
+    # LoggingMiddleware: una línea por petición y otra por respuesta (~85 us por petición con
+    # sink a archivo, ver benchmarks/bench_middlewares.py); false lo quita si basta el access log
+    REQUEST_LOGGING: bool = True
+
+    # Registro de payloads (log_payload / log_response): tamaño por campo, por lista y total
+    PAYLOAD_LOG_FIELD_MAX: int = 512
+    PAYLOAD_LOG_LIST_MAX: int = 20
+    PAYLOAD_LOG_MAX_CHARS: int = 8192
+    PAYLOAD_LOG_SAMPLE_RATE: float = 1.0  # fracción de respuestas exitosas que se registran
+
+    # Calentamiento al iniciar el worker; /health responde 503 hasta que termina
+    WARMUP_ENABLED: bool = True
+    WARMUP_CONNECTIONS: int = 2  # conexiones por host upstream
+    WARMUP_TIMEOUT: float = 5.0
+    WARMUP_TASA_BCV: bool = False  # precargar la tasa BCV del día en la caché
+
+    # Sondeo de dependencias (Mongo y upstreams) para /ready; 0 lo desactiva
+    PROBE_INTERVAL: float = 15.0  # segundos entre rondas
+    PROBE_TIMEOUT: float = 3.0
+    # Hosts upstream (esquema://host[:puerto], JSON en el entorno) cuya caída deja al worker
+    # no listo; los demás solo se informan en /health/dependencies
+    PROBE_CRITICAL_HOSTS: list[str] = []
+
+    # Cliente del servidor MCP hacia BACKEND_BASE_URL (uno por proceso, con keep-alive)
+    MCP_BACKEND_MAX_CONNECTIONS: int = 20
+    MCP_BACKEND_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    MCP_BACKEND_KEEPALIVE_EXPIRY: float = 30.0
+    MCP_BACKEND_CONNECT_TIMEOUT: float = 5.0
+    MCP_BACKEND_TIMEOUT: float = 180.0  # segundos de lectura para las herramientas sin valor propio
+    # Por herramienta (JSON en el entorno): cubren el read_timeout del upstream con los reintentos del backend
+    MCP_TOOL_TIMEOUTS: dict[str, float] = {
+        "consultar_persona": 100.0,
+        "consultar_poliza": 190.0,
+        "consultar_cotizacion": 190.0,
+    }
+    # http: las herramientas llaman al backend por HTTP; inprocess: ejecutan la lógica de los
+    # routers en el propio proceso del MCP (requiere la configuración de los upstreams)
+    MCP_DISPATCH: str = "http"  # http | inprocess
+    # Tamaño de los resultados de las herramientas MCP: máximo de elementos por lista y
+    # página por defecto de las listas paginadas (recibos y cuotas)
+    MCP_RESULT_MAX_ITEMS: int = 25
+    MCP_RESULT_PAGE_SIZE: int = 10
+    # stdio: un proceso por cliente LLM; http: un proceso sirve muchas sesiones por
+    # streamable-HTTP (Bearer MCP_LOCAL_TOKEN) con el mismo pool y cachés
+    MCP_TRANSPORT: str = "stdio"  # stdio | http
+    MCP_HTTP_HOST: str = "127.0.0.1"
+    MCP_HTTP_PORT: int = 8001
+    MCP_HTTP_PATH: str = "/mcp"
+    MCP_SESSION_IDLE_TIMEOUT: float = 1800.0  # segundos sin actividad antes de cerrar la sesión
+    MCP_SESSION_MAX_CONCURRENCY: int = 4  # llamadas a herramientas simultáneas por sesión
+
+    # Routers montados, separados por coma (v1_sm, v2_sm, ..., v1_pasarela, v2_pasarela); vacío = todos
+    ENABLED_ROUTERS: str | None = None
+
     # Load the settings from the .env file
     model_config = SettingsConfigDict(
         env_file=str(ENV_FILE) if ENV_FILE.exists() else None,
@@ -101,8 +186,9 @@ def get_mcp_local_token() -> str:
     return mcp_local_token
 
 
-# Assign the settings to variables (solo si no estamos en modo MCP o si están definidas)
-if not IS_MCP_MODE:
+# Assign the settings to variables (solo si no estamos en modo MCP o si están definidas).
+# Con MCP_DISPATCH=inprocess el MCP ejecuta los routers y necesita la configuración completa
+if not IS_MCP_MODE or settings.MCP_DISPATCH == "inprocess":
     API_KEY_AUTH = settings.API_KEY_AUTH or ""
     SM_PRIMARY_KEY = settings.SM_PRIMARY_KEY or ""
     SM_SECONDARY_KEY = settings.SM_SECONDARY_KEY or ""
@@ -129,6 +215,58 @@ else:
     API_KEY_AUTH = settings.API_KEY_AUTH or ""
 
 
+# Configuración con valores por defecto (pool HTTP, sink de logs, cachés), aplica en ambos modos
+HTTP_MAX_CONNECTIONS = settings.HTTP_MAX_CONNECTIONS
+HTTP_MAX_KEEPALIVE_CONNECTIONS = settings.HTTP_MAX_KEEPALIVE_CONNECTIONS
+HTTP_KEEPALIVE_EXPIRY = settings.HTTP_KEEPALIVE_EXPIRY
+HTTP2_ENABLED = settings.HTTP2_ENABLED
+MONGO_LOG_BATCH_SIZE = settings.MONGO_LOG_BATCH_SIZE
+MONGO_LOG_FLUSH_INTERVAL = settings.MONGO_LOG_FLUSH_INTERVAL
+MONGO_LOG_QUEUE_SIZE = settings.MONGO_LOG_QUEUE_SIZE
+MONGO_LOG_DROP_POLICY = settings.MONGO_LOG_DROP_POLICY
+CACHE_BACKEND = settings.CACHE_BACKEND
+TASA_BCV_CACHE_TTL = settings.TASA_BCV_CACHE_TTL
+LOOKUP_CACHE_TTL = settings.LOOKUP_CACHE_TTL
+LOOKUP_CACHE_MAXSIZE = settings.LOOKUP_CACHE_MAXSIZE
+CACHE_ENCRYPTION_KEY = settings.CACHE_ENCRYPTION_KEY
+CUADRO_POLIZA_CACHE_DIR = settings.CUADRO_POLIZA_CACHE_DIR
+CUADRO_POLIZA_CACHE_TTL = settings.CUADRO_POLIZA_CACHE_TTL
+COTIZACION_CACHE_TTL = settings.COTIZACION_CACHE_TTL
+COTIZACION_CACHE_MAXSIZE = settings.COTIZACION_CACHE_MAXSIZE
+ENABLED_ROUTERS = settings.ENABLED_ROUTERS
+METRICS_DIR = settings.METRICS_DIR
+METRICS_FLUSH_INTERVAL = settings.METRICS_FLUSH_INTERVAL
+REQUEST_LOGGING = settings.REQUEST_LOGGING
+PAYLOAD_LOG_FIELD_MAX = settings.PAYLOAD_LOG_FIELD_MAX
+PAYLOAD_LOG_LIST_MAX = settings.PAYLOAD_LOG_LIST_MAX
+PAYLOAD_LOG_MAX_CHARS = settings.PAYLOAD_LOG_MAX_CHARS
+PAYLOAD_LOG_SAMPLE_RATE = settings.PAYLOAD_LOG_SAMPLE_RATE
+COTIZACION_LOTE_MAX = settings.COTIZACION_LOTE_MAX
+COTIZACION_LOTE_CONCURRENCIA = settings.COTIZACION_LOTE_CONCURRENCIA
+WARMUP_ENABLED = settings.WARMUP_ENABLED
+WARMUP_CONNECTIONS = settings.WARMUP_CONNECTIONS
+WARMUP_TIMEOUT = settings.WARMUP_TIMEOUT
+WARMUP_TASA_BCV = settings.WARMUP_TASA_BCV
+PROBE_INTERVAL = settings.PROBE_INTERVAL
+PROBE_TIMEOUT = settings.PROBE_TIMEOUT
+PROBE_CRITICAL_HOSTS = settings.PROBE_CRITICAL_HOSTS
+MCP_BACKEND_MAX_CONNECTIONS = settings.MCP_BACKEND_MAX_CONNECTIONS
+MCP_BACKEND_MAX_KEEPALIVE_CONNECTIONS = settings.MCP_BACKEND_MAX_KEEPALIVE_CONNECTIONS
+MCP_BACKEND_KEEPALIVE_EXPIRY = settings.MCP_BACKEND_KEEPALIVE_EXPIRY
+MCP_BACKEND_CONNECT_TIMEOUT = settings.MCP_BACKEND_CONNECT_TIMEOUT
+MCP_BACKEND_TIMEOUT = settings.MCP_BACKEND_TIMEOUT
+MCP_TOOL_TIMEOUTS = settings.MCP_TOOL_TIMEOUTS
+MCP_DISPATCH = settings.MCP_DISPATCH
+MCP_RESULT_MAX_ITEMS = settings.MCP_RESULT_MAX_ITEMS
+MCP_RESULT_PAGE_SIZE = settings.MCP_RESULT_PAGE_SIZE
+MCP_TRANSPORT = settings.MCP_TRANSPORT
+MCP_HTTP_HOST = settings.MCP_HTTP_HOST
+MCP_HTTP_PORT = settings.MCP_HTTP_PORT
+MCP_HTTP_PATH = settings.MCP_HTTP_PATH
+MCP_SESSION_IDLE_TIMEOUT = settings.MCP_SESSION_IDLE_TIMEOUT
+MCP_SESSION_MAX_CONCURRENCY = settings.MCP_SESSION_MAX_CONCURRENCY
+
+
 def get_valid_api_keys() -> list[str]:
     valid_keys = []
     if settings.API_KEY_AUTH:
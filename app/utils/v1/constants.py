@@ -1,3 +1,5 @@
+from datetime import timedelta, timezone
+
 from app.utils.v1.configs import (
     SM_ENDPOINT,
     SUBSCRIPTION_KEY,
@@ -11,6 +13,10 @@ from app.utils.v1.configs import (
     URL_ANULAR_POLIZA,
     API_KEY_ANULAR_POLIZA,
 )
+from app.utils.v1.UpstreamPolicy import UpstreamPolicy
+
+# Venezuela no aplica horario de verano: UTC-4 todo el año
+VET = timezone(timedelta(hours=-4))
 
 tipo_documento = {"V": "VEN", "E": "VEN", "P": "OPPA"}
 
@@ -35,6 +41,39 @@ if ENV in ["production"]:
 else:
     url_cuadro_poliza = f"{SM_ENDPOINT}/swrep/ve/pru/executeRep"
 
+# Política por upstream: timeouts, reintentos (solo lecturas idempotentes) y circuit breaker.
+# Las operaciones que crean o modifican datos (crear persona, cotizar, emitir, pagos,
+# anulación) nunca se reintentan de forma automática.
+UPSTREAM_POLICIES = {
+    url_consult_persona: UpstreamPolicy(
+        name="consultar_persona", read_timeout=30.0, idempotent=True, max_retries=2
+    ),
+    url_consultar_poliza: UpstreamPolicy(
+        name="consultar_poliza", read_timeout=60.0, idempotent=True, max_retries=2
+    ),
+    url_consultar_cotizacion: UpstreamPolicy(
+        name="consultar_cotizacion", read_timeout=60.0, idempotent=True, max_retries=2
+    ),
+    url_suscripcion_tasa_bcv: UpstreamPolicy(
+        name="tasa_bcv", read_timeout=20.0, idempotent=True, max_retries=2
+    ),
+    url_cuadro_poliza: UpstreamPolicy(
+        name="cuadro_poliza", read_timeout=120.0, idempotent=True, max_retries=1
+    ),
+    url_crear_persona: UpstreamPolicy(name="crear_persona", read_timeout=60.0),
+    url_crear_cotizacion: UpstreamPolicy(name="crear_cotizacion", read_timeout=120.0),
+    url_cotizar: UpstreamPolicy(name="cotizar", read_timeout=120.0),
+    url_emitir_poliza: UpstreamPolicy(name="emitir_poliza", read_timeout=180.0),
+    url_inclusion_anexos_poliza: UpstreamPolicy(name="incluir_anexo", read_timeout=120.0),
+    url_registrar_pago: UpstreamPolicy(name="registrar_pago", read_timeout=120.0),
+    url_otp_mbu: UpstreamPolicy(name="otp_mbu", read_timeout=60.0),
+    url_notificacion_pago: UpstreamPolicy(name="notificacion_pago", read_timeout=60.0),
+    url_anular_poliza: UpstreamPolicy(name="anular_poliza", read_timeout=120.0),
+}
+
+# Upstreams de PasarelaPagoMS que se llaman sin verificar el certificado TLS (verify=False)
+UNVERIFIED_TLS_URLS = frozenset({url_registrar_pago, url_otp_mbu, url_suscripcion_tasa_bcv, url_notificacion_pago})
+
 headers = {
     "Ocp-Apim-Subscription-Key": SUBSCRIPTION_KEY,
     "Content-Type": "application/json",
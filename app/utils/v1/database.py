@@ -12,6 +12,7 @@ class DatabaseSingleton:
     _client = None
     _logs_integration_db = None
     _closed = False
+    _close_hooks: list = []
 
 
 
@@ -29,6 +30,7 @@ class DatabaseSingleton:
         self._client = pymongo.MongoClient(MONGO_URI)
         db = self._client.cuida_saludDB
         self._logs_integration_ms_db = db.logs_integration_ms
+        self._cache_integration_ms_db = db.cache_integration_ms
         self._closed = False
         logger.info(f"Database connection established: {MONGO_URI.split('@')[1]}")
 
@@ -37,9 +39,31 @@ class DatabaseSingleton:
         """Get logs_integration collection"""
         return self._logs_integration_ms_db
 
+    @property
+    def cache_integration_ms(self):
+        """Get cache_integration_ms collection (caché de respuestas compartida entre workers)"""
+        return self._cache_integration_ms_db
+
+
+    def ping(self):
+        """Comando `ping` al servidor: fuerza la selección de servidor y abre la conexión."""
+        return self._client.admin.command("ping")
+
+    def register_close_hook(self, hook):
+        """
+        Registra una función que se ejecuta antes de cerrar la conexión (p. ej. vaciar el
+        buffer de logs pendiente). Se invoca desde el hook `atexit` de este singleton.
+        """
+        self._close_hooks.append(hook)
 
     def _safe_close(self):
         """Safe close method that handles shutdown gracefully"""
+        for hook in self._close_hooks:
+            try:
+                hook()
+            except Exception:
+                # Ignorar errores durante el shutdown
+                pass
         if not self._closed and self._client:
             try:
                 self._client.close()
@@ -1,6 +1,7 @@
 from app.utils.v1.configs import APPLICATION, USER
+from app.utils.v1.PayloadTemplate import PayloadTemplate
 
-payload_persona = {
+payload_persona = PayloadTemplate({
     "aplicacion": APPLICATION,
     "funcionalidad": "CREAR_PERSONA_V",
     "persona": [
@@ -40,10 +41,10 @@ payload_persona = {
         }
     ],
     "usuario": USER,
-}
+})
 
 
-payload_cotizacion = {
+payload_cotizacion = PayloadTemplate({
     "persona": [],
     "funcionalidad": "COTIZAR_ACCD_PERS_V",
     "aplicacion": APPLICATION,
@@ -131,10 +132,10 @@ payload_cotizacion = {
         ]
     },
     "coll_grpaseg": {"grpaseg": []},
-}
+})
 
 
-payload_emitir_poliza = {
+payload_emitir_poliza = PayloadTemplate({
     "aplicacion": APPLICATION,
     "funcionalidad": "EMITIR_POLIZA_V",
     "usuario": USER,
@@ -149,9 +150,9 @@ payload_emitir_poliza = {
             }
         ]
     },
-}
+})
 
-payload_consultar_poliza = {
+payload_consultar_poliza = PayloadTemplate({
     "aplicacion": APPLICATION,
     "funcionalidad": "CONSULTAR_POL_REC_CUOTA_V",
     "usuario": USER,
@@ -163,16 +164,16 @@ payload_consultar_poliza = {
             "certificado": 1,
         }
     ],
-}
+})
 
-payload_consultar_persona = {
+payload_consultar_persona = PayloadTemplate({
     "aplicacion": APPLICATION,
     "funcionalidad": "CONSULTAR_PERSONA_V",
     "usuario": USER,
     "persona": {},
-}
+})
 
-payload_inclusion_anexos_poliza = {
+payload_inclusion_anexos_poliza = PayloadTemplate({
     "aplicacion": APPLICATION,
     "funcionalidad": "INCLUIR_ANEXO_POL_VIG_V",
     "usuario": USER,
@@ -204,4 +205,4 @@ payload_inclusion_anexos_poliza = {
             "va_dato": "Nombre Asegurado",  # variable Nombre del asegurado.
         },
     ],
-}
+})
@@ -46,18 +46,52 @@ class LoggerSingletonDB:
                     )
                 except Exception as e:
                     logger.warning(f"File logging disabled (failed to open '{log_filename}'): {e}")
-            try:
-                mongodb_handler = setup_mongodb_handler()
-                logger.add(
-                    mongodb_handler,
-                    level="INFO",  # Define el nivel mínimo de logs para MongoDB
-                    serialize=True,  # Esta es la clave para enviar el log completo como JSON
-                )
-            except Exception as e:
-                logger.warning(f"MongoDB logging disabled (setup failed): {e}")
+            # El sink de MongoDB abre la conexión, por eso no se agrega al importar:
+            # lo agrega el lifespan de la app con `attach_mongodb_sink()`
             cls._instance = logger
 
         return cls._instance
 
 logger = LoggerSingletonDB(app_name="IntegracionMS")
 
+_mongodb_sink = None
+
+
+def attach_mongodb_sink() -> bool:
+    """
+    Agrega el sink de logs en MongoDB (una sola vez por proceso). Abre la conexión a
+    Mongo, así que se llama desde el lifespan y fuera del event loop.
+
+    Returns:
+        bool: True si el sink quedó activo.
+    """
+    global _mongodb_sink
+    if _mongodb_sink is not None:
+        return True
+    try:
+        handler = setup_mongodb_handler()
+        sink_id = logger.add(
+            handler,
+            level="INFO",  # Define el nivel mínimo de logs para MongoDB
+            # Sin serialize=True: el handler arma el documento a partir de msg.record,
+            # así que serializar el mensaje completo a JSON era trabajo desperdiciado.
+        )
+    except Exception as e:
+        logger.warning(f"MongoDB logging disabled (setup failed): {e}")
+        return False
+    _mongodb_sink = (sink_id, handler)
+    return True
+
+
+def detach_mongodb_sink():
+    """Quita el sink de MongoDB y vacía los registros pendientes."""
+    global _mongodb_sink
+    if _mongodb_sink is None:
+        return
+    sink_id, handler = _mongodb_sink
+    _mongodb_sink = None
+    logger.remove(sink_id)
+    close = getattr(handler, "close", None)
+    if close is not None:
+        close()
+
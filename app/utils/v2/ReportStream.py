@@ -0,0 +1,225 @@
+import binascii
+import os
+import re
+import time
+import uuid
+from pathlib import Path
+from typing import AsyncIterator
+
+import anyio
+import httpx
+
+from app.utils.v2.LoggerSingletonDB import logger
+
+PDF_MAGIC = b"%PDF"
+CHUNK_SIZE = 64 * 1024
+# Las respuestas de error del upstream son pequeñas; si el campo no aparece en este
+# tamaño la respuesta no es un reporte
+MAX_PREFIX = 256 * 1024
+
+_WHITESPACE = b" \t\r\n"
+_ESCAPES = {ord("/"): b"/", ord("n"): b"", ord("r"): b"", ord("t"): b""}
+
+
+class ReportStreamError(Exception):
+    """El upstream no devolvió un reporte válido; `body` trae lo recibido para el log."""
+
+    def __init__(self, message: str, body: bytes = b""):
+        super().__init__(message)
+        self.body = body
+
+
+class Base64FieldDecoder:
+    """
+    Extrae y decodifica de forma incremental un campo base64 de un documento JSON.
+
+    Recibe el cuerpo por partes (`feed`) y devuelve los bytes ya decodificados, sin
+    construir nunca el JSON ni el string base64 completos: la memoria usada queda acotada
+    por el tamaño del chunk, sin importar el tamaño del reporte.
+
+    Attributes:
+        found (bool): Se encontró el inicio del campo.
+        done (bool): Se leyó el cierre del string.
+        prefix (bytes): Lo recibido antes del campo (para diagnosticar errores).
+    """
+
+    def __init__(self, field: str, max_prefix: int = MAX_PREFIX):
+        self._start = re.compile(rb'"' + re.escape(field.encode()) + rb'"\s*:\s*"')
+        self.max_prefix = max_prefix
+        self.prefix = b""
+        self.found = False
+        self.done = False
+        self._pending = b""
+        self._escape = False
+
+    def feed(self, chunk: bytes) -> bytes:
+        """Procesa un chunk del cuerpo y devuelve los bytes decodificados disponibles."""
+        if self.done:
+            return b""
+        if not self.found:
+            self.prefix += chunk
+            match = self._start.search(self.prefix)
+            if match is None:
+                if len(self.prefix) > self.max_prefix:
+                    raise ReportStreamError("El campo del reporte no aparece en la respuesta", self.prefix)
+                return b""
+            self.found = True
+            chunk = self.prefix[match.end():]
+            self.prefix = self.prefix[:match.start()]
+        return self._decode(self._unescape(chunk))
+
+    def finish(self) -> bytes:
+        """Decodifica el resto pendiente al terminar el cuerpo."""
+        if not self.found:
+            raise ReportStreamError("La respuesta no contiene el reporte", self.prefix)
+        if not self.done:
+            raise ReportStreamError("La respuesta terminó antes de cerrar el reporte")
+        try:
+            return binascii.a2b_base64(self._pending) if self._pending else b""
+        finally:
+            self._pending = b""
+
+    def _unescape(self, chunk: bytes) -> bytes:
+        # Devuelve solo los caracteres base64 del string, resolviendo los escapes JSON
+        # (`\/`, `\n`) y detectando la comilla de cierre
+        out = []
+        i = 0
+        if self._escape and chunk:
+            out.append(self._resolve(chunk[0]))
+            self._escape = False
+            i = 1
+        while i < len(chunk):
+            quote = chunk.find(b'"', i)
+            backslash = chunk.find(b"\\", i)
+            if backslash != -1 and (quote == -1 or backslash < quote):
+                out.append(chunk[i:backslash])
+                if backslash + 1 < len(chunk):
+                    out.append(self._resolve(chunk[backslash + 1]))
+                else:
+                    self._escape = True
+                i = backslash + 2
+                continue
+            if quote != -1:
+                out.append(chunk[i:quote])
+                self.done = True
+            else:
+                out.append(chunk[i:])
+            break
+        return b"".join(out).translate(None, _WHITESPACE)
+
+    @staticmethod
+    def _resolve(char: int) -> bytes:
+        try:
+            return _ESCAPES[char]
+        except KeyError:
+            raise ReportStreamError(f"Escape JSON inesperado en el reporte: \\{chr(char)}")
+
+    def _decode(self, data: bytes) -> bytes:
+        data = self._pending + data
+        usable = len(data) - len(data) % 4
+        self._pending = data[usable:]
+        return binascii.a2b_base64(data[:usable]) if usable else b""
+
+
+async def start_report(response: httpx.Response, field: str = "reporte_codificado") -> tuple[
+    Base64FieldDecoder, AsyncIterator[bytes], bytes
+]:
+    """
+    Lee la respuesta del upstream hasta obtener los primeros bytes del PDF.
+
+    Se valida la firma `%PDF` antes de responder al cliente, de modo que los errores del
+    upstream todavía se pueden devolver con su código HTTP en lugar de un PDF truncado.
+
+    Returns:
+        tuple: (decoder, iterador del resto del cuerpo, primeros bytes del PDF)
+
+    Raises:
+        ReportStreamError: Si la respuesta no trae un PDF.
+    """
+    decoder = Base64FieldDecoder(field)
+    chunks = response.aiter_bytes(CHUNK_SIZE)
+    head = b""
+    async for chunk in chunks:
+        head += decoder.feed(chunk)
+        if len(head) >= len(PDF_MAGIC) or decoder.done:
+            break
+    if decoder.done or not decoder.found:
+        head += decoder.finish()
+    if not head.startswith(PDF_MAGIC):
+        raise ReportStreamError("El reporte recibido no es un PDF", decoder.prefix)
+    return decoder, chunks, head
+
+
+async def stream_report(
+    response: httpx.Response,
+    decoder: Base64FieldDecoder,
+    chunks: AsyncIterator[bytes],
+    head: bytes,
+    cache_path: Path | None = None,
+) -> AsyncIterator[bytes]:
+    """
+    Entrega el PDF decodificado por partes y, si se indicó `cache_path`, lo guarda en
+    disco al terminar (creando su directorio si aún no existe). El archivo solo se publica
+    (rename atómico) si el reporte llegó completo. Cierra siempre la respuesta del upstream.
+    """
+    tmp_path = None
+    file = None
+    completed = False
+    try:
+        if cache_path is not None:
+            await anyio.Path(cache_path.parent).mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_suffix(f".{uuid.uuid4().hex}.part")
+            file = await anyio.open_file(tmp_path, "wb")
+            await file.write(head)
+        yield head
+        async for chunk in chunks:
+            data = decoder.feed(chunk)
+            if data:
+                if file is not None:
+                    await file.write(data)
+                yield data
+        tail = decoder.finish()
+        if tail:
+            if file is not None:
+                await file.write(tail)
+            yield tail
+        completed = True
+    finally:
+        await response.aclose()
+        if file is not None:
+            await file.aclose()
+            if completed:
+                os.replace(tmp_path, cache_path)
+            else:
+                tmp_path.unlink(missing_ok=True)
+
+
+class ReportDiskCache:
+    """
+    Caché en disco de reportes PDF ya decodificados.
+
+    Args:
+        directory (str): Directorio donde se guardan los PDF; se crea con el primer reporte
+            guardado, no al importar el módulo.
+        ttl (float): Segundos de vigencia según la fecha de modificación del archivo.
+    """
+
+    def __init__(self, directory: str, ttl: float):
+        self.directory = Path(directory)
+        self.ttl = ttl
+
+    def path_for(self, datos_poliza: dict) -> Path:
+        """Archivo del reporte: entidad_area_poliza_certificado_endoso.pdf"""
+        keys = ("cd_entidad", "cd_area", "nu_poliza", "nu_certificado", "nu_endoso")
+        return self.directory / ("_".join(str(int(datos_poliza[key])) for key in keys) + ".pdf")
+
+    def get(self, datos_poliza: dict) -> Path | None:
+        """Ruta del reporte si existe y sigue vigente."""
+        path = self.path_for(datos_poliza)
+        try:
+            if time.time() - path.stat().st_mtime < self.ttl:
+                return path
+        except FileNotFoundError:
+            return None
+        logger.info(f"Reporte en disco vencido: {path.name}")
+        return None
@@ -1,6 +1,7 @@
 from app.utils.v1.configs import APPLICATION, USER, MID
+from app.utils.v1.PayloadTemplate import PayloadTemplate
 
-payload_cotizacion = {
+payload_cotizacion = PayloadTemplate({
     "coll_preguntas": {
         "preguntas": []
     },
@@ -176,10 +177,10 @@ payload_cotizacion = {
         ]
     },
     "coll_grpaseg": {"grpaseg": []},
-}
+})
 
 
-payload_cuadro_poliza = {
+payload_cuadro_poliza = PayloadTemplate({
     "funcionalidad": "OBTENER_CUADRO_POLIZA",
     "aplicacion": APPLICATION,
     "usuario": USER,
@@ -190,9 +191,9 @@ payload_cuadro_poliza = {
         "nu_certificado": 0,
         "nu_endoso": 0
     }
-}
+})
 
-payload_consultar_cotizacion = {
+payload_consultar_cotizacion = PayloadTemplate({
     "aplicacion": APPLICATION,
     "funcionalidad": "CONSULTAR_COTIZACION_V",
     "usuario": USER,
@@ -213,28 +214,28 @@ payload_consultar_cotizacion = {
             "va_dato": ""
         }
     ]
-}
+})
 
-payload_pasarela_pago = {
+payload_pasarela_pago = PayloadTemplate({
     "aplicacion": "API_PAGO",
     "funcionalidad": "REGISTRAR_PAGO",
     "usuario": USER,
     "datos": {
         "mid": MID
     }
-}
+})
 
-payload_pasarela_otp = {
+payload_pasarela_otp = PayloadTemplate({
 "aplicacion": "API_PAGO",
     "funcionalidad": "SOLICITAR_OTP_MBU",
     "usuario": USER,
     "datos": {
         "mid": MID
     }
-}
+})
 
 
-payload_tasa_bcv = {
+payload_tasa_bcv = PayloadTemplate({
     "aplicacion": "AFINIDAD",
     "funcionalidad": "CONSULTAR_TASA_CAMBIO_V",
     "usuario": USER,
@@ -242,15 +243,15 @@ payload_tasa_bcv = {
         "in_tasa": 1,
         "cd_moneda":2,
     }
-}
+})
 
 
 
-payload_notificacion_pago = {
+payload_notificacion_pago = PayloadTemplate({
     "aplicacion": "API_PAGO",
     "funcionalidad": "NOTIFICAR_PAGO_EXTERNO",
     "usuario": USER,
     "datos" : {
         "mid": MID
     }
-}
\ No newline at end of file
+})
\ No newline at end of file
@@ -1,7 +1,8 @@
 from app.utils.v1.configs import APPLICATION, USER
+from app.utils.v1.PayloadTemplate import PayloadTemplate
 
 
-payload_cotizacion = {
+payload_cotizacion = PayloadTemplate({
     "coll_preguntas": {
         "preguntas": []
     },
@@ -157,6 +158,6 @@ payload_cotizacion = {
         ]
     },
     "coll_grpaseg": {"grpaseg": []}
-}
+})
 
 
@@ -0,0 +1,155 @@
+"""
+Benchmark: latencia de las herramientas del servidor MCP llamadas por stdio.
+
+El servidor MCP (`run_mcp.py`) se ejecuta como proceso hijo, igual que lo lanza un cliente
+LLM; la primera llamada de cada herramienta se reporta aparte (incluye abrir la conexión
+al backend). Modos:
+
+    fake-backend  backend local que simula `/api/v1/sm/consultar_persona`,
+                  `/api/v1/sm/consultar_poliza` y `/api/v2/sm/consultar_cotizacion`
+    app           la API real (uvicorn) sobre `benchmarks.fake_upstream`, llamada por HTTP
+    inprocess     `MCP_DISPATCH=inprocess`: el MCP ejecuta los routers sobre `fake_upstream`
+
+Uso:
+    python -m benchmarks.bench_mcp_tools [--mode fake-backend|app|inprocess] [--calls 200]
+        [--backend-latency-ms 5]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import anyio
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from benchmarks.fake_upstream import PROJECT_ROOT, upstream_env
+from benchmarks.load_test import free_port, percentile, start_process, wait_ready
+
+API_TOKEN = "bench-mcp-token"
+
+TOOLS = {
+    "consultar_persona": {"num_documento": "V-12345678"},
+    "consultar_poliza": {"cd_entidad": 1, "cd_area": 18, "poliza": 1000, "certificado": 1},
+    "consultar_cotizacion": {"nu_cotizacion": 5132037, "cd_entidad": 1},
+}
+
+
+def create_backend_app(latency_ms: float) -> Starlette:
+    """Backend local con las respuestas que esperan las herramientas."""
+
+    async def responder(request: Request, body: dict) -> JSONResponse:
+        if request.headers.get("X-API-Key") != API_TOKEN:
+            return JSONResponse({"detail": "API key inválida"}, status_code=401)
+        await anyio.sleep(latency_ms / 1000)
+        return JSONResponse(body)
+
+    async def persona(request: Request) -> JSONResponse:
+        data = await request.json()
+        return await responder(request, [{"nu_documento": data["num_documento"], "nm_primer_nombre": "Ana"}])
+
+    async def poliza(request: Request) -> JSONResponse:
+        data = await request.json()
+        return await responder(request, {"polizas": [{"nu_poliza": data["poliza"], "recibos": []}]})
+
+    async def cotizacion(request: Request) -> JSONResponse:
+        data = await request.json()
+        return await responder(request, {"nu_cotizacion": data["nu_cotizacion"], "mt_prima_total": 2430})
+
+    async def health(request: Request) -> JSONResponse:
+        return JSONResponse({"status": "ok"})
+
+    return Starlette(routes=[
+        Route("/api/v1/sm/consultar_persona", persona, methods=["POST"]),
+        Route("/api/v1/sm/consultar_poliza", poliza, methods=["POST"]),
+        Route("/api/v2/sm/consultar_cotizacion", cotizacion, methods=["POST"]),
+        Route("/health", health),
+    ])
+
+
+async def bench(env: dict[str, str], calls: int) -> dict[str, dict]:
+    from fastmcp import Client
+    from fastmcp.client.transports import PythonStdioTransport
+
+    transport = PythonStdioTransport(
+        str(PROJECT_ROOT / "run_mcp.py"),
+        env={"API_TOKEN_MCP": API_TOKEN, **env},
+        cwd=str(PROJECT_ROOT),
+    )
+    results = {}
+    async with Client(transport) as client:
+        for tool, arguments in TOOLS.items():
+            started = time.perf_counter()
+            await client.call_tool(tool, arguments)
+            first = (time.perf_counter() - started) * 1000
+            latencies = []
+            for _ in range(calls):
+                started = time.perf_counter()
+                await client.call_tool(tool, arguments)
+                latencies.append((time.perf_counter() - started) * 1000)
+            latencies.sort()
+            results[tool] = {
+                "first_ms": round(first, 2),
+                "mean_ms": round(statistics.fmean(latencies), 2),
+                "p50_ms": round(percentile(latencies, 0.50), 2),
+                "p95_ms": round(percentile(latencies, 0.95), 2),
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["fake-backend", "app", "inprocess"], default="fake-backend")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--backend-latency-ms", type=float, default=5.0)
+    parser.add_argument("--serve-backend", type=int, metavar="PORT", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve_backend:
+        import uvicorn
+
+        uvicorn.run(create_backend_app(args.backend_latency_ms), port=args.serve_backend, log_level="warning")
+        return
+
+    processes = []
+    try:
+        port = free_port()
+        if args.mode == "fake-backend":
+            processes.append(start_process([
+                "-m", "benchmarks.bench_mcp_tools", "--serve-backend", str(port),
+                "--backend-latency-ms", str(args.backend_latency_ms),
+            ], {}))
+            asyncio.run(wait_ready(f"http://127.0.0.1:{port}/health"))
+            env = {"BACKEND_BASE_URL": f"http://127.0.0.1:{port}"}
+        else:
+            processes.append(start_process([
+                "-m", "benchmarks.fake_upstream", "--port", str(port),
+                "--latency-ms", str(args.backend_latency_ms), "--jitter-ms", "0", "--items", "1",
+            ], {}))
+            asyncio.run(wait_ready(f"http://127.0.0.1:{port}/"))
+            upstreams = {**upstream_env(f"http://127.0.0.1:{port}"), "MOCKUP": "false"}
+            if args.mode == "inprocess":
+                env = {**upstreams, "MCP_DISPATCH": "inprocess"}
+            else:
+                app_port = free_port()
+                processes.append(start_process(
+                    ["-m", "uvicorn", "app.api.app:app", "--port", str(app_port), "--log-level", "warning"],
+                    {**upstreams, "API_TOKEN_MCP": API_TOKEN},
+                ))
+                asyncio.run(wait_ready(f"http://127.0.0.1:{app_port}/health"))
+                env = {"BACKEND_BASE_URL": f"http://127.0.0.1:{app_port}"}
+        results = asyncio.run(bench(env, args.calls))
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait(timeout=10)
+
+    print(f"{'herramienta':<22} {'1ª ms':>8} {'media':>8} {'p50':>8} {'p95':>8}")
+    for tool, r in results.items():
+        print(f"{tool:<22} {r['first_ms']:>8.1f} {r['mean_ms']:>8.1f} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Microbenchmark: costo por petición de los middlewares propios en su versión ASGI pura
+frente a la versión anterior basada en `BaseHTTPMiddleware`.
+
+Las peticiones se envían directamente a la interfaz ASGI (sin servidor ni red), así que
+la diferencia entre filas es el costo de la cadena de middlewares.
+
+Uso:
+    python -m benchmarks.bench_middlewares [--requests 5000]
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from loguru import logger
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.routing import Route
+
+from app.middlewares import ErrorHandlingMiddleware, LoggingMiddleware, ProcessTimeHeaderMiddleware
+
+
+# Versiones anteriores (BaseHTTPMiddleware), como referencia
+class LegacyErrorHandlingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        try:
+            return await call_next(request)
+        except Exception as e:
+            return JSONResponse({"error": str(e)}, status_code=500)
+
+
+class LegacyLoggingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        logger.info(f"Request: {request.method} {request.url}")
+        response = await call_next(request)
+        logger.info(f"Response status: {response.status_code}")
+        return response
+
+
+class LegacyProcessTimeHeaderMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        start_time = time.perf_counter()
+        response = await call_next(request)
+        response.headers["X-Process-Time"] = str((time.perf_counter() - start_time) * 10**3)
+        return response
+
+
+async def ok(request):
+    return JSONResponse({"status": "ok"})
+
+
+def build_app(*middleware_classes) -> Starlette:
+    app = Starlette(routes=[Route("/ok", ok)])
+    for middleware in middleware_classes:
+        app.add_middleware(middleware)
+    return app
+
+
+async def call(app, scope):
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    await app(dict(scope), receive, send)
+
+
+async def bench(app, requests: int) -> float:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/ok", "raw_path": b"/ok", "root_path": "", "query_string": b"",
+        "headers": [(b"host", b"test")], "client": ("127.0.0.1", 1234), "server": ("test", 80),
+    }
+    for _ in range(200):
+        await call(app, scope)
+    started = time.perf_counter()
+    for _ in range(requests):
+        await call(app, scope)
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    # sin sinks: se mide la cadena de middlewares, no la escritura de logs
+    logger.remove()
+
+    cases = {
+        "sin middlewares": (),
+        "BaseHTTPMiddleware x3": (
+            LegacyErrorHandlingMiddleware, LegacyLoggingMiddleware, LegacyProcessTimeHeaderMiddleware,
+        ),
+        "ASGI puro x3": (ErrorHandlingMiddleware, LoggingMiddleware, ProcessTimeHeaderMiddleware),
+    }
+    baseline = None
+    for name, classes in cases.items():
+        per_request = asyncio.run(bench(build_app(*classes), args.requests))
+        baseline = per_request if baseline is None else baseline
+        print(f"{name:<24} {per_request:8.1f} us/req  (+{per_request - baseline:.1f} us)")
+
+    # LoggingMiddleware está activo por defecto (REQUEST_LOGGING): su costo real incluye
+    # escribir las dos líneas, aquí en un archivo como el sink de LoggerSingletonDB
+    with tempfile.NamedTemporaryFile(suffix=".log") as log_file:
+        logger.add(log_file.name, level="INFO")
+        app = build_app(ErrorHandlingMiddleware, LoggingMiddleware, ProcessTimeHeaderMiddleware)
+        per_request = asyncio.run(bench(app, args.requests))
+        logger.remove()
+    print(f"{'ASGI puro x3 + archivo':<24} {per_request:8.1f} us/req  (+{per_request - baseline:.1f} us)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Microbenchmark: construir el payload de cotización v5 con `PayloadTemplate.build()`
+frente a `copy.deepcopy` del dict original.
+
+Uso:
+    python -m benchmarks.bench_payload_templates [--number 20000]
+"""
+import argparse
+import copy
+import timeit
+
+from app.utils.v5.payload_templates import payload_cotizacion
+
+
+def thaw(value):
+    """Devuelve la plantilla congelada como dict/list normales (entrada de deepcopy)."""
+    if hasattr(value, "items"):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    as_dict = thaw(payload_cotizacion.template)
+    assert payload_cotizacion.build() == copy.deepcopy(as_dict)
+
+    candidates = {
+        "copy.deepcopy": lambda: copy.deepcopy(as_dict),
+        "PayloadTemplate.build": payload_cotizacion.build,
+    }
+    results = {}
+    for name, func in candidates.items():
+        best = min(timeit.repeat(func, number=args.number, repeat=args.repeat))
+        results[name] = best / args.number * 1e6
+        print(f"{name:<24} {results[name]:8.2f} us/op")
+
+    speedup = results["copy.deepcopy"] / results["PayloadTemplate.build"]
+    print(f"speedup: {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Microbenchmark: validación + codificación de las respuestas de consulta grandes de v1.
+
+Compara, por endpoint, la ruta por defecto de FastAPI (`serialize_response` con el
+`response_model` de la ruta, o `PolizasConsultaResponse` / `AnexosConsultaResponse` /
+`PersonaResponseBase` como modelo) frente a `FastJSONResponse`, que entrega el dict del
+upstream sin re-validarlo.
+
+Uso:
+    python -m benchmarks.bench_response_rendering [--items 4] [--number 200]
+"""
+import argparse
+import asyncio
+import enum
+import time
+import types
+import typing
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from pydantic import BaseModel
+
+from app.api.v1.Integration_SM.app import router
+from app.schemas.v1.Integration_SM.ResponseModelAPI import (
+    AnexosConsultaResponse,
+    PersonaResponseBase,
+    PolizasConsultaResponse,
+)
+from app.utils.v1.FastJSON import FastJSONResponse
+
+loop = asyncio.new_event_loop()
+
+
+def sample(annotation, items: int):
+    """Valor de ejemplo válido para una anotación de los modelos de respuesta."""
+    origin = typing.get_origin(annotation)
+    if origin in (list, typing.List):
+        return [sample(typing.get_args(annotation)[0], items) for _ in range(items)]
+    if origin in (typing.Union, types.UnionType):
+        return sample(next(a for a in typing.get_args(annotation) if a is not type(None)), items)
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return {name: sample(field.annotation, items) for name, field in annotation.model_fields.items()}
+    if isinstance(annotation, type) and issubclass(annotation, enum.Enum):
+        return next(iter(annotation)).value
+    if annotation is int:
+        return 123456
+    if annotation is float:
+        return 1234.56
+    return "Seguros Mercantil C.A. ÑÁÉ"
+
+
+def route_field(path: str):
+    route = next(r for r in router.routes if r.path == path)
+    return route.response_field
+
+
+def default_render(field, content):
+    # Lo que hace FastAPI con una respuesta que no es `Response`
+    if field is None:
+        return JSONResponse(loop.run_until_complete(serialize_response(response_content=content))).body
+    return loop.run_until_complete(serialize_response(field=field, response_content=content, dump_json=True))
+
+
+def bench(func, number: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return best / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=4, help="elementos por cada lista anidada")
+    parser.add_argument("--number", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    polizas = sample(PolizasConsultaResponse, args.items)
+    cases = {
+        "consultar_persona": (route_field("/consultar_persona"), sample(PersonaResponseBase, args.items)),
+        "consultar_poliza": (route_field("/consultar_poliza"), polizas),
+        "consultar_recibos": (route_field("/consultar_recibos"), polizas),
+        "consultar_poliza (modelo)": (create_model_field("m", PolizasConsultaResponse), polizas),
+        "incluir_anexo (modelo)": (route_field("/incluir_anexo"), sample(AnexosConsultaResponse, args.items)),
+    }
+
+    print(f"{'endpoint':<28} {'KiB':>7} {'default':>10} {'fast':>10} {'speedup':>8}")
+    for name, (field, content) in cases.items():
+        body = FastJSONResponse(content).body
+        default = bench(lambda: default_render(field, content), args.number, args.repeat)
+        fast = bench(lambda: FastJSONResponse(content).body, args.number, args.repeat)
+        print(f"{name:<28} {len(body) / 1024:7.1f} {default:8.1f}us {fast:8.1f}us {default / fast:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
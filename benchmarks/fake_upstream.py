@@ -0,0 +1,227 @@
+"""
+Doble local de las APIs de Seguros Mercantil para las pruebas de carga.
+
+Implementa las rutas que llama la integración (`consultarpersona`, `cotizarglobal`,
+`emitirpoliza`, `consultarpoliza`, `swrep/executeRep`, `onlinepay/register`, ...) con
+latencia, tasa de error y tamaño de respuesta configurables. Las cotizaciones se arman a
+partir de la cotización de ejemplo de v2 y las peticiones a `cotizarglobal` se validan
+contra las colecciones de `payload_v3.json`/`payload_v4.json`.
+
+Uso:
+    python -m benchmarks.fake_upstream [--port 8900] [--latency-ms 80] [--jitter-ms 20]
+        [--error-rate 0.01] [--items 3] [--report-kb 256]
+"""
+import argparse
+import base64
+import copy
+import json
+import random
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+import anyio
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.utils.v2.mockup_response_cotizacion import cotizacion as cotizacion_v2
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Variables de entorno del servicio apuntando a este doble (ver `upstream_env`)
+ENDPOINT_VARS = ("SM_ENDPOINT", "SM_ENDPOINT_PASARELA_MS", "SM_ENDPOINT_SUSCRIPCION", "SM_ENDPOINT_NOTIFICACION_PAGO")
+
+EXITO = {"code": "EXITO", "descripcion": "EXITO"}
+
+
+@dataclass
+class FakeUpstreamConfig:
+    """
+    Args:
+        latency_ms (float): Latencia media de cada respuesta.
+        jitter_ms (float): Desviación estándar de la latencia.
+        error_rate (float): Fracción de respuestas HTTP 500 con `status.code` ERROR.
+        items (int): Elementos por lista (cotizaciones, pólizas, personas).
+        report_kb (int): Tamaño del PDF de `executeRep` antes de codificarlo en base64.
+        seed (int | None): Semilla para reproducir la misma secuencia de latencias y errores.
+    """
+
+    latency_ms: float = 80.0
+    jitter_ms: float = 20.0
+    error_rate: float = 0.0
+    items: int = 3
+    report_kb: int = 256
+    seed: int | None = None
+
+
+def load_reference_payload(name: str) -> dict:
+    """
+    Carga `payload_v3.json`/`payload_v4.json` de la raíz del proyecto. Los archivos
+    documentan cada dato con comentarios `#`, que se quitan antes de parsear.
+    """
+    text = (PROJECT_ROOT / name).read_text(encoding="utf-8")
+    return json.loads(re.sub(r"\s*#[^\n]*", "", text))
+
+
+def upstream_env(base_url: str) -> dict[str, str]:
+    """Variables de entorno que hacen que el servicio llame a este doble en `base_url`."""
+    env = {name: base_url for name in ENDPOINT_VARS}
+    env["URL_ANULAR_POLIZA"] = f"{base_url}/anularpoliza"
+    return env
+
+
+def create_app(config: FakeUpstreamConfig | None = None) -> Starlette:
+    """
+    Construye el doble como aplicación Starlette.
+
+    Args:
+        config (FakeUpstreamConfig | None): Latencia, errores y tamaños; por defecto los valores
+            de `FakeUpstreamConfig`.
+    """
+    config = config or FakeUpstreamConfig()
+    rng = random.Random(config.seed)
+    referencias = [load_reference_payload(name) for name in ("payload_v3.json", "payload_v4.json")]
+    colecciones = {key for referencia in referencias for key in referencia if key.startswith("coll_")}
+    reporte = base64.b64encode(b"%PDF-1.4\n" + b"0" * (config.report_kb * 1024)).decode()
+    contador = iter(range(5_000_000, 10**9))
+
+    def cotizaciones(body: dict) -> list[dict]:
+        nombres = {
+            str(bien.get("nu_bien")): bien.get("de_bien")
+            for bien in (body.get("coll_bienes") or {}).get("bienes", [])
+        }
+        items = []
+        for plan in range(config.items):
+            item = copy.deepcopy(cotizacion_v2)
+            item.update(nu_cotizacion=next(contador), cd_plan=cotizacion_v2["cd_plan"] + plan)
+            for bien in item["bienes"]:
+                bien["de_bien"] = nombres.get(str(bien["nu_bien"]), bien["de_bien"])
+            items.append(item)
+        return items
+
+    def cotizacion_consultada(body: dict) -> list[dict]:
+        # `consultarcotizaciones` devuelve la cotización guardada, con los datos del
+        # contratante y de cada bien que la de `cotizarglobal` no trae
+        item = copy.deepcopy(cotizacion_v2)
+        item.update(
+            nu_cotizacion=body.get("nu_cotizacion", item["nu_cotizacion"]),
+            fe_desde="01/01/2026",
+            fe_hasta="01/01/2027",
+            nu_documento_contratante="12345678",
+            tp_documento_contratante="V",
+            nu_documento="12345678",
+            tp_documento="V",
+            nu_poliza=None,
+            cd_region=1,
+            cd_area=18,
+            nm_cliente="Ana Pérez",
+            de_st_cotizacion="VIGENTE",
+        )
+        for bien in item["bienes"]:
+            bien.update(fe_fallecimiento=None, datos=[], fe_exclusion=None, preguntas=[], nu_consec_tp_doc_asegurado=1)
+        return [item]
+
+    def persona(body: dict, indice: int = 0) -> dict:
+        enviada = body.get("persona") or {}
+        enviada = enviada[0] if isinstance(enviada, list) and enviada else enviada
+        documento = enviada.get("nu_documento") or f"V-{12345678 + indice}"
+        return {
+            "tp_documento": "V",
+            "nu_documento": documento,
+            "nm_primer_nombre": "Ana",
+            "nm_primer_apellido": "Pérez",
+            "fe_nacimiento": "01/02/1985",
+            "cd_sexo": "F",
+        }
+
+    def poliza(indice: int) -> dict:
+        return {
+            "cd_entidad": 1,
+            "cd_area": 18,
+            "nu_poliza": 1000 + indice,
+            "nu_certificado": 1,
+            "fe_desde": "01/01/2026",
+            "fe_hasta": "01/01/2027",
+            "recibos": [{"nu_recibo": 90000 + indice * 12 + cuota, "mt_recibo": 202.5} for cuota in range(12)],
+        }
+
+    handlers = {
+        "/consultarpersona": lambda body: {"persona": [persona(body, i) for i in range(config.items)]},
+        "/crearpersona": lambda body: {"persona": [persona(body)]},
+        "/cotizaraccpersonales": lambda body: {"cotizacion": cotizaciones(body)},
+        "/cotizarglobal": lambda body: {"cotizacion": cotizaciones(body)},
+        "/consultarcotizaciones": lambda body: {"mensajes": [], "cotizacion": cotizacion_consultada(body)},
+        "/emitirpoliza": lambda body: {"emision": {"nu_poliza": next(contador), "nu_certificado": 1}},
+        "/consultarpoliza": lambda body: {"polizas": [poliza(i) for i in range(config.items)]},
+        "/incanexpolivig": lambda body: {"anexo": {"nu_endoso": next(contador)}},
+        "/swrep/executeRep": lambda body: {"reporte_codificado": reporte},
+        "/swrep/ve/pru/executeRep": lambda body: {"reporte_codificado": reporte},
+        "/onlinepay/register": lambda body: {
+            "datos": {"orden_comercio": next(contador), "cd_aprobacion": next(contador), "poliza_recibo_cuota": []},
+        },
+        "/onlinepay/otp_mbu": lambda body: {
+            "datos": {"fecha_procesamiento": "01/01/2026 00:00:00", "estatus": "ENVIADO", "min_expiracion": "5"},
+        },
+        "/notify_external_payment": lambda body: {"datos": {"notificado": True}},
+        "/consultartasascambio": lambda body: {
+            "tasa": [{
+                "in_tasa": 1, "tasa_compra": 36.45, "cd_moneda": 2, "tasa_venta": 36.55, "cd_producto": 1,
+                "fe_tasa": (body.get("tasa") or {}).get("fe_tasa", ""),
+            }],
+        },
+        "/anularpoliza": lambda body: {"datos": {"anulada": True}},
+    }
+
+    async def endpoint(request: Request) -> JSONResponse:
+        raw = await request.body()
+        body = json.loads(raw) if raw else {}
+        delay = max(0.0, rng.gauss(config.latency_ms, config.jitter_ms)) / 1000
+        await anyio.sleep(delay)
+        if rng.random() < config.error_rate:
+            return JSONResponse(
+                {"status": {"code": "ERROR", "descripcion": "Error simulado del upstream"}}, status_code=500,
+            )
+        if request.url.path == "/cotizarglobal":
+            faltantes = sorted(coll for coll in colecciones if coll not in body)
+            if faltantes:
+                return JSONResponse({"status": {"code": "FALLONEGOCIO", "descripcion": f"Faltan {faltantes}"}})
+        return JSONResponse({"status": EXITO, **handlers[request.url.path](body)})
+
+    async def head(request: Request) -> JSONResponse:
+        # Sondas y calentamiento del servicio (`HEAD /`)
+        return JSONResponse({"status": "ok"})
+
+    routes = [Route(path, endpoint, methods=["POST"]) for path in handlers]
+    routes.append(Route("/", head, methods=["GET", "HEAD"]))
+    return Starlette(routes=routes)
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--items", type=int, default=3)
+    parser.add_argument("--report-kb", type=int, default=256)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    config = FakeUpstreamConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        items=args.items,
+        report_kb=args.report_kb,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+"""
+Prueba de carga: ejecuta `app.api.app` contra el doble local de Seguros Mercantil
+(`benchmarks.fake_upstream`) y mide cada endpoint a concurrencia fija.
+
+Por cada escenario reporta throughput, latencias p50/p95/p99, errores y el consumo del
+proceso del servicio (CPU y RSS leídos de /proc). Con `--baseline` compara contra un
+resultado guardado con `--output` y termina con código 1 si algún escenario empeora más
+de `--max-regression`, para usarlo como compuerta antes de desplegar.
+
+Uso:
+    python -m benchmarks.load_test [--concurrency 16] [--duration 10] [--latency-ms 80]
+        [--error-rate 0.0] [--scenarios consultar_persona,cotizacion_v5]
+        [--output resultado.json] [--baseline base.json --max-regression 0.2]
+
+    # contra un servicio ya levantado (sus upstreams deben apuntar al doble)
+    python -m benchmarks.load_test --base-url http://127.0.0.1:8000 --api-key <clave> --server-pid <pid>
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable
+
+import httpx
+
+from benchmarks.fake_upstream import PROJECT_ROOT, upstream_env
+
+API_KEY = "load-test-key"
+
+PERSONA = {
+    "nm_primer_nombre": "Ana",
+    "nm_primer_apellido": "Pérez",
+    "documento": {"nu_documento": "V-12345678"},
+    "fecha_nacimiento": "01/02/1985",
+    "sexo": "F",
+}
+
+
+def variante_cotizacion(i: int) -> dict:
+    return {
+        "contratante": PERSONA,
+        "titular": PERSONA,
+        "poliza": {"fe_desde": "01/01/2026", "fe_hasta": "01/01/2027", "frecuencia_cuota": "MENSUAL"},
+        "plan": 1 + i % 3,
+    }
+
+
+@dataclass
+class Scenario:
+    """
+    Args:
+        path (str): Ruta del servicio.
+        body (Callable | None): Cuerpo JSON de la petición número `i`; None para un GET.
+        headers (dict): Headers adicionales.
+    """
+
+    path: str
+    body: Callable[[int], dict] | None = None
+    headers: dict = field(default_factory=dict)
+
+
+# Los identificadores varían con `i` para que las cachés de consultas no conviertan la
+# prueba en una medición de aciertos; las cotizaciones piden `X-Cache-Bypass`
+SCENARIOS = {
+    "health": Scenario("/health"),
+    "consultar_persona": Scenario(
+        "/api/v1/sm/consultar_persona",
+        lambda i: {"num_documento": f"V-{10_000_000 + i}"},
+    ),
+    "consultar_poliza": Scenario(
+        "/api/v1/sm/consultar_poliza",
+        lambda i: {"cd_entidad": 1, "cd_area": 18, "poliza": 1000 + i, "certificado": 1},
+    ),
+    "consultar_recibos": Scenario(
+        "/api/v1/sm/consultar_recibos",
+        lambda i: {"cd_entidad": 1, "cd_area": 18, "poliza": 1000 + i, "certificado": 1},
+    ),
+    "cotizacion_v5": Scenario(
+        "/api/v5/sm/crear_cotizacion_global",
+        variante_cotizacion,
+        {"X-Cache-Bypass": "true"},
+    ),
+    "cotizacion_lote_v5": Scenario(
+        "/api/v5/sm/crear_cotizacion_global/lote",
+        lambda i: {"variantes": [variante_cotizacion(plan) for plan in range(3)]},
+        {"X-Cache-Bypass": "true"},
+    ),
+    "cuadro_poliza_v2": Scenario(
+        "/api/v2/sm/cuadro_poliza",
+        lambda i: {"datos_poliza": {
+            "cd_entidad": 1, "cd_area": 18, "nu_poliza": 1000 + i, "nu_certificado": 1, "nu_endoso": 0,
+        }},
+    ),
+    "tasa_bcv": Scenario(
+        "/api/v1/pasarela_pago_ms/consultar_tasa_bcv",
+        lambda i: {"fe_tasa": (date(2020, 1, 1) + timedelta(days=i % 2000)).strftime("%d/%m/%Y")},
+    ),
+}
+
+
+@dataclass
+class ScenarioResult:
+    requests: int
+    errors: int
+    throughput_rps: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    cpu_s: float | None
+    rss_mb: float | None
+    status_codes: dict[str, int]
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def process_usage(pid: int | None) -> tuple[float, float] | tuple[None, None]:
+    """
+    CPU acumulada (segundos, usuario + sistema) y RSS (MB) del proceso `pid` desde /proc.
+    Fuera de Linux o sin pid devuelve (None, None).
+    """
+    if pid is None:
+        return None, None
+    try:
+        fields = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()
+        status = Path(f"/proc/{pid}/status").read_text()
+    except OSError:
+        return None, None
+    ticks = os.sysconf("SC_CLK_TCK")
+    cpu = (int(fields[11]) + int(fields[12])) / ticks
+    rss_kb = next((int(line.split()[1]) for line in status.splitlines() if line.startswith("VmRSS:")), 0)
+    return cpu, rss_kb / 1024
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, concurrency: int, duration: float,
+                       server_pid: int | None) -> ScenarioResult:
+    """
+    Envía peticiones del escenario con `concurrency` clientes durante `duration` segundos.
+    """
+    counter = itertools.count()
+    latencies: list[float] = []
+    status_codes: dict[str, int] = {}
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            i = next(counter)
+            started = time.perf_counter()
+            try:
+                if scenario.body is None:
+                    response = await client.get(scenario.path, headers=scenario.headers)
+                else:
+                    response = await client.post(scenario.path, json=scenario.body(i), headers=scenario.headers)
+                code = str(response.status_code)
+            except httpx.HTTPError as e:
+                code = type(e).__name__
+            latencies.append((time.perf_counter() - started) * 1000)
+            status_codes[code] = status_codes.get(code, 0) + 1
+
+    cpu_before, _ = process_usage(server_pid)
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    cpu_after, rss = process_usage(server_pid)
+
+    latencies.sort()
+    return ScenarioResult(
+        requests=len(latencies),
+        errors=sum(count for code, count in status_codes.items() if not code.startswith("2")),
+        throughput_rps=round(len(latencies) / elapsed, 1),
+        p50_ms=round(percentile(latencies, 0.50), 2),
+        p95_ms=round(percentile(latencies, 0.95), 2),
+        p99_ms=round(percentile(latencies, 0.99), 2),
+        cpu_s=None if cpu_before is None else round(cpu_after - cpu_before, 2),
+        rss_mb=None if rss is None else round(rss, 1),
+        status_codes=status_codes,
+    )
+
+
+def compare(results: dict[str, dict], baseline: dict[str, dict], max_regression: float) -> list[str]:
+    """
+    Escenarios cuyo p95 subió, o cuyo throughput bajó, más de `max_regression` (fracción)
+    respecto de `baseline`.
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if base["p95_ms"] and result["p95_ms"] > base["p95_ms"] * (1 + max_regression):
+            regressions.append(f"{name}: p95 {base['p95_ms']} -> {result['p95_ms']} ms")
+        if base["throughput_rps"] and result["throughput_rps"] < base["throughput_rps"] * (1 - max_regression):
+            regressions.append(f"{name}: throughput {base['throughput_rps']} -> {result['throughput_rps']} req/s")
+    return regressions
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_process(args: list[str], env: dict[str, str]) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, *args],
+        cwd=PROJECT_ROOT,
+        env={**os.environ, **env},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+async def wait_ready(url: str, timeout: float = 60.0):
+    deadline = time.perf_counter() + timeout
+    async with httpx.AsyncClient() as client:
+        while True:
+            try:
+                if (await client.get(url)).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            if time.perf_counter() > deadline:
+                raise RuntimeError(f"{url} no respondió en {timeout:g}s")
+            await asyncio.sleep(0.2)
+
+
+def print_table(results: dict[str, dict]):
+    print(f"{'escenario':<22} {'req':>7} {'err':>5} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'cpu s':>7} {'rss MB':>7}")
+    for name, r in results.items():
+        cpu = "-" if r["cpu_s"] is None else f"{r['cpu_s']:.2f}"
+        rss = "-" if r["rss_mb"] is None else f"{r['rss_mb']:.0f}"
+        print(
+            f"{name:<22} {r['requests']:>7} {r['errors']:>5} {r['throughput_rps']:>8.1f} "
+            f"{r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} {cpu:>7} {rss:>7}"
+        )
+
+
+async def run(args) -> dict[str, dict]:
+    processes = []
+    base_url, server_pid = args.base_url, args.server_pid
+    try:
+        if base_url is None:
+            fake_port, app_port = free_port(), free_port()
+            processes.append(start_process([
+                "-m", "benchmarks.fake_upstream", "--port", str(fake_port),
+                "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.jitter_ms),
+                "--error-rate", str(args.error_rate), "--items", str(args.items),
+                "--report-kb", str(args.report_kb),
+            ], {}))
+            await wait_ready(f"http://127.0.0.1:{fake_port}/")
+            server = start_process(
+                ["-m", "uvicorn", "app.api.app:app", "--port", str(app_port), "--log-level", "warning"],
+                {
+                    **upstream_env(f"http://127.0.0.1:{fake_port}"),
+                    "API_KEY_AUTH": args.api_key,
+                    "MOCKUP": "false",
+                },
+            )
+            processes.append(server)
+            base_url, server_pid = f"http://127.0.0.1:{app_port}", server.pid
+        await wait_ready(f"{base_url}/health")
+
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        headers = {"X-API-Key": args.api_key}
+        results = {}
+        async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=60.0) as client:
+            for name in args.scenarios:
+                result = await run_scenario(client, SCENARIOS[name], args.concurrency, args.duration, server_pid)
+                results[name] = asdict(result)
+        return results
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", help="Servicio ya levantado; por defecto se levantan el doble y el servicio")
+    parser.add_argument("--api-key", default=API_KEY)
+    parser.add_argument("--server-pid", type=int, help="Pid del servicio de --base-url, para medir CPU y RSS")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), type=lambda value: value.split(","))
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="Segundos por escenario")
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--items", type=int, default=3)
+    parser.add_argument("--report-kb", type=int, default=256)
+    parser.add_argument("--output", help="Guarda los resultados en JSON")
+    parser.add_argument("--baseline", help="Resultados JSON de referencia (generados con --output)")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args()
+
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"escenarios desconocidos: {unknown}; disponibles: {list(SCENARIOS)}")
+
+    results = asyncio.run(run(args))
+    print_table(results)
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    if args.baseline:
+        regressions = compare(results, json.loads(Path(args.baseline).read_text()), args.max_regression)
+        for regression in regressions:
+            print(f"REGRESIÓN {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ import uvicorn
 
 from app.utils.v1.LoggerSingleton import logger
 from app.utils.v1.configs import ENV
+from app.utils.v1.Metrics import registry
 from app.utils.v1.constants import (
     url_consult_persona,
     url_crear_persona,
@@ -67,6 +68,9 @@ def main():
     logger.info(f"URL cuadro de póliza: {url_cuadro_poliza}")
     logger.info(f"URL anular póliza: {url_anular_poliza}")
 
+    # Las instantáneas de métricas de una ejecución anterior no deben sumarse a las nuevas
+    registry.reset_directory()
+
     if ENV in ["production", "staging"]:
 
         uvicorn.run("app.api.app:app", host="0.0.0.0", port=9000, reload=False, workers=4)
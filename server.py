@@ -13,9 +13,9 @@ if str(project_root) not in sys.path:
 # Establecer modo MCP antes de cualquier importación
 os.environ["MCP_SERVER_MODE"] = "true"
 
-# Importar y ejecutar el servidor MCP
-from app.mcp.server import mcp
+# Importar y ejecutar el servidor MCP (MCP_TRANSPORT=stdio|http)
+from app.mcp.server import mcp, run
 
 if __name__ == "__main__":
-    mcp.run()
+    run()
 
@@ -1,6 +1,9 @@
 import os
 import sys
+
+import httpx
 import pytest
+import pytest_asyncio
 
 from unittest.mock import MagicMock, patch
 from fastapi.testclient import TestClient
@@ -9,8 +12,11 @@ os.environ.setdefault("ENV", "test")
 os.environ.setdefault("MOCKUP", "true")
 os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017/test_db_fake")
 
-mock_mongodb_handler = MagicMock()
-mock_mongodb_handler.__call__ = MagicMock(return_value=None)
+def mock_mongodb_handler(message):
+    """Sink de loguru que descarta los registros (un MagicMock se tomaría como ruta de archivo)."""
+
+
+mock_mongodb_handler.close = lambda: None
 
 mock_setup_handler = patch(
     'app.utils.v1.MongoDBHandler.setup_mongodb_handler',
@@ -42,10 +48,15 @@ mock_db_init.start()
 
 try:
     from app.api.app import app
+    from app.utils.v1.AsyncHttpx import http_pool, upstream_key
+    import app.utils.v1.LookupCache as lookup_cache
 except Exception as e:
     print(f"Error importando app: {e}")
     raise
 
+# Una invalidación que falla es un error de la prueba, no un warning en el log
+lookup_cache.STRICT_INVALIDATION = True
+
 
 
 
@@ -75,3 +86,25 @@ def headers(api_key):
         "X-API-Key": api_key
     }
 
+
+@pytest_asyncio.fixture
+async def mock_upstream():
+    """
+    Upstreams simulados en el pool compartido y un cliente que llama a la app por ASGI.
+
+    `mock_upstream(url, handler, verify=True)` registra `handler` (función de
+    `httpx.MockTransport`) como cliente del host de `url` en `http_pool` y devuelve el
+    `httpx.AsyncClient` de la app (el mismo en cada llamada). Al terminar la prueba se
+    cierran el cliente y el pool.
+    """
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+    def register(url: str, handler, verify: bool = True) -> httpx.AsyncClient:
+        http_pool.clients[upstream_key(url, verify)] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return client
+
+    try:
+        yield register
+    finally:
+        await client.aclose()
+        await http_pool.aclose()
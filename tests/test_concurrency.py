@@ -0,0 +1,68 @@
+import asyncio
+import time
+
+import anyio
+import httpx
+import pytest
+
+import app.api.v1.PasarelaPagoMS.app as pasarela_v1
+
+pytest_plugins = ["tests.configtest"]
+
+URL_TASA = "https://suscripcion.example.com/consultartasascambio"
+UPSTREAM_DELAY = 0.2
+REQUESTS = 40
+THREAD_TOKENS = 2
+
+
+@pytest.mark.slow
+@pytest.mark.integration
+class TestConcurrenciaSinThreadpool:
+    @pytest.mark.asyncio
+    async def test_concurrencia_no_limitada_por_threadpool(self, monkeypatch, api_key, headers, mock_upstream):
+        """
+        Con el threadpool reducido a 2 tokens, 40 llamadas de 200 ms tardarían ~4 s si el
+        endpoint bloqueara un hilo por llamada upstream. Al ser async deben solaparse.
+        """
+        in_flight = 0
+        max_in_flight = 0
+
+        async def upstream(request: httpx.Request):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(UPSTREAM_DELAY)
+            in_flight -= 1
+            return httpx.Response(200, json={
+                "status": {"code": "EXITO", "descripcion": "EXITO"},
+                "tasa": [{
+                    "in_tasa": 1, "tasa_compra": 36.5, "cd_moneda": 2,
+                    "tasa_venta": 36.6, "cd_producto": 1, "fe_tasa": "01/01/2024",
+                }],
+            })
+
+        monkeypatch.setattr(pasarela_v1, "url_suscripcion_tasa_bcv", URL_TASA)
+        monkeypatch.setattr(pasarela_v1.api_key_verifier, "api_keys", [api_key])
+        client = mock_upstream(URL_TASA, upstream, verify=False)
+
+        limiter = anyio.to_thread.current_default_thread_limiter()
+        original_tokens = limiter.total_tokens
+        limiter.total_tokens = THREAD_TOKENS
+        try:
+            start = time.perf_counter()
+            responses = await asyncio.gather(*[
+                client.post(
+                    "/api/v1/pasarela_pago_ms/consultar_tasa_bcv",
+                    json={"fe_tasa": f"{(i % 28) + 1:02d}/{(i // 28) + 1:02d}/2024"},
+                    headers=headers,
+                )
+                for i in range(REQUESTS)
+            ])
+            elapsed = time.perf_counter() - start
+        finally:
+            limiter.total_tokens = original_tokens
+
+        assert all(r.status_code == 200 for r in responses)
+        serial_bound = REQUESTS * UPSTREAM_DELAY / THREAD_TOKENS
+        assert elapsed < serial_bound / 2
+        assert max_in_flight > THREAD_TOKENS
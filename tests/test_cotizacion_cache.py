@@ -0,0 +1,147 @@
+from datetime import datetime
+
+import httpx
+import pytest
+
+from app.utils.v1 import CotizacionCache
+from app.utils.v1.constants import VET
+from app.utils.v1.CotizacionCache import BYPASS_HEADER, cotizacion_key, cotizacion_ttl
+from app.utils.v1.ResponseCache import ResponseCache
+from app.schemas.v5.Integracion_SM.ModelRequestBase import CrearPolizaBase
+import app.api.v1.Integration_SM.app as integration_v1
+import app.api.v5.Integration_SM.app as integration_v5
+
+pytest_plugins = ["tests.configtest"]
+
+URL_COTIZAR = "https://sm.example.com/cotizarglobal"
+URL_EMITIR = "https://emision.example.com/emitirpoliza"
+EMISION = {
+    "de_plan": "Plan", "nu_poliza": 9001, "nm_agente_bancario": "", "nu_secuencia_estructura": "",
+    "cd_moneda": 1, "mensajes": [], "cd_entidad": 1, "cd_plan": 1, "cd_area": 71,
+    "cd_agente_bancario": "", "certificado": [],
+}
+
+
+def cuerpo(nombre="Ana", documento="V-12345678", fecha_nacimiento="01/02/1985") -> dict:
+    persona = {
+        "nm_primer_nombre": nombre,
+        "nm_primer_apellido": "Pérez",
+        "documento": {"nu_documento": documento},
+        "fecha_nacimiento": fecha_nacimiento,
+        "sexo": "F",
+    }
+    return {
+        "contratante": persona,
+        "titular": persona,
+        "poliza": {"fe_desde": "01/01/2026", "fe_hasta": "01/01/2027", "frecuencia_cuota": "MENSUAL"},
+    }
+
+
+def payload(**kwargs) -> dict:
+    return integration_v5.build_payload_cotizacion(CrearPolizaBase(**cuerpo(**kwargs)))
+
+
+@pytest.mark.unit
+class TestCotizacionKey:
+    def test_nombres_no_cambian_la_clave(self):
+        a = payload(nombre="Ana")
+        b = payload(nombre="Ana María")
+        assert cotizacion_key("v5", a) == cotizacion_key("v5", b)
+
+    def test_documentos_cambian_la_clave(self):
+        a = payload(documento="V-12345678")
+        b = payload(documento="E-87654321")
+        assert cotizacion_key("v5", a) != cotizacion_key("v5", b)
+
+    def test_datos_de_tarifa_cambian_la_clave(self):
+        a = payload(fecha_nacimiento="01/02/1985")
+        b = payload(fecha_nacimiento="01/02/1990")
+        assert cotizacion_key("v5", a) != cotizacion_key("v5", b)
+        assert cotizacion_key("v4", a) != cotizacion_key("v5", a)
+
+    def test_vence_al_fin_del_dia(self):
+        assert cotizacion_ttl(datetime(2026, 3, 10, 23, 0, tzinfo=VET)) == 3600
+        assert cotizacion_ttl(datetime(2026, 3, 10, 8, 0, tzinfo=VET)) == CotizacionCache.COTIZACION_CACHE_TTL
+
+
+@pytest.mark.integration
+class TestCotizacionCacheV5:
+    @pytest.fixture
+    def cotizar(self, monkeypatch, api_key, headers, mock_upstream):
+        monkeypatch.setattr(integration_v5, "url_cotizar", URL_COTIZAR)
+        monkeypatch.setattr(integration_v5.api_key_verifier, "api_keys", [api_key])
+        monkeypatch.setattr(CotizacionCache, "cotizacion_cache", ResponseCache("crear_cotizacion"))
+        calls = []
+
+        async def upstream(request: httpx.Request):
+            calls.append(request)
+            return httpx.Response(200, json={
+                "status": {"code": "EXITO"},
+                "cotizacion": [{"nu_cotizacion": len(calls), "bienes": [{"nu_bien": 1, "de_bien": "Ana Pérez"}]}],
+            })
+
+        client = mock_upstream(URL_COTIZAR, upstream)
+
+        async def post(body, extra_headers=None):
+            return await client.post(
+                "/api/v5/sm/crear_cotizacion_global", json=body, headers={**headers, **(extra_headers or {})}
+            )
+
+        return post, calls
+
+    @pytest.mark.asyncio
+    async def test_misma_persona_se_sirve_de_la_cache(self, cotizar):
+        post, calls = cotizar
+        primera = await post(cuerpo(nombre="Ana"))
+        segunda = await post(cuerpo(nombre="Ana María"))
+
+        assert primera.status_code == segunda.status_code == 200
+        assert len(calls) == 1
+        assert segunda.json()[0]["nu_cotizacion"] == 1
+        # el nombre del bien corresponde a la petición, no a la que llenó la caché
+        assert segunda.json()[0]["bienes"][0]["de_bien"] == "Ana María Pérez"
+        assert CotizacionCache.cotizacion_cache.stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_dos_identidades_no_comparten_nu_cotizacion(self, cotizar):
+        post, calls = cotizar
+        ana = await post(cuerpo(nombre="Ana", documento="V-12345678"))
+        luisa = await post(cuerpo(nombre="Luisa", documento="V-87654321"))
+
+        assert len(calls) == 2
+        assert ana.json()[0]["nu_cotizacion"] != luisa.json()[0]["nu_cotizacion"]
+
+    @pytest.mark.asyncio
+    async def test_header_de_bypass_consulta_al_upstream(self, cotizar):
+        post, calls = cotizar
+        await post(cuerpo())
+        refrescada = await post(cuerpo(), {BYPASS_HEADER: "true"})
+        cacheada = await post(cuerpo())
+
+        assert len(calls) == 2
+        assert refrescada.json()[0]["nu_cotizacion"] == 2
+        assert cacheada.json()[0]["nu_cotizacion"] == 2
+        assert CotizacionCache.cotizacion_cache.stats()["bypasses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cotizacion_emitida_no_se_vuelve_a_entregar(self, cotizar, monkeypatch, api_key, headers,
+                                                               mock_upstream):
+        post, calls = cotizar
+        monkeypatch.setattr(integration_v1, "url_emitir_poliza", URL_EMITIR)
+        monkeypatch.setattr(integration_v1.api_key_verifier, "api_keys", [api_key])
+        client = mock_upstream(
+            URL_EMITIR, lambda request: httpx.Response(200, json={"status": {"code": "EXITO"}, "emision": EMISION})
+        )
+
+        cotizada = await post(cuerpo())
+        nu_cotizacion = cotizada.json()[0]["nu_cotizacion"]
+        assert (await post(cuerpo())).json()[0]["nu_cotizacion"] == nu_cotizacion
+
+        emitida = await client.post(
+            "/api/v1/sm/emitir_poliza", json={"cd_entidad": 1, "nu_cotizacion": nu_cotizacion}, headers=headers
+        )
+        assert emitida.status_code == 201
+
+        recotizada = await post(cuerpo())
+        assert len(calls) == 2
+        assert recotizada.json()[0]["nu_cotizacion"] != nu_cotizacion
@@ -0,0 +1,135 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.utils.v1 import CotizacionCache
+from app.utils.v1.ResponseCache import ResponseCache
+import app.api.v5.Integration_SM.app as integration_v5
+
+pytest_plugins = ["tests.configtest"]
+
+URL_COTIZAR = "https://sm.example.com/cotizarglobal"
+
+PERSONA = {
+    "nm_primer_nombre": "Ana",
+    "nm_primer_apellido": "Pérez",
+    "documento": {"nu_documento": "V-12345678"},
+    "fecha_nacimiento": "01/02/1985",
+    "sexo": "F",
+}
+
+
+def variante(**cambios) -> dict:
+    base = {
+        "contratante": PERSONA,
+        "titular": PERSONA,
+        "poliza": {"fe_desde": "01/01/2026", "fe_hasta": "01/01/2027", "frecuencia_cuota": "MENSUAL"},
+        "plan": 1,
+    }
+    return {**base, **cambios}
+
+
+def plan_del_payload(request: httpx.Request) -> str:
+    datos = json.loads(request.content)["coll_datos"]["datos"]
+    return next(dato["valor"] for dato in datos if dato["cd_dato"] == integration_v5.plan["cd_dato"])
+
+
+@pytest.fixture
+def lote(monkeypatch, api_key, headers, mock_upstream):
+    monkeypatch.setattr(integration_v5, "url_cotizar", URL_COTIZAR)
+    monkeypatch.setattr(CotizacionCache, "cotizacion_cache", ResponseCache("crear_cotizacion"))
+    monkeypatch.setattr(integration_v5.api_key_verifier, "api_keys", [api_key])
+
+    async def post(body, upstream):
+        client = mock_upstream(URL_COTIZAR, upstream)
+        return await client.post("/api/v5/sm/crear_cotizacion_global/lote", json=body, headers=headers)
+
+    return post
+
+
+@pytest.mark.integration
+class TestCotizacionLote:
+    @pytest.mark.asyncio
+    async def test_resultados_en_orden_con_errores_por_variante(self, lote):
+        calls = []
+
+        async def upstream(request: httpx.Request):
+            plan = plan_del_payload(request)
+            calls.append(plan)
+            if plan == "3":
+                return httpx.Response(200, json={"status": {"code": "FALLONEGOCIO", "descripcion": "Plan no disponible"}})
+            return httpx.Response(200, json={"status": {"code": "EXITO"}, "cotizacion": [{"plan": plan}]})
+
+        body = {"variantes": [variante(plan=2), variante(plan=3), variante(plan=1), variante(plan=2)]}
+        response = await lote(body, upstream)
+
+        assert response.status_code == 200
+        resultados = response.json()["resultados"]
+        assert [r["indice"] for r in resultados] == [0, 1, 2, 3]
+        assert resultados[0]["cotizacion"] == [{"plan": "2"}]
+        assert resultados[1]["status_code"] == 400 and resultados[1]["cotizacion"] is None
+        assert "Plan no disponible" in resultados[1]["detail"]
+        assert resultados[2]["cotizacion"] == [{"plan": "1"}]
+        # la variante repetida se cotiza una sola vez
+        assert resultados[3] == {**resultados[0], "indice": 3}
+        assert sorted(calls) == ["1", "2", "3"]
+
+    @pytest.mark.asyncio
+    async def test_respeta_el_limite_de_concurrencia(self, monkeypatch, lote):
+        monkeypatch.setattr(integration_v5, "COTIZACION_LOTE_CONCURRENCIA", 2)
+        en_curso = []
+        maximo = []
+
+        async def upstream(request: httpx.Request):
+            en_curso.append(request)
+            maximo.append(len(en_curso))
+            await asyncio.sleep(0.02)
+            en_curso.remove(request)
+            return httpx.Response(200, json={"status": {"code": "EXITO"}, "cotizacion": []})
+
+        response = await lote({"variantes": [variante(plan=plan) for plan in range(1, 7)]}, upstream)
+
+        assert response.status_code == 200
+        assert len(maximo) == 6 and max(maximo) == 2
+
+    @pytest.mark.asyncio
+    async def test_rechaza_lotes_demasiado_grandes(self, monkeypatch, lote):
+        monkeypatch.setattr(integration_v5, "COTIZACION_LOTE_MAX", 2)
+
+        async def upstream(request: httpx.Request):
+            raise AssertionError("no debe llamar al upstream")
+
+        response = await lote({"variantes": [variante(plan=plan) for plan in range(1, 4)]}, upstream)
+        assert response.status_code == 422
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("lote_primero", [True, False])
+    async def test_carga_compartida_con_el_endpoint_individual(self, lote, mock_upstream, headers, lote_primero):
+        calls = []
+
+        async def upstream(request: httpx.Request):
+            calls.append(request)
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json={"status": {"code": "FALLONEGOCIO", "descripcion": "Plan no disponible"}})
+
+        client = mock_upstream(URL_COTIZAR, upstream)
+
+        async def individual():
+            if lote_primero:
+                await asyncio.sleep(0.01)
+            return await client.post("/api/v5/sm/crear_cotizacion_global", json=variante(), headers=headers)
+
+        async def en_lote():
+            if not lote_primero:
+                await asyncio.sleep(0.01)
+            return await lote({"variantes": [variante()]}, upstream)
+
+        respuesta_individual, respuesta_lote = await asyncio.gather(individual(), en_lote())
+
+        assert len(calls) == 1
+        # cada endpoint conserva su código aunque la llamada al upstream sea la misma
+        assert respuesta_individual.status_code == 200
+        assert "Plan no disponible" in respuesta_individual.json()["detail"]
+        assert respuesta_lote.json()["resultados"][0]["status_code"] == 400
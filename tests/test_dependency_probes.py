@@ -0,0 +1,95 @@
+import anyio
+import httpx
+import pytest
+
+import app.api.app as api_app
+from app.api.app import app
+from app.utils.v1.AsyncHttpx import http_pool, upstream_key
+from app.utils.v1.DependencyProbes import DOWN, UNKNOWN, UP, DependencyProbes, default_probes, upstream_probe
+
+pytest_plugins = ["tests.configtest"]
+
+
+async def disponible():
+    pass
+
+
+async def caida():
+    raise ConnectionError("connection refused")
+
+
+async def lenta():
+    await anyio.sleep(1)
+
+
+@pytest.mark.unit
+class TestDependencyProbes:
+    @pytest.mark.asyncio
+    async def test_estado_y_latencia_por_dependencia(self):
+        probes = DependencyProbes(
+            {"mongodb": (caida, False), "sm": (disponible, True), "pagos": (lenta, True)}, timeout=0.05
+        )
+        assert probes.report()["sm"]["state"] == UNKNOWN
+
+        await probes.check_all()
+        report = probes.report()
+
+        assert report["sm"]["state"] == UP and report["sm"]["error"] is None
+        assert report["mongodb"]["state"] == DOWN and "connection refused" in report["mongodb"]["error"]
+        assert report["pagos"]["state"] == DOWN and report["pagos"]["latency_ms"] < 500
+        assert all(result["age_s"] is not None for result in report.values())
+        # solo las dependencias críticas dejan al worker no listo
+        assert probes.failing() == ["pagos"]
+
+    @pytest.mark.asyncio
+    async def test_sonda_upstream_acepta_cualquier_respuesta_http(self):
+        http_pool.clients[upstream_key("https://sm.example.com")] = httpx.AsyncClient(
+            transport=httpx.MockTransport(lambda request: httpx.Response(404))
+        )
+        try:
+            probes = DependencyProbes({"sm": (upstream_probe("https://sm.example.com", True), True)})
+            await probes.check_all()
+        finally:
+            await http_pool.aclose()
+        assert probes.results["sm"]["state"] == UP
+
+
+@pytest.mark.integration
+class TestReady:
+    @pytest.mark.asyncio
+    async def test_ready_refleja_el_ultimo_sondeo(self, monkeypatch):
+        probes = DependencyProbes({"sm": (caida, True), "mongodb": (caida, False)})
+        monkeypatch.setattr(api_app, "dependency_probes", probes)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            # sin sondeo todavía: no se bloquea ni se declara caído
+            assert (await client.get("/ready")).status_code == 200
+
+            await probes.check_all()
+            response = await client.get("/ready")
+            assert response.status_code == 503
+            assert response.json() == {"status": "not_ready", "reasons": ["sm: down"]}
+
+            detail = (await client.get("/health/dependencies")).json()
+            assert detail["mongodb"]["state"] == DOWN and detail["mongodb"]["critical"] is False
+
+    @pytest.mark.asyncio
+    async def test_upstream_caido_solo_afecta_si_es_critico(self, monkeypatch):
+        monkeypatch.setattr(
+            "app.utils.v1.DependencyProbes.upstream_hosts",
+            lambda: [("https://sm.example.com", True), ("https://pagos.example.com", True)],
+        )
+        probes = DependencyProbes(default_probes(critical_hosts=["https://pagos.example.com/"]))
+        for name, (_, critical) in probes.probes.items():
+            probes.probes[name] = (caida, critical)
+        monkeypatch.setattr(api_app, "dependency_probes", probes)
+        await probes.check_all()
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/ready")
+            detail = (await client.get("/health/dependencies")).json()
+
+        assert response.json()["reasons"] == ["https://pagos.example.com: down"]
+        assert detail["https://sm.example.com"]["state"] == DOWN
+        assert detail["https://sm.example.com"]["critical"] is False
@@ -0,0 +1,31 @@
+import json
+from decimal import Decimal
+
+import pytest
+
+from app.utils.v1.FastJSON import FastJSONResponse, trusted_response
+
+pytest_plugins = ["tests.configtest"]
+
+
+@pytest.mark.unit
+class TestFastJSONResponse:
+    def test_codifica_igual_que_json(self):
+        content = {"nm_cliente": "Peña Ñáez", "mt_prima": 12.5, "polizas": [{"nu_poliza": 1}]}
+        response = FastJSONResponse(content)
+        assert response.media_type == "application/json"
+        assert json.loads(response.body) == content
+
+    def test_tipos_no_nativos_usan_el_encoder_de_fastapi(self):
+        response = FastJSONResponse({"monto": Decimal("10.5")})
+        assert json.loads(response.body) == {"monto": 10.5}
+
+    @pytest.mark.asyncio
+    async def test_trusted_response_no_valida_el_resultado(self):
+        @trusted_response
+        async def endpoint(request=None) -> dict:
+            return ["no", "es", "un", "dict"]
+
+        response = await endpoint(request=None)
+        assert isinstance(response, FastJSONResponse)
+        assert json.loads(response.body) == ["no", "es", "un", "dict"]
@@ -0,0 +1,64 @@
+import httpx
+import pytest
+
+from app.utils.v1.AsyncHttpx import AsyncHttpClientPool, fetch_url, http_pool, upstream_key
+
+pytest_plugins = ["tests.configtest"]
+
+
+@pytest.mark.unit
+class TestHttpClientPool:
+    @pytest.mark.asyncio
+    async def test_mismo_host_reutiliza_cliente(self):
+        pool = AsyncHttpClientPool()
+        a = pool.get("https://apim.example.com/a/consultarpersona")
+        b = pool.get("https://apim.example.com/b/cotizarglobal")
+        assert a is b
+        await pool.aclose()
+
+    @pytest.mark.asyncio
+    async def test_host_o_verify_distinto_usa_otro_cliente(self):
+        pool = AsyncHttpClientPool()
+        a = pool.get("https://apim.example.com/a")
+        b = pool.get("https://pasarela.example.com/a")
+        c = pool.get("https://apim.example.com/a", verify=False)
+        assert a is not b
+        assert a is not c
+        await pool.aclose()
+
+    @pytest.mark.asyncio
+    async def test_cliente_cerrado_se_recrea(self):
+        pool = AsyncHttpClientPool()
+        a = pool.get("https://apim.example.com/a")
+        await a.aclose()
+        assert pool.get("https://apim.example.com/a") is not a
+        await pool.aclose()
+
+    @pytest.mark.asyncio
+    async def test_fetch_url_usa_cliente_compartido(self):
+        url = "https://apim.example.com/consultarpersona"
+        calls = []
+
+        def handler(request: httpx.Request):
+            calls.append(request)
+            return httpx.Response(200, json={"status": {"code": "EXITO"}})
+
+        key = upstream_key(url)
+        http_pool.clients[key] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            response = await fetch_url("POST", url, {"Accept": "*/*"}, {"persona": {}})
+            await fetch_url("POST", url, {"Accept": "*/*"}, {"persona": {}})
+        finally:
+            await http_pool.aclose()
+
+        assert response.status_code == 200
+        assert len(calls) == 2
+        assert http_pool.clients == {}
+
+    @pytest.mark.asyncio
+    async def test_aclose_vacia_el_pool(self):
+        pool = AsyncHttpClientPool()
+        client = pool.get("https://apim.example.com/a")
+        await pool.aclose()
+        assert client.is_closed
+        assert pool.clients == {}
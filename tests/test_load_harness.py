@@ -0,0 +1,95 @@
+import httpx
+import pytest
+
+from app.api.app import app
+from app.utils.v1 import CotizacionCache
+from app.utils.v1.AsyncHttpx import http_pool, upstream_key
+from app.utils.v1.CotizacionCache import BYPASS_HEADER
+from app.utils.v1.ResponseCache import ResponseCache
+import app.api.v1.Integration_SM.app as integration_v1
+import app.api.v5.Integration_SM.app as integration_v5
+from benchmarks.fake_upstream import FakeUpstreamConfig, create_app
+from benchmarks.load_test import SCENARIOS, compare, percentile
+
+pytest_plugins = ["tests.configtest"]
+
+FAKE = "https://fake.example.com"
+
+
+@pytest.fixture
+def servicio(monkeypatch, api_key, headers):
+    """Cliente del servicio con los upstreams servidos por el doble (sin latencia)."""
+    monkeypatch.setattr(integration_v1, "url_consult_persona", f"{FAKE}/consultarpersona")
+    monkeypatch.setattr(integration_v5, "url_cotizar", f"{FAKE}/cotizarglobal")
+    monkeypatch.setattr(CotizacionCache, "cotizacion_cache", ResponseCache("crear_cotizacion"))
+    for router in (integration_v1, integration_v5):
+        monkeypatch.setattr(router.api_key_verifier, "api_keys", [api_key])
+
+    async def post(path, body, config=None, extra_headers=None):
+        fake = create_app(config or FakeUpstreamConfig(latency_ms=0, jitter_ms=0))
+        http_pool.clients[upstream_key(FAKE)] = httpx.AsyncClient(transport=httpx.ASGITransport(app=fake))
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.post(path, json=body, headers={**headers, **(extra_headers or {})})
+        finally:
+            await http_pool.aclose()
+
+    return post
+
+
+@pytest.mark.integration
+class TestFakeUpstream:
+    @pytest.mark.asyncio
+    async def test_cotizacion_v5_contra_el_doble(self, servicio):
+        scenario = SCENARIOS["cotizacion_v5"]
+        response = await servicio(
+            scenario.path, scenario.body(0), FakeUpstreamConfig(latency_ms=0, jitter_ms=0, items=2),
+            {BYPASS_HEADER: "true"},
+        )
+
+        assert response.status_code == 200
+        cotizaciones = response.json()
+        assert len(cotizaciones) == 2
+        assert cotizaciones[0]["bienes"][0]["de_bien"] == "Ana Pérez"
+
+    @pytest.mark.asyncio
+    async def test_consultar_persona_contra_el_doble(self, servicio):
+        scenario = SCENARIOS["consultar_persona"]
+        response = await servicio(scenario.path, scenario.body(7))
+
+        assert response.status_code == 200
+        assert response.json()[0]["nu_documento"] == "V-10000007"
+
+    @pytest.mark.asyncio
+    async def test_error_simulado_del_upstream(self, servicio):
+        scenario = SCENARIOS["consultar_persona"]
+        response = await servicio(
+            scenario.path, scenario.body(8), FakeUpstreamConfig(latency_ms=0, jitter_ms=0, error_rate=1.0),
+        )
+
+        assert response.status_code >= 400
+
+    @pytest.mark.asyncio
+    async def test_cotizarglobal_rechaza_payload_sin_colecciones(self):
+        transport = httpx.ASGITransport(app=create_app(FakeUpstreamConfig(latency_ms=0, jitter_ms=0)))
+        async with httpx.AsyncClient(transport=transport, base_url=FAKE) as client:
+            response = await client.post("/cotizarglobal", json={"funcionalidad": "COTIZAR_GLOBAL_IND_V"})
+
+        assert response.json()["status"]["code"] == "FALLONEGOCIO"
+
+
+@pytest.mark.unit
+class TestComparacion:
+    def test_percentiles(self):
+        valores = [float(i) for i in range(1, 101)]
+
+        assert percentile(valores, 0.50) == 50.0
+        assert percentile(valores, 0.99) == 99.0
+        assert percentile([], 0.95) == 0.0
+
+    def test_detecta_regresiones(self):
+        base = {"a": {"p95_ms": 100.0, "throughput_rps": 200.0}, "b": {"p95_ms": 50.0, "throughput_rps": 80.0}}
+        actual = {"a": {"p95_ms": 130.0, "throughput_rps": 150.0}, "b": {"p95_ms": 55.0, "throughput_rps": 79.0}}
+
+        assert compare(actual, base, 0.2) == ["a: p95 100.0 -> 130.0 ms", "a: throughput 200.0 -> 150.0 req/s"]
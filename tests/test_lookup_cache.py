@@ -0,0 +1,144 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.utils.v1.ResponseCache import EncryptedCacheBackend, MemoryCacheBackend, ResponseCache
+import app.utils.v1.LookupCache as lookup_cache
+import app.api.v1.Integration_SM.app as integration_v1
+import app.api.v2.PasarelaPagoMS.app as pasarela_v2
+
+pytest_plugins = ["tests.configtest"]
+
+URL_POLIZA = "https://sm.example.com/consultarpoliza"
+URL_ANEXO = "https://sm.example.com/incanexpolivig"
+URL_PAGO = "https://pasarela.example.com/onlinepay/register"
+POLIZA = {"cd_entidad": 1, "cd_area": 71, "poliza": 123, "certificado": 1}
+
+
+@pytest.mark.unit
+class TestResponseCacheInvalidacion:
+    @pytest.mark.asyncio
+    async def test_invalida_por_prefijo(self):
+        cache = ResponseCache("prueba")
+        await cache.set("1:71:123:1:poliza|a", {"x": 1})
+        await cache.set("1:71:123:2:poliza|a", {"x": 2})
+        await cache.set("1:71:1234:1:poliza|a", {"x": 3})
+
+        await cache.invalidate(prefix=lookup_cache.poliza_prefix(1, 71, 123))
+
+        assert await cache.get("1:71:123:1:poliza|a") is None
+        assert await cache.get("1:71:123:2:poliza|a") is None
+        assert await cache.get("1:71:1234:1:poliza|a") == {"x": 3}
+
+    @pytest.mark.asyncio
+    async def test_carga_en_curso_no_repone_dato_invalidado(self):
+        cache = ResponseCache("prueba")
+
+        async def loader():
+            await asyncio.sleep(0.05)
+            return {"viejo": True}
+
+        task = asyncio.create_task(cache.get_or_load("k", loader))
+        await asyncio.sleep(0.01)
+        await cache.invalidate(key="k")
+        assert await task == {"viejo": True}
+        assert await cache.get("k") is None
+
+    @pytest.mark.asyncio
+    async def test_almacen_compartido_cifrado(self):
+        inner = MemoryCacheBackend()
+        cache = ResponseCache("prueba", shared=EncryptedCacheBackend(inner, "secreto"), local_ttl=5)
+        await cache.set("V-123", {"nombre": "Ana"}, ttl=60)
+
+        token, _ = await inner.get("V-123")
+        assert "Ana" not in token
+        await cache.local.clear()
+        assert await cache.get("V-123") == {"nombre": "Ana"}
+
+
+@pytest.mark.integration
+class TestConsultarPolizaCache:
+    @pytest.mark.asyncio
+    async def test_incluir_anexo_invalida_la_poliza(self, monkeypatch, api_key, headers, mock_upstream):
+        calls = []
+
+        def upstream(request: httpx.Request):
+            calls.append(request.url.path)
+            if request.url.path.endswith("incanexpolivig"):
+                return httpx.Response(200, json={"status": {"code": "EXITO"}, "anexo": []})
+            return httpx.Response(200, json={
+                "status": {"code": "EXITO", "descripcion": "EXITO"},
+                "polizas": [{"poliza": 123}],
+            })
+
+        monkeypatch.setattr(integration_v1, "url_consultar_poliza", URL_POLIZA)
+        monkeypatch.setattr(integration_v1, "url_inclusion_anexos_poliza", URL_ANEXO)
+        monkeypatch.setattr(integration_v1.api_key_verifier, "api_keys", [api_key])
+        await lookup_cache.poliza_cache.local.clear()
+        client = mock_upstream(URL_POLIZA, upstream)
+        for _ in range(2):
+            response = await client.post("/api/v1/sm/consultar_poliza", json=POLIZA, headers=headers)
+            assert response.status_code == 200
+        assert calls.count("/consultarpoliza") == 1
+
+        response = await client.post("/api/v1/sm/incluir_anexo", json={
+            "cd_entidad": 1, "cd_area": 71, "nu_poliza": 123,
+            "nm_primer_nombre": "Ana", "nm_primer_apellido": "Pérez",
+        }, headers=headers)
+        assert response.status_code == 200
+
+        response = await client.post("/api/v1/sm/consultar_poliza", json=POLIZA, headers=headers)
+        assert response.status_code == 200
+
+        assert calls.count("/consultarpoliza") == 2
+
+    @pytest.mark.asyncio
+    async def test_pago_v2_invalida_cada_poliza_de_los_recibos(self, monkeypatch, api_key, headers, mock_upstream):
+        calls = []
+
+        def upstream(request: httpx.Request):
+            calls.append(request.url.path)
+            if request.url.path.endswith("register"):
+                return httpx.Response(200, json={"status": {"code": "EXITO"}, "datos": {"cd_pago": 1}})
+            return httpx.Response(200, json={
+                "status": {"code": "EXITO", "descripcion": "EXITO"},
+                "polizas": [{"poliza": 123}],
+            })
+
+        monkeypatch.setattr(integration_v1, "url_consultar_poliza", URL_POLIZA)
+        monkeypatch.setattr(integration_v1.api_key_verifier, "api_keys", [api_key])
+        monkeypatch.setattr(pasarela_v2, "url_registrar_pago", URL_PAGO)
+        monkeypatch.setattr(pasarela_v2.api_key_verifier, "api_keys", [api_key])
+        await lookup_cache.poliza_cache.local.clear()
+        mock_upstream(URL_PAGO, upstream, verify=False)
+        client = mock_upstream(URL_POLIZA, upstream)
+        otra_poliza = {**POLIZA, "poliza": 456}
+        consultas = [
+            ("/api/v1/sm/consultar_poliza", POLIZA),
+            ("/api/v1/sm/consultar_recibos", POLIZA),
+            ("/api/v1/sm/consultar_recibos", otra_poliza),
+        ]
+        for path, body in consultas:
+            assert (await client.post(path, json=body, headers=headers)).status_code == 200
+        assert lookup_cache.poliza_cache.stats()["size"] == 3
+
+        recibo = {"cd_entidad": 1, "cd_area": 71, "nu_poliza": 123, "nu_certificado": 1,
+                  "cd_recibo": 1, "nu_convenio_pago": 0, "nu_cuota": 1}
+        response = await client.post("/api/v2/pasarela_pago_ms/registrar_pago", json={
+            "recibo_poliza_pago": [recibo, {**recibo, "cd_recibo": 2}, {**recibo, "nu_poliza": 456}],
+            "pago": {
+                "moneda_pago": "BS",
+                "tipo_instrumento_pago": "TDC",
+                "instrumento_pago": {"instrumento_tdc": {
+                    "numero": 4111111111111111, "fe_vencimiento": "01-2030", "cd_verificacion": 123,
+                    "nombre_tarjeta": "ANA PEREZ", "tp_identidad": "V", "doc_identidad": "12345678",
+                }},
+            },
+        }, headers=headers)
+        assert response.status_code == 200
+
+        assert lookup_cache.poliza_cache.stats()["size"] == 0
+        for path, body in consultas:
+            assert (await client.post(path, json=body, headers=headers)).status_code == 200
+        assert calls.count("/consultarpoliza") == 6
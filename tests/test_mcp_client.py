@@ -0,0 +1,114 @@
+import httpx
+import pytest
+
+from app.mcp import client as mcp_client
+from app.mcp.client import BackendClient, close_backend_client, get_backend_client, tool_timeout
+from app.mcp.exceptions import BackendError, NotFoundError
+from app.utils.v1.configs import MCP_BACKEND_TIMEOUT, get_settings
+
+pytest_plugins = ["tests.configtest"]
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    """Instala como cliente del proceso un BackendClient servido por `handler`."""
+
+    def install(handler):
+        backend_client = BackendClient("http://backend", transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(mcp_client, "_backend_client", backend_client)
+        return backend_client
+
+    return install
+
+
+@pytest.mark.unit
+class TestBackendClient:
+    @pytest.mark.asyncio
+    async def test_reutiliza_el_mismo_cliente_http(self, backend):
+        backend_client = backend(lambda request: httpx.Response(200, json={"ok": True}))
+
+        await backend_client.post("/a", {})
+        primero = backend_client.client
+        await backend_client.post("/b", {})
+
+        assert backend_client.client is primero
+        assert get_backend_client() is backend_client
+        await backend_client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_timeout_por_herramienta(self, backend):
+        timeouts = []
+
+        def handler(request):
+            timeouts.append(request.extensions["timeout"]["read"])
+            return httpx.Response(200, json={})
+
+        backend_client = backend(handler)
+        await backend_client.post("/a", {}, timeout=12.5)
+        await backend_client.post("/a", {})
+
+        assert timeouts == [12.5, MCP_BACKEND_TIMEOUT]
+        assert tool_timeout("consultar_persona") == get_settings().MCP_TOOL_TIMEOUTS["consultar_persona"]
+        assert tool_timeout("otra") == MCP_BACKEND_TIMEOUT
+        await backend_client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_mapeo_de_errores(self, backend):
+        def handler(request):
+            if request.url.path == "/no-existe":
+                return httpx.Response(404)
+            return httpx.Response(503, json={"detail": "Circuito abierto"})
+
+        backend_client = backend(handler)
+
+        with pytest.raises(NotFoundError):
+            await backend_client.post("/no-existe", {})
+        with pytest.raises(BackendError) as error:
+            await backend_client.post("/falla", {})
+        assert error.value.status_code == 503
+        assert "Circuito abierto" in error.value.message
+        await backend_client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_cerrar_libera_el_cliente_del_proceso(self, backend):
+        backend_client = backend(lambda request: httpx.Response(200, json={}))
+        await backend_client.post("/a", {})
+        http_client = backend_client.client
+
+        await close_backend_client()
+
+        assert http_client.is_closed
+        assert mcp_client._backend_client is None
+
+
+@pytest.mark.integration
+class TestServidorMCP:
+    @pytest.mark.asyncio
+    async def test_herramientas_comparten_el_cliente_del_lifespan(self, monkeypatch, backend):
+        monkeypatch.setenv("MCP_SERVER_MODE", "true")
+        monkeypatch.setattr(get_settings(), "API_TOKEN_MCP", "token-mcp")
+        from fastmcp import Client
+        from app.mcp.server import mcp
+
+        clientes = set()
+
+        def handler(request):
+            assert request.headers["X-API-Key"] == "token-mcp"
+            return httpx.Response(200, json=[{"nu_documento": "V-12345678"}])
+
+        backend_client = backend(handler)
+        original_post = backend_client.post
+
+        async def post(*args, **kwargs):
+            clientes.add(id(backend_client.client))
+            return await original_post(*args, **kwargs)
+
+        monkeypatch.setattr(backend_client, "post", post)
+
+        async with Client(mcp) as client:
+            for _ in range(3):
+                result = await client.call_tool("consultar_persona", {"num_documento": "V-12345678"})
+                assert result.data == {"persona": [{"nu_documento": "V-12345678"}]}
+
+        assert len(clientes) == 1
+        assert mcp_client._backend_client is None
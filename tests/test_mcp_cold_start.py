@@ -0,0 +1,58 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest_plugins = ["tests.configtest"]
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Segundos que pueden añadir los módulos del proyecto al importar un punto de entrada del
+# MCP, descontado FastMCP (~0.06 s medidos; importar FastAPI, httpx o la configuración
+# al cargar el servidor lo lleva a 0.3-0.4 s)
+PRESUPUESTO_IMPORTACION_S = 0.25
+
+# Se cargan en la primera llamada a una herramienta, no al arrancar
+DIFERIDOS = ["fastapi", "httpx", "loguru", "app.utils.v1.configs", "app.utils.v1.LoggerSingleton"]
+
+MEDIR = """
+import json, os, runpy, sys, time
+os.environ["MCP_SERVER_MODE"] = "true"
+inicio = time.perf_counter()
+import fastmcp.server.server, fastmcp.server.dependencies, fastmcp.server.middleware
+base = time.perf_counter()
+runpy.run_path(sys.argv[1], run_name="arranque_en_frio")
+fin = time.perf_counter()
+print(json.dumps({
+    "fastmcp": base - inicio,
+    "proyecto": fin - base,
+    "cargados": [m for m in sys.argv[2:] if m in sys.modules],
+}))
+"""
+
+
+def arranque_en_frio(script: str, cwd: Path) -> dict:
+    """Importa el punto de entrada en un intérprete nuevo; el mejor de tres intentos."""
+    mediciones = []
+    for _ in range(3):
+        salida = subprocess.run(
+            [sys.executable, "-c", MEDIR, str(PROJECT_ROOT / script), *DIFERIDOS],
+            cwd=cwd, capture_output=True, text=True, check=True,
+        )
+        mediciones.append(json.loads(salida.stdout.strip().splitlines()[-1]))
+    return min(mediciones, key=lambda m: m["proyecto"])
+
+
+@pytest.mark.slow
+@pytest.mark.integration
+class TestArranqueEnFrio:
+    @pytest.mark.parametrize("script", ["run_mcp.py", "server.py"])
+    def test_presupuesto_de_importacion(self, script, tmp_path):
+        medicion = arranque_en_frio(script, tmp_path)
+
+        assert medicion["cargados"] == []
+        # Ni la carpeta de logs: el logger no se configura hasta el primer uso
+        assert not (tmp_path / "logs").exists()
+        assert medicion["proyecto"] <= PRESUPUESTO_IMPORTACION_S, medicion
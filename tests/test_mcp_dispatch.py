@@ -0,0 +1,76 @@
+import httpx
+import pytest
+import pytest_asyncio
+
+from app.api.app import app
+from app.mcp.client import BackendClient
+from app.mcp.dispatch import InProcessBackend
+from app.mcp.exceptions import BackendError, NotFoundError
+import app.api.v1.Integration_SM.app as integration_v1
+
+pytest_plugins = ["tests.configtest"]
+
+URL_PERSONA = "https://sm.example.com/consultarpersona"
+TOKEN = "token-mcp"
+
+
+def upstream(request: httpx.Request) -> httpx.Response:
+    if b"99999" in request.content:
+        return httpx.Response(200, json={"status": {"code": "FALLONEGOCIO", "descripcion": "Persona no registrada"}})
+    return httpx.Response(200, json={"status": {"code": "EXITO"}, "persona": [{"nm_primer_nombre": "Ana"}]})
+
+
+@pytest_asyncio.fixture
+async def backends(monkeypatch, mock_upstream):
+    """Los dos modos de despacho contra el mismo upstream simulado."""
+    monkeypatch.setattr(integration_v1, "url_consult_persona", URL_PERSONA)
+    monkeypatch.setattr(integration_v1.api_key_verifier, "api_keys", [TOKEN])
+    mock_upstream(URL_PERSONA, upstream)
+    http_backend = BackendClient("http://test", transport=httpx.ASGITransport(app=app))
+    yield {"http": http_backend, "inprocess": InProcessBackend()}
+    await http_backend.aclose()
+
+
+async def resultado(backend, endpoint: str, data: dict):
+    try:
+        return await backend.post(endpoint=endpoint, data=data, api_key=TOKEN, timeout=5.0)
+    except (BackendError, NotFoundError) as e:
+        return type(e), getattr(e, "status_code", None), e.message
+
+
+@pytest.mark.integration
+class TestDespachoEnProceso:
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("documento", ["V-10000001", "V-99999"])
+    async def test_mismo_resultado_que_por_http(self, backends, documento):
+        # Documentos distintos por modo: la caché de consultas no debe ocultar la llamada al upstream
+        por_http = await resultado(
+            backends["http"], "/api/v1/sm/consultar_persona", {"num_documento": f"{documento}1"},
+        )
+        en_proceso = await resultado(
+            backends["inprocess"], "/api/v1/sm/consultar_persona", {"num_documento": f"{documento}2"},
+        )
+
+        assert en_proceso == por_http
+
+    @pytest.mark.asyncio
+    async def test_validacion_igual_que_por_http(self, backends):
+        datos = {"num_documento": "X-1"}
+
+        por_http = await resultado(backends["http"], "/api/v1/sm/consultar_persona", datos)
+        en_proceso = await resultado(backends["inprocess"], "/api/v1/sm/consultar_persona", datos)
+
+        assert en_proceso == por_http
+        assert en_proceso[:2] == (BackendError, 422)
+
+    @pytest.mark.asyncio
+    async def test_endpoint_desconocido(self, backends):
+        with pytest.raises(NotFoundError):
+            await backends["inprocess"].post(endpoint="/api/v1/sm/otro", data={})
+
+    @pytest.mark.asyncio
+    async def test_usa_el_endpoint_sin_codificar(self, backends):
+        function, model = backends["inprocess"]._resolve("/api/v1/sm/consultar_poliza")
+
+        assert function is integration_v1.consultar_poliza.raw_endpoint
+        assert model.__name__ == "ConsultarPolizaBase"
@@ -0,0 +1,134 @@
+import asyncio
+
+import anyio
+import httpx
+import pytest
+import pytest_asyncio
+import uvicorn
+from sse_starlette.sse import AppStatus
+
+from app.mcp import client as mcp_client
+from app.mcp.client import BackendClient
+from app.mcp.sessions import SessionConcurrencyMiddleware
+from app.utils.v1.configs import MCP_HTTP_PATH, get_settings
+
+pytest_plugins = ["tests.configtest"]
+
+TOKEN = "token-local"
+
+
+@pytest.mark.unit
+class TestConcurrenciaPorSesion:
+    @pytest.mark.asyncio
+    async def test_limita_las_llamadas_de_la_sesion(self):
+        from fastmcp import Client, FastMCP
+
+        limite = SessionConcurrencyMiddleware(max_concurrency=2)
+        servidor = FastMCP("prueba", middleware=[limite])
+        en_curso = {"actual": 0, "maximo": 0}
+
+        @servidor.tool()
+        async def lenta() -> dict:
+            en_curso["actual"] += 1
+            en_curso["maximo"] = max(en_curso["maximo"], en_curso["actual"])
+            await anyio.sleep(0.05)
+            en_curso["actual"] -= 1
+            return {}
+
+        async with Client(servidor) as client:
+            await asyncio.gather(*(client.call_tool("lenta", {}) for _ in range(6)))
+
+        assert en_curso["maximo"] == 2
+        assert limite.active_sessions() == 0
+
+
+@pytest_asyncio.fixture
+async def servidor_http(monkeypatch, unused_tcp_port):
+    """El transporte HTTP del servidor MCP en un puerto local, con un backend simulado."""
+    monkeypatch.setenv("MCP_SERVER_MODE", "true")
+    monkeypatch.setenv("MCP_LOCAL_TOKEN", TOKEN)
+    monkeypatch.setattr(get_settings(), "API_TOKEN_MCP", "token-mcp")
+    from app.mcp.server import create_http_app, session_limits
+
+    monkeypatch.setattr(session_limits, "max_concurrency", 2)
+    clientes = set()
+    en_curso = {"actual": 0, "maximo": 0}
+
+    async def handler(request):
+        en_curso["actual"] += 1
+        en_curso["maximo"] = max(en_curso["maximo"], en_curso["actual"])
+        await anyio.sleep(0.05)
+        en_curso["actual"] -= 1
+        return httpx.Response(200, json=[{"nu_documento": "V-12345678"}])
+
+    backend_client = BackendClient("http://backend", transport=httpx.MockTransport(handler))
+    original_post = backend_client.post
+
+    async def post(*args, **kwargs):
+        clientes.add(id(backend_client.client))
+        return await original_post(*args, **kwargs)
+
+    monkeypatch.setattr(backend_client, "post", post)
+    monkeypatch.setattr(mcp_client, "_backend_client", backend_client)
+
+    # Se restablece al terminar: con el aviso activo, sse_starlette cierra los streams nuevos
+    monkeypatch.setattr(AppStatus, "should_exit", False)
+    server = uvicorn.Server(uvicorn.Config(create_http_app(), port=unused_tcp_port, log_level="warning"))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    yield f"http://127.0.0.1:{unused_tcp_port}{MCP_HTTP_PATH}", clientes, en_curso
+    # Lo que hace la señal de salida de uvicorn: detener el servidor y avisar a sse_starlette,
+    # cuya tarea de vigilancia de los streams quedaría pendiente al cerrar el loop
+    AppStatus.should_exit = True
+    server.should_exit = True
+    await task
+    await asyncio.gather(*(
+        t for t in asyncio.all_tasks() if getattr(t.get_coro(), "__name__", "") == "_shutdown_watcher"
+    ))
+
+
+@pytest.mark.integration
+class TestTransporteHTTP:
+    @pytest.mark.asyncio
+    async def test_exige_el_token_local(self, servidor_http):
+        url, _, _ = servidor_http
+
+        async with httpx.AsyncClient() as http:
+            sin_token = await http.post(url, json={})
+            token_invalido = await http.post(url, json={}, headers={"Authorization": "Bearer otro"})
+
+        assert sin_token.status_code in (401, 403)
+        assert token_invalido.status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_sesiones_concurrentes_con_limite_por_sesion(self, servidor_http):
+        url, clientes, en_curso = servidor_http
+
+        # Protocolo con sesiones (`mcp-session-id`): cada una tiene su propio límite
+        por_sesion = await asyncio.gather(*(consultas(url, mode="legacy") for _ in range(3)))
+
+        assert all(d == {"persona": [{"nu_documento": "V-12345678"}]} for datos in por_sesion for d in datos)
+        assert len(clientes) == 1
+        assert 2 < en_curso["maximo"] <= 6
+
+    @pytest.mark.asyncio
+    async def test_clientes_sin_sesion_comparten_el_limite_del_origen(self, servidor_http):
+        url, _, en_curso = servidor_http
+
+        await asyncio.gather(*(consultas(url) for _ in range(3)))
+
+        assert en_curso["maximo"] == 2
+
+
+async def consultas(url: str, mode: str = "auto") -> list:
+    """Seis llamadas simultáneas desde un cliente MCP por HTTP."""
+    from fastmcp import Client
+    from fastmcp.client.transports import StreamableHttpTransport
+
+    transport = StreamableHttpTransport(url, headers={"Authorization": f"Bearer {TOKEN}"})
+    async with Client(transport, mode=mode) as client:
+        resultados = await asyncio.gather(*(
+            client.call_tool("consultar_persona", {"num_documento": "V-12345678"}) for _ in range(6)
+        ))
+    return [r.data for r in resultados]
@@ -0,0 +1,124 @@
+import copy
+
+import httpx
+import pytest
+
+from app.mcp import client as mcp_client
+from app.mcp.client import BackendClient
+from app.mcp.projection import project, shape_result, trim_lists
+from app.utils.v1.configs import MCP_RESULT_MAX_ITEMS, MCP_RESULT_PAGE_SIZE, get_settings
+
+pytest_plugins = ["tests.configtest"]
+
+
+def poliza(recibos: int) -> dict:
+    return {
+        "status": {"code": "EXITO"},
+        "polizas": [{
+            "nu_poliza": 1000,
+            "cd_entidad": 1,
+            "tp_contrato": "I",
+            "certificados": [{
+                "nu_certificado": 1,
+                "de_status_cert": "VIGENTE",
+                "mediadores": [{"cd_mediador": 7}],
+                "recibos": [
+                    {
+                        "cd_recibo": n,
+                        "mt_recibo": 10.5,
+                        "de_observacion": "x" * 50,
+                        "cuotas": [{"nu_cuota": 1, "mt_cuota": 10.5}],
+                    }
+                    for n in range(1, recibos + 1)
+                ],
+            }],
+        }],
+    }
+
+
+@pytest.mark.unit
+class TestProyeccion:
+    def test_rutas_con_puntos_y_listas(self):
+        resultado = project(poliza(2), ["polizas.nu_poliza", "polizas.certificados.recibos.cd_recibo"])
+
+        assert resultado == {
+            "polizas": [{
+                "nu_poliza": 1000,
+                "certificados": [{"recibos": [{"cd_recibo": 1}, {"cd_recibo": 2}]}],
+            }],
+        }
+
+    def test_prefijo_conserva_el_subarbol(self):
+        original = poliza(1)
+
+        resultado = project(original, ["polizas.certificados.mediadores", "polizas.certificados.mediadores.cd_mediador"])
+
+        assert resultado["polizas"][0]["certificados"][0] == {"mediadores": [{"cd_mediador": 7}]}
+
+    def test_no_modifica_el_resultado_original(self):
+        original = poliza(30)
+        copia = copy.deepcopy(original)
+
+        shape_result("consultar_poliza", original, resumen=True, pagina=2)
+
+        assert original == copia
+
+    def test_recorta_y_pagina_los_recibos(self):
+        recibos = lambda r: r["polizas"][0]["certificados"][0]
+
+        primera = recibos(shape_result("consultar_poliza", poliza(25)))
+        segunda = recibos(shape_result("consultar_poliza", poliza(25), pagina=2, por_pagina=20))
+
+        assert [r["cd_recibo"] for r in primera["recibos"]] == list(range(1, MCP_RESULT_PAGE_SIZE + 1))
+        assert primera["recibos_total"] == 25
+        assert [r["cd_recibo"] for r in segunda["recibos"]] == list(range(21, 26))
+        assert segunda["recibos_total"] == 25
+
+    def test_listas_no_paginadas_se_limitan(self):
+        resultado = trim_lists({"persona": list(range(40)), "otro": [1]}, max_items=5)
+
+        assert resultado == {"persona": [0, 1, 2, 3, 4], "persona_total": 40, "otro": [1]}
+
+    def test_resumen_y_detalle_de_negocio(self):
+        resumen = shape_result("consultar_poliza", poliza(1), resumen=True)
+
+        assert "tp_contrato" not in resumen["polizas"][0]
+        assert "status" not in resumen
+        assert resumen["polizas"][0]["certificados"][0]["recibos"] == [{"cd_recibo": 1, "mt_recibo": 10.5}]
+        assert shape_result("consultar_poliza", {"detail": "Sin datos"}, resumen=True) == {"detail": "Sin datos"}
+
+
+@pytest.mark.integration
+class TestHerramientasMCP:
+    @pytest.mark.asyncio
+    async def test_campos_y_paginas_desde_el_cliente(self, monkeypatch):
+        monkeypatch.setenv("MCP_SERVER_MODE", "true")
+        monkeypatch.setattr(get_settings(), "API_TOKEN_MCP", "token-mcp")
+        from fastmcp import Client
+        from app.mcp.server import mcp
+
+        backend_client = BackendClient(
+            "http://backend", transport=httpx.MockTransport(lambda request: httpx.Response(200, json=poliza(60))),
+        )
+        monkeypatch.setattr(mcp_client, "_backend_client", backend_client)
+        argumentos = {"cd_entidad": 1, "cd_area": 18, "poliza": 1000, "certificado": 1}
+
+        async with Client(mcp) as client:
+            completo = await client.call_tool("consultar_poliza", argumentos)
+            pagina = await client.call_tool("consultar_poliza", {
+                **argumentos,
+                "campos": ["polizas.certificados.recibos.cd_recibo"],
+                "pagina": 3,
+                "por_pagina": 5,
+            })
+
+        certificado = completo.data["polizas"][0]["certificados"][0]
+        assert len(certificado["recibos"]) == MCP_RESULT_PAGE_SIZE
+        assert certificado["recibos_total"] == 60
+        assert MCP_RESULT_PAGE_SIZE <= MCP_RESULT_MAX_ITEMS
+        assert pagina.data == {
+            "polizas": [{"certificados": [{
+                "recibos": [{"cd_recibo": n} for n in range(11, 16)],
+                "recibos_total": 60,
+            }]}],
+        }
@@ -0,0 +1,81 @@
+import os
+
+import httpx
+import pytest
+
+from app.utils.v1.Metrics import MetricsRegistry
+import app.api.v1.Integration_SM.app as integration_v1
+
+pytest_plugins = ["tests.configtest"]
+
+URL_POLIZA = "https://sm.example.com/consultarpoliza"
+
+
+@pytest.mark.unit
+class TestMetricsRegistry:
+    def test_histograma_en_formato_prometheus(self):
+        registry = MetricsRegistry(directory=None)
+        histogram = registry.histogram("latencia_seconds", "Latencia", ("ruta",), buckets=(0.1, 1.0))
+        histogram.observe("/a", value=0.05)
+        histogram.observe("/a", value=0.5)
+        histogram.observe("/a", value=5)
+
+        text = registry.render()
+
+        assert '# TYPE latencia_seconds histogram' in text
+        assert 'latencia_seconds_bucket{ruta="/a",le="0.1"} 1' in text
+        assert 'latencia_seconds_bucket{ruta="/a",le="1.0"} 2' in text
+        assert 'latencia_seconds_bucket{ruta="/a",le="+Inf"} 3' in text
+        assert 'latencia_seconds_count{ruta="/a"} 3' in text
+
+    def test_escapa_etiquetas(self):
+        registry = MetricsRegistry(directory=None)
+        registry.counter("eventos_total", "Eventos", ("valor",)).inc('a"b\\c')
+        assert 'eventos_total{valor="a\\"b\\\\c"} 1' in registry.render()
+
+    def test_suma_las_instantaneas_de_otros_workers(self, tmp_path):
+        def build():
+            registry = MetricsRegistry(directory=str(tmp_path))
+            return registry, registry.counter("llamadas_total", "Llamadas"), registry.gauge("en_curso", "En curso")
+
+        other, calls, in_flight = build()
+        calls.inc(amount=3)
+        in_flight.inc(amount=2)
+        other.write_snapshot()
+        # el mismo archivo, como si lo hubiera escrito un worker que ya terminó
+        os.replace(tmp_path / f"{os.getpid()}.json", tmp_path / "999999999.json")
+        other.write_snapshot()
+        os.replace(tmp_path / f"{os.getpid()}.json", tmp_path / f"{os.getppid()}.json")
+
+        registry, calls, in_flight = build()
+        calls.inc()
+        totals = registry.aggregate()
+
+        assert totals["llamadas_total"][()] == 7
+        # los gauges de procesos que ya no existen no se suman
+        assert totals["en_curso"][()] == 2
+
+
+@pytest.mark.integration
+class TestMetricsEndpoint:
+    @pytest.mark.asyncio
+    async def test_expone_latencias_y_resultados_del_upstream(self, monkeypatch, api_key, headers, mock_upstream):
+        def upstream(request: httpx.Request):
+            return httpx.Response(200, json={
+                "status": {"code": "FALLONEGOCIO", "descripcion": "Poliza anulada"},
+            })
+
+        monkeypatch.setattr(integration_v1, "url_consultar_poliza", URL_POLIZA)
+        monkeypatch.setattr(integration_v1.api_key_verifier, "api_keys", [api_key])
+        client = mock_upstream(URL_POLIZA, upstream)
+        body = {"cd_entidad": 1, "cd_area": 71, "poliza": 99001, "certificado": 1}
+        await client.post("/api/v1/sm/consultar_poliza", json=body, headers=headers)
+        response = await client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        text = response.text
+        assert 'http_request_duration_seconds_count{method="POST",route="/api/v1/sm/consultar_poliza",status="200"}' in text
+        assert 'upstream_responses_total{upstream="default",status="200"}' in text
+        assert 'upstream_outcomes_total{upstream="default",code="FALLONEGOCIO"}' in text
+        assert 'upstream_requests_in_flight{upstream="default"} 0' in text
@@ -0,0 +1,77 @@
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from app.middlewares import ErrorHandlingMiddleware, LoggingMiddleware, ProcessTimeHeaderMiddleware
+
+pytest_plugins = ["tests.configtest"]
+
+
+async def ok(request):
+    return JSONResponse({"status": "ok"})
+
+
+async def boom(request):
+    raise RuntimeError("fallo inesperado")
+
+
+async def stream(request):
+    async def chunks():
+        for i in range(3):
+            yield f"parte-{i};".encode()
+
+    return StreamingResponse(chunks(), media_type="text/plain")
+
+
+async def broken_stream(request):
+    async def chunks():
+        yield b"inicio;"
+        raise RuntimeError("corte")
+
+    return StreamingResponse(chunks(), media_type="text/plain")
+
+
+def build_app(*middleware_classes):
+    app = Starlette(routes=[
+        Route("/ok", ok), Route("/boom", boom), Route("/stream", stream), Route("/broken", broken_stream),
+    ])
+    for middleware in middleware_classes:
+        app.add_middleware(middleware)
+    return app
+
+
+async def get(app, path):
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get(path)
+
+
+@pytest.mark.unit
+class TestPureASGIMiddlewares:
+    @pytest.mark.asyncio
+    async def test_error_se_convierte_en_json(self):
+        response = await get(build_app(ErrorHandlingMiddleware), "/boom")
+        assert response.status_code == 500
+        assert response.json() == {"error": "Error interno del servidor"}
+
+    @pytest.mark.asyncio
+    async def test_error_despues_de_iniciar_la_respuesta_se_propaga(self):
+        app = build_app(ErrorHandlingMiddleware)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            with pytest.raises(RuntimeError):
+                await client.get("/broken")
+
+    @pytest.mark.asyncio
+    async def test_encabezado_de_tiempo(self):
+        response = await get(build_app(ProcessTimeHeaderMiddleware), "/ok")
+        assert float(response.headers["X-Process-Time"]) >= 0
+
+    @pytest.mark.asyncio
+    async def test_streaming_intacto(self):
+        app = build_app(ErrorHandlingMiddleware, LoggingMiddleware, ProcessTimeHeaderMiddleware)
+        response = await get(app, "/stream")
+        assert response.text == "parte-0;parte-1;parte-2;"
+        assert "X-Process-Time" in response.headers
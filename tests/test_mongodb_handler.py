@@ -0,0 +1,60 @@
+import queue
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.utils.v1.MongoDBHandler import BufferedMongoDBHandler
+
+pytest_plugins = ["tests.configtest"]
+
+
+def _msg(text):
+    return SimpleNamespace(record={"message": text, "name": "tests"})
+
+
+@pytest.fixture
+def db():
+    instance = MagicMock()
+    with patch("app.utils.v1.MongoDBHandler.DatabaseSingleton", return_value=instance):
+        yield instance
+
+
+@pytest.mark.unit
+class TestBufferedMongoDBHandler:
+    def test_agrupa_en_insert_many(self, db):
+        handler = BufferedMongoDBHandler(batch_size=3, flush_interval=60, queue_size=100)
+        for i in range(7):
+            handler(_msg(f"log {i}"))
+        handler.close()
+
+        collection = db.logs_integration_ms
+        collection.insert_one.assert_not_called()
+        sizes = [len(c.args[0]) for c in collection.insert_many.call_args_list]
+        assert sum(sizes) == 7
+        assert max(sizes) <= 3
+        db.register_close_hook.assert_called_once_with(handler.close)
+
+    def test_flush_por_tiempo(self, db):
+        handler = BufferedMongoDBHandler(batch_size=1000, flush_interval=0.05, queue_size=100)
+        handler(_msg("log"))
+        handler._thread.join(0.3)
+        assert db.logs_integration_ms.insert_many.call_count == 1
+        handler.close()
+
+    def test_drop_newest_con_cola_llena(self, db):
+        handler = BufferedMongoDBHandler(batch_size=1000, flush_interval=60, queue_size=2)
+        with patch.object(handler._queue, "put_nowait", side_effect=queue.Full):
+            handler(_msg("perdido"))
+        assert handler.dropped == 1
+        handler.close()
+
+    def test_politica_invalida(self, db):
+        with pytest.raises(ValueError):
+            BufferedMongoDBHandler(drop_policy="otra")
+
+    def test_ignora_logs_despues_de_cerrar(self, db):
+        handler = BufferedMongoDBHandler(batch_size=1, flush_interval=60, queue_size=10)
+        handler.close()
+        handler(_msg("tarde"))
+        db.logs_integration_ms.insert_many.assert_not_called()
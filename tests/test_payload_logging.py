@@ -0,0 +1,81 @@
+import json
+
+import pytest
+from loguru import logger
+
+from app.utils.v1 import PayloadLogging
+from app.utils.v1.PayloadLogging import format_payload, log_payload, log_response, sanitize
+
+pytest_plugins = ["tests.configtest"]
+
+
+@pytest.fixture
+def captured():
+    messages = []
+    handler_id = logger.add(lambda message: messages.append(message.record["message"]), level="INFO")
+    yield messages
+    logger.remove(handler_id)
+
+
+@pytest.mark.unit
+class TestSanitize:
+    def test_oculta_datos_del_instrumento_de_pago(self):
+        instrumento = {
+            "numero": "4111111111111111",
+            "fe_vencimiento": "12/29",
+            "cd_verificacion": "123",
+            "otp": "98765432",
+            "nombre_tarjeta": "JUAN PEREZ",
+        }
+        result = sanitize({"datos": {"instrumento": instrumento}})["datos"]["instrumento"]
+        assert result["numero"] == "***1111"
+        assert result["fe_vencimiento"] == result["cd_verificacion"] == result["otp"] == "***"
+        assert result["nombre_tarjeta"] == "JUAN PEREZ"
+
+    def test_oculta_headers_con_credenciales(self):
+        result = sanitize({"x-api-key": "secreto", "Content-Type": "application/json"})
+        assert result == {"x-api-key": "***", "Content-Type": "application/json"}
+
+    def test_acota_strings_y_listas(self):
+        result = sanitize({"reporte": "A" * 100, "recibos": list(range(10))}, field_max=10, list_max=3)
+        assert result["reporte"] == "A" * 10 + "…(+90 caracteres)"
+        assert result["recibos"] == [0, 1, 2, "…(+7 elementos)"]
+
+    def test_no_modifica_el_payload_original(self):
+        payload = {"otp": "123456"}
+        sanitize(payload)
+        assert payload == {"otp": "123456"}
+
+
+@pytest.mark.unit
+class TestFormatPayload:
+    def test_cuerpo_en_bytes_se_decodifica_y_sanea(self):
+        text = format_payload(b'{"otp": "123456", "monto": 10}')
+        assert json.loads(text) == {"otp": "***", "monto": 10}
+
+    def test_cuerpo_no_json_registra_solo_el_tamano(self):
+        assert format_payload(b"\x00\x01\x02") == "<3 bytes no JSON>"
+
+    def test_acota_el_total(self):
+        text = format_payload({"items": ["x" * 50] * 5}, max_chars=40)
+        assert text[40:].startswith("…(+") and text.endswith("caracteres)")
+
+
+@pytest.mark.unit
+class TestLogPayload:
+    def test_registra_con_etiqueta(self, captured):
+        log_payload("Payload", {"cvv": "123", "monto": 5})
+        assert captured == ['Payload: {"cvv": "***", "monto": 5}']
+
+    def test_no_formatea_si_el_nivel_esta_filtrado(self, monkeypatch, captured):
+        calls = []
+        monkeypatch.setattr(PayloadLogging, "format_payload", lambda value: calls.append(value) or "")
+        log_payload("Payload", {"monto": 5}, level="TRACE")
+        assert calls == [] and captured == []
+
+    def test_log_response_respeta_el_muestreo(self, monkeypatch, captured):
+        log_response("Response", {"ok": True}, sample_rate=0.0)
+        assert captured == []
+        monkeypatch.setattr(PayloadLogging.random, "random", lambda: 0.2)
+        log_response("Response", {"ok": True}, sample_rate=0.5)
+        assert captured == ['Response: {"ok": true}']
@@ -0,0 +1,52 @@
+import copy
+
+import pytest
+
+from app.utils.v1.PayloadTemplate import PayloadTemplate, freeze
+from app.utils.v1.payload_templates import payload_consultar_persona, payload_consultar_poliza
+from app.utils.v2.payload_templates import payload_pasarela_pago
+from app.utils.v5.payload_templates import payload_cotizacion
+
+pytest_plugins = ["tests.configtest"]
+
+
+@pytest.mark.unit
+class TestPayloadTemplate:
+    def test_build_equivale_a_deepcopy(self):
+        original = {"a": 1, "b": {"c": [1, {"d": "x"}], "e": []}, "f": None}
+        template = PayloadTemplate(original)
+        built = template.build()
+        assert built == copy.deepcopy(original)
+        assert list(built) == list(original)
+        assert isinstance(built["b"]["c"], list)
+
+    def test_builds_son_independientes(self):
+        first = payload_cotizacion.build()
+        second = payload_cotizacion.build()
+        first["coll_generales"]["generales"][0]["nm_cliente"] = "OTRO"
+        first["coll_datos"]["datos"].append({"cd_dato": "1"})
+        assert second["coll_generales"]["generales"][0]["nm_cliente"] != "OTRO"
+        assert len(second["coll_datos"]["datos"]) == len(payload_cotizacion["coll_datos"]["datos"])
+
+    def test_mutacion_anidada_no_contamina_plantilla(self):
+        body = payload_consultar_persona.build()
+        body["persona"]["nu_documento"] = "12345678"
+        assert "nu_documento" not in payload_consultar_persona.build()["persona"]
+
+        pago = payload_pasarela_pago.build()
+        pago["datos"]["instrumento_tdc"] = {"numero": "4111"}
+        assert "instrumento_tdc" not in payload_pasarela_pago.build()["datos"]
+
+        poliza = payload_consultar_poliza.build()
+        poliza["polizas-recibos"][0]["nu_recibo"] = 10
+        assert "nu_recibo" not in payload_consultar_poliza.build()["polizas-recibos"][0]
+
+    def test_plantilla_es_inmutable(self):
+        with pytest.raises(TypeError):
+            payload_cotizacion.template["usuario"] = "x"
+        with pytest.raises(TypeError):
+            payload_cotizacion["coll_generales"]["generales"][0]["fe_desde"] = "x"
+
+    def test_rechaza_valores_mutables_no_soportados(self):
+        with pytest.raises(TypeError):
+            freeze({"a": {1, 2}})
@@ -0,0 +1,98 @@
+import base64
+import json
+
+import httpx
+import pytest
+
+from app.utils.v2.ReportStream import Base64FieldDecoder, ReportDiskCache, ReportStreamError
+import app.api.v2.Integration_SM.app as integration_v2
+
+pytest_plugins = ["tests.configtest"]
+
+URL_CUADRO = "https://sm.example.com/swrep/executeRep"
+PDF = b"%PDF-1.4\n" + bytes(range(256)) * 400 + b"\n%%EOF"
+DATOS_POLIZA = {"cd_entidad": 1, "cd_area": 71, "nu_poliza": 123, "nu_certificado": 1, "nu_endoso": 0}
+
+
+def _upstream_body(pdf: bytes = PDF) -> bytes:
+    # el upstream escapa "/" como "\/" y parte el base64 en líneas
+    encoded = base64.encodebytes(pdf).decode()
+    document = {"status": {"code": "EXITO", "descripcion": "EXITO"}, "reporte_codificado": encoded}
+    return json.dumps(document).replace("/", "\\/").encode()
+
+
+def _decode_in_chunks(body: bytes, size: int) -> bytes:
+    decoder = Base64FieldDecoder("reporte_codificado")
+    out = b"".join(decoder.feed(body[i:i + size]) for i in range(0, len(body), size))
+    return out + decoder.finish()
+
+
+@pytest.mark.unit
+class TestBase64FieldDecoder:
+    @pytest.mark.parametrize("size", [1, 3, 7, 4096, 10**7])
+    def test_decodifica_con_cualquier_particion(self, size):
+        assert _decode_in_chunks(_upstream_body(), size) == PDF
+
+    def test_respuesta_sin_reporte(self):
+        body = json.dumps({"status": {"code": "ERROR", "descripcion": "No existe"}}).encode()
+        with pytest.raises(ReportStreamError) as exc:
+            _decode_in_chunks(body, 16)
+        assert b"No existe" in exc.value.body
+
+    def test_nombre_de_archivo_por_datos_poliza(self, tmp_path):
+        cache = ReportDiskCache(str(tmp_path / "reportes"), ttl=60)
+        assert cache.path_for(DATOS_POLIZA).name == "1_71_123_1_0.pdf"
+        assert cache.get(DATOS_POLIZA) is None
+        assert not (tmp_path / "reportes").exists()
+
+
+@pytest.mark.integration
+class TestCuadroPolizaPdf:
+    @pytest.fixture
+    def upstream(self, monkeypatch, api_key, mock_upstream):
+        calls = []
+        bodies = []
+
+        def handler(request: httpx.Request):
+            calls.append(request)
+            return httpx.Response(200, content=bodies.pop(0) if bodies else _upstream_body())
+
+        monkeypatch.setattr(integration_v2, "url_cuadro_poliza", URL_CUADRO)
+        monkeypatch.setattr(integration_v2.api_key_verifier, "api_keys", [api_key])
+        client = mock_upstream(URL_CUADRO, handler)
+
+        async def post(headers):
+            return await client.post(
+                "/api/v2/sm/cuadro_poliza/pdf", json={"datos_poliza": DATOS_POLIZA}, headers=headers
+            )
+
+        return post, calls, bodies
+
+    @pytest.mark.asyncio
+    async def test_entrega_pdf_decodificado(self, upstream, headers):
+        post, _, _ = upstream
+        response = await post(headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/pdf"
+        assert response.content == PDF
+
+    @pytest.mark.asyncio
+    async def test_error_del_upstream(self, upstream, headers):
+        post, _, bodies = upstream
+        bodies.append(json.dumps({"status": {"code": "ERROR", "descripcion": "Poliza no existe"}}).encode())
+        response = await post(headers)
+        assert response.status_code == 502
+        assert "Poliza no existe" in response.json()["detail"]
+
+    @pytest.mark.asyncio
+    async def test_cache_en_disco(self, upstream, headers, monkeypatch, tmp_path):
+        post, calls, _ = upstream
+        directory = tmp_path / "reportes"
+        monkeypatch.setattr(integration_v2, "cuadro_poliza_cache", ReportDiskCache(str(directory), ttl=60))
+
+        first = await post(headers)
+        second = await post(headers)
+
+        assert first.content == second.content == PDF
+        assert len(calls) == 1
+        assert [p.name for p in directory.iterdir()] == ["1_71_123_1_0.pdf"]
@@ -0,0 +1,97 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.utils.v1.RequestCoalescing import coalescing_stats, request_key
+from app.utils.v1.ResponseCache import SingleFlight
+from app.schemas.v1.Integration_SM.ModelAPI import ConsultarPolizaBase
+import app.api.v1.Integration_SM.app as integration_v1
+
+pytest_plugins = ["tests.configtest"]
+
+URL_PERSONA = "https://sm.example.com/consultarpersona"
+
+
+@pytest.mark.unit
+class TestRequestKey:
+    def test_clave_ignora_orden_de_campos(self):
+        a = ConsultarPolizaBase(cd_entidad=1, cd_area=71, poliza=123, certificado=1)
+        b = ConsultarPolizaBase(certificado=1, poliza=123, cd_area=71, cd_entidad=1)
+        assert request_key(a) == request_key(b)
+
+
+@pytest.mark.unit
+class TestSingleFlight:
+    @pytest.mark.asyncio
+    async def test_cancelar_al_lider_no_cancela_a_quien_espera(self):
+        flight = SingleFlight()
+        llamadas = []
+
+        async def loader():
+            llamadas.append(1)
+            await asyncio.sleep(0.05)
+            return len(llamadas)
+
+        lider = asyncio.create_task(flight.do("k", loader))
+        await asyncio.sleep(0)
+        seguidor = asyncio.create_task(flight.do("k", loader))
+        await asyncio.sleep(0.01)
+        lider.cancel()
+
+        resultado = await seguidor
+
+        assert lider.cancelled()
+        assert not seguidor.cancelled()
+        # el seguidor tomó el relevo y ejecutó su propia llamada
+        assert resultado == (2, False)
+        assert "k" not in flight
+
+    @pytest.mark.asyncio
+    async def test_cancelar_a_quien_espera_no_afecta_al_lider(self):
+        flight = SingleFlight()
+
+        async def loader():
+            await asyncio.sleep(0.05)
+            return "ok"
+
+        lider = asyncio.create_task(flight.do("k", loader))
+        await asyncio.sleep(0)
+        seguidor = asyncio.create_task(flight.do("k", loader))
+        await asyncio.sleep(0.01)
+        seguidor.cancel()
+
+        assert await lider == ("ok", False)
+        assert seguidor.cancelled()
+
+
+@pytest.mark.integration
+class TestCoalescingConsultarPersona:
+    @pytest.mark.asyncio
+    async def test_peticiones_identicas_comparten_una_llamada(self, monkeypatch, api_key, headers, mock_upstream):
+        calls = []
+
+        async def upstream(request: httpx.Request):
+            calls.append(request)
+            await asyncio.sleep(0.1)
+            return httpx.Response(200, json={
+                "status": {"code": "EXITO", "descripcion": "EXITO"},
+                "persona": {"nu_documento": "12345678"},
+            })
+
+        monkeypatch.setattr(integration_v1, "url_consult_persona", URL_PERSONA)
+        monkeypatch.setattr(integration_v1.api_key_verifier, "api_keys", [api_key])
+        client = mock_upstream(URL_PERSONA, upstream)
+        bodies = [{"num_documento": "V-12345678"}] * 5 + [{"num_documento": "V-87654321"}]
+        coalesced = integration_v1.persona_cache.coalesced
+        responses = await asyncio.gather(*[
+            client.post("/api/v1/sm/consultar_persona", json=body, headers=headers)
+            for body in bodies
+        ])
+
+        assert all(r.status_code == 200 for r in responses)
+        assert len({r.text for r in responses}) == 1
+        assert len(calls) == 2
+        # una sola capa: la de la caché de consultas, no un coalesce_requests encima
+        assert integration_v1.persona_cache.coalesced - coalesced == 4
+        assert not any(name.endswith(".consultar_persona") for name in coalescing_stats())
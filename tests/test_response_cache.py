@@ -0,0 +1,130 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from app.api.app import app
+from app.utils.v1.ResponseCache import MemoryCacheBackend, ResponseCache
+import app.api.v1.PasarelaPagoMS.app as pasarela_v1
+
+pytest_plugins = ["tests.configtest"]
+
+URL_TASA = "https://suscripcion.example.com/consultartasascambio"
+
+
+@pytest.mark.unit
+class TestMemoryCacheBackend:
+    @pytest.mark.asyncio
+    async def test_expira_por_ttl(self):
+        backend = MemoryCacheBackend()
+        await backend.set("a", 1, ttl=0.01)
+        await backend.set("b", 2)
+        await asyncio.sleep(0.02)
+        assert await backend.get("a") is None
+        assert await backend.get("b") == (2, None)
+
+    @pytest.mark.asyncio
+    async def test_desaloja_la_menos_usada(self):
+        backend = MemoryCacheBackend(maxsize=2)
+        await backend.set("a", 1)
+        await backend.set("b", 2)
+        await backend.get("a")
+        await backend.set("c", 3)
+        assert await backend.get("b") is None
+        assert len(backend) == 2
+
+
+@pytest.mark.unit
+class TestResponseCache:
+    @pytest.mark.asyncio
+    async def test_agrupa_misses_concurrentes(self):
+        cache = ResponseCache("prueba")
+        calls = 0
+
+        async def loader():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return {"valor": 1}
+
+        results = await asyncio.gather(*[cache.get_or_load("k", loader) for _ in range(10)])
+        again = await cache.get_or_load("k", loader)
+
+        assert calls == 1
+        assert all(r == {"valor": 1} for r in results) and again == {"valor": 1}
+        assert cache.stats() == {
+            "hits": 1, "misses": 1, "coalesced": 9, "bypasses": 0, "errors": 0, "invalidations": 0, "size": 1,
+        }
+
+    @pytest.mark.asyncio
+    async def test_no_cachea_errores(self):
+        cache = ResponseCache("prueba")
+
+        async def loader():
+            raise HTTPException(status_code=400, detail="error")
+
+        for _ in range(2):
+            with pytest.raises(HTTPException):
+                await cache.get_or_load("k", loader)
+        assert cache.misses == 2
+        assert len(cache.local) == 0
+
+
+@pytest.mark.unit
+class TestTasaBCVTTL:
+    def test_fecha_pasada_no_expira(self):
+        assert pasarela_v1.tasa_bcv_ttl("01/01/2024") is None
+
+    def test_fecha_de_hoy_usa_ttl_corto(self):
+        hoy = datetime.now(pasarela_v1.VET).strftime("%d/%m/%Y")
+        manana = (datetime.now(pasarela_v1.VET) + timedelta(days=1)).strftime("%d/%m/%Y")
+        assert pasarela_v1.tasa_bcv_ttl(hoy) == pasarela_v1.TASA_BCV_CACHE_TTL
+        assert pasarela_v1.tasa_bcv_ttl(manana) == pasarela_v1.TASA_BCV_CACHE_TTL
+
+
+@pytest.mark.integration
+class TestConsultarTasaBCVCache:
+    @pytest.mark.asyncio
+    async def test_segunda_consulta_no_llama_al_upstream(self, monkeypatch, api_key, headers, mock_upstream):
+        calls = []
+
+        def upstream(request: httpx.Request):
+            calls.append(request)
+            return httpx.Response(200, json={
+                "status": {"code": "EXITO", "descripcion": "EXITO"},
+                "tasa": [{
+                    "in_tasa": 1, "tasa_compra": 36.5, "cd_moneda": 2,
+                    "tasa_venta": 36.6, "cd_producto": 1, "fe_tasa": "15/03/2023",
+                }],
+            })
+
+        monkeypatch.setattr(pasarela_v1, "url_suscripcion_tasa_bcv", URL_TASA)
+        monkeypatch.setattr(pasarela_v1.api_key_verifier, "api_keys", [api_key])
+        monkeypatch.setattr(pasarela_v1, "tasa_bcv_cache", ResponseCache("tasa_bcv"))
+        client = mock_upstream(URL_TASA, upstream, verify=False)
+        for _ in range(3):
+            response = await client.post(
+                "/api/v1/pasarela_pago_ms/consultar_tasa_bcv",
+                json={"fe_tasa": "15/03/2023"},
+                headers=headers,
+            )
+            assert response.status_code == 200
+
+        assert len(calls) == 1
+        assert pasarela_v1.tasa_bcv_cache.stats()["hits"] == 2
+
+    @pytest.mark.asyncio
+    async def test_fecha_inexistente_es_error_de_validacion(self, monkeypatch, api_key, headers):
+        monkeypatch.setattr(pasarela_v1.api_key_verifier, "api_keys", [api_key])
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(
+                "/api/v1/pasarela_pago_ms/consultar_tasa_bcv",
+                json={"fe_tasa": "31/02/2024"},
+                headers=headers,
+            )
+
+        assert response.status_code == 422
+        assert "fe_tasa no es una fecha valida" in response.text
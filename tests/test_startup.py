@@ -0,0 +1,54 @@
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.api.app as api_app
+from app.api.app import ROUTERS, app, enabled_routers
+from app.utils.v1.StartupTiming import StartupTimings
+
+pytest_plugins = ["tests.configtest"]
+
+
+@pytest.mark.unit
+class TestEnabledRouters:
+    def test_vacio_monta_todos(self):
+        assert enabled_routers(None) == list(ROUTERS)
+        assert enabled_routers(" ") == list(ROUTERS)
+
+    def test_respeta_el_orden_de_declaracion(self):
+        assert enabled_routers("v2_pasarela, v1_sm") == ["v1_sm", "v2_pasarela"]
+
+    def test_nombre_desconocido(self):
+        with pytest.raises(ValueError):
+            enabled_routers("v1_sm,v9_sm")
+
+
+@pytest.mark.unit
+class TestStartupTimings:
+    def test_registra_importacion_y_pasos(self):
+        timings = StartupTimings()
+        module = timings.import_module("json")
+        with timings.step("paso"):
+            pass
+
+        assert module.__name__ == "json"
+        assert set(timings.report()["imports"]["json"]) == {"ms", "modules"}
+        assert "paso" in timings.report()["steps"]
+
+
+@pytest.mark.integration
+class TestLifespan:
+    def test_conecta_mongo_en_el_lifespan(self, monkeypatch):
+        attach = MagicMock(return_value=True)
+        detach = MagicMock()
+        monkeypatch.setattr(api_app, "attach_mongodb_sink", attach)
+        monkeypatch.setattr(api_app, "detach_mongodb_sink", detach)
+
+        with TestClient(app) as client:
+            attach.assert_called_once()
+            report = client.get("/health/startup").json()
+
+        detach.assert_called_once()
+        assert "mongodb_sink" in report["steps"]
+        assert "app.api.v1.Integration_SM.app" in report["imports"]
@@ -0,0 +1,118 @@
+import httpx
+import pytest
+
+from app.utils.v1 import AsyncHttpx
+from app.utils.v1.AsyncHttpx import fetch_url, http_pool, upstream_key
+from app.utils.v1.UpstreamPolicy import (
+    CircuitBreaker,
+    CircuitOpenError,
+    UpstreamPolicy,
+    _breakers,
+)
+
+pytest_plugins = ["tests.configtest"]
+
+URL = "https://upstream.example.com/consultar"
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Registra una política de prueba y un transporte simulado para `URL`."""
+    calls = []
+    responses = []
+
+    def handler(request: httpx.Request):
+        calls.append(request)
+        result = responses.pop(0) if responses else httpx.Response(200, json={"ok": True})
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def configure(policy: UpstreamPolicy):
+        monkeypatch.setitem(AsyncHttpx.UPSTREAM_POLICIES, URL, policy)
+        _breakers.pop(policy.name, None)
+        http_pool.clients[upstream_key(URL)] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return calls, responses
+
+    yield configure
+    http_pool.clients.pop(upstream_key(URL), None)
+
+
+@pytest.mark.unit
+class TestUpstreamPolicy:
+    def test_no_idempotente_no_admite_reintentos(self):
+        with pytest.raises(ValueError):
+            UpstreamPolicy(name="emitir", max_retries=2)
+
+    def test_timeouts_por_fase(self):
+        timeout = UpstreamPolicy(name="x", connect_timeout=2, read_timeout=30).timeout
+        assert timeout.connect == 2
+        assert timeout.read == 30
+
+
+@pytest.mark.unit
+class TestCircuitBreaker:
+    def test_abre_tras_umbral_y_rechaza(self):
+        breaker = CircuitBreaker("x", failure_threshold=2, reset_timeout=60)
+        breaker.record_failure()
+        breaker.before_call()
+        breaker.record_failure()
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+        assert breaker.snapshot()["rejected"] == 1
+
+    def test_half_open_deja_pasar_una_prueba(self):
+        breaker = CircuitBreaker("x", failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        breaker.before_call()
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.unit
+class TestFetchUrlConPolitica:
+    @pytest.mark.asyncio
+    async def test_reintenta_lectura_idempotente_ante_503(self, upstream):
+        calls, responses = upstream(
+            UpstreamPolicy(name="lectura", idempotent=True, max_retries=2, backoff_base=0.001, backoff_max=0.01)
+        )
+        responses.extend([httpx.Response(503), httpx.ConnectError("caído")])
+
+        response = await fetch_url("POST", URL, {}, {})
+
+        assert response.status_code == 200
+        assert len(calls) == 3
+
+    @pytest.mark.asyncio
+    async def test_devuelve_ultima_respuesta_al_agotar_reintentos(self, upstream):
+        calls, responses = upstream(
+            UpstreamPolicy(name="lectura", idempotent=True, max_retries=1, backoff_base=0.001, backoff_max=0.01)
+        )
+        responses.extend([httpx.Response(503), httpx.Response(502)])
+
+        response = await fetch_url("POST", URL, {}, {})
+
+        assert response.status_code == 502
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_no_reintenta_escrituras(self, upstream):
+        calls, responses = upstream(UpstreamPolicy(name="emitir"))
+        responses.append(httpx.ReadTimeout("lento"))
+
+        with pytest.raises(httpx.ReadTimeout):
+            await fetch_url("POST", URL, {}, {})
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_circuito_abierto_no_llama_al_upstream(self, upstream):
+        calls, responses = upstream(UpstreamPolicy(name="emitir", failure_threshold=2, reset_timeout=60))
+        responses.extend([httpx.Response(500), httpx.Response(500)])
+
+        await fetch_url("POST", URL, {}, {})
+        await fetch_url("POST", URL, {}, {})
+        with pytest.raises(CircuitOpenError):
+            await fetch_url("POST", URL, {}, {})
+        assert len(calls) == 2
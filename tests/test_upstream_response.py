@@ -0,0 +1,63 @@
+import httpx
+import pytest
+from fastapi import HTTPException
+
+import app.utils.v1.UpstreamResponse as upstream_response
+from app.utils.v1.UpstreamResponse import FALLONEGOCIO, UpstreamResponse
+
+pytest_plugins = ["tests.configtest"]
+
+
+def _response(status_code: int = 200, code: str = "EXITO", **body) -> httpx.Response:
+    return httpx.Response(status_code, json={"status": {"code": code, "descripcion": code}, **body})
+
+
+@pytest.mark.unit
+class TestUpstreamResponse:
+    def test_decodifica_una_sola_vez(self, monkeypatch):
+        calls = []
+        original = upstream_response.json_loads
+
+        def counting(data):
+            calls.append(data)
+            return original(data)
+
+        monkeypatch.setattr(upstream_response, "json_loads", counting)
+        upstream = UpstreamResponse(_response(datos={"id": 1})).ensure_success()
+
+        assert upstream["datos"] == {"id": 1}
+        assert upstream.code == "EXITO" and upstream.ok
+        assert len(calls) == 1
+
+    def test_error_http_conserva_el_codigo_del_upstream(self):
+        with pytest.raises(HTTPException) as exc:
+            UpstreamResponse(httpx.Response(503, text="caido")).ensure_success()
+        assert exc.value.status_code == 503
+        assert exc.value.detail == "caido"
+
+    def test_codigo_de_negocio_usa_el_estado_http_del_upstream(self):
+        with pytest.raises(HTTPException) as exc:
+            UpstreamResponse(_response(code=FALLONEGOCIO)).ensure_success()
+        assert exc.value.status_code == 200
+
+    def test_failure_status_por_codigo(self):
+        with pytest.raises(HTTPException) as exc:
+            UpstreamResponse(_response(code=FALLONEGOCIO)).ensure_success(failure_status={FALLONEGOCIO: 400})
+        assert exc.value.status_code == 400
+
+    def test_respuesta_no_json(self):
+        with pytest.raises(HTTPException) as exc:
+            UpstreamResponse(httpx.Response(200, text="<html>")).ensure_success()
+        assert exc.value.status_code == 502
+
+    def test_status_detail_usa_codigo_y_descripcion(self):
+        response = httpx.Response(200, json={"status": {"code": FALLONEGOCIO, "descripcion": "Plan no vigente"}})
+        with pytest.raises(HTTPException) as exc:
+            UpstreamResponse(response).ensure_success(status_detail=True)
+        assert exc.value.detail == "FALLONEGOCIO Plan no vigente"
+
+    def test_status_detail_sin_status_conserva_el_cuerpo(self):
+        with pytest.raises(HTTPException) as exc:
+            UpstreamResponse(httpx.Response(503, text="caido")).ensure_success(status_detail=True)
+        assert exc.value.status_code == 503
+        assert exc.value.detail == "caido"
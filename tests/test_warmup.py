@@ -0,0 +1,100 @@
+import anyio
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+import app.api.app as api_app
+from app.api.app import app
+from app.utils.v1 import AsyncHttpx
+from app.utils.v1.AsyncHttpx import AsyncHttpClientPool, upstream_hosts, upstream_key
+from app.utils.v1.WarmUp import WarmUp, warm_up
+
+pytest_plugins = ["tests.configtest"]
+
+
+@pytest.mark.unit
+class TestUpstreamHosts:
+    def test_un_host_por_combinacion_de_verificacion(self, monkeypatch):
+        monkeypatch.setattr(AsyncHttpx, "UPSTREAM_POLICIES", {
+            "https://sm.example.com/consultarpersona": None,
+            "https://sm.example.com/cotizarglobal": None,
+            "https://pagos.example.com/onlinepay/register": None,
+            "/sin_host": None,
+        })
+        monkeypatch.setattr(AsyncHttpx, "UNVERIFIED_TLS_URLS", {"https://pagos.example.com/onlinepay/register"})
+        assert upstream_hosts() == [("https://sm.example.com", True), ("https://pagos.example.com", False)]
+
+
+@pytest.mark.unit
+class TestWarmConnections:
+    @pytest.mark.asyncio
+    async def test_abre_conexiones_concurrentes(self):
+        requests = []
+
+        async def upstream(request: httpx.Request):
+            requests.append(request)
+            return httpx.Response(404)
+
+        pool = AsyncHttpClientPool()
+        pool.clients[upstream_key("https://sm.example.com")] = httpx.AsyncClient(
+            transport=httpx.MockTransport(upstream), base_url="https://sm.example.com"
+        )
+        opened = await pool.warm("https://sm.example.com", connections=3)
+        await pool.aclose()
+
+        assert opened == 3
+        assert {(r.method, r.url.path) for r in requests} == {("HEAD", "/")}
+
+    @pytest.mark.asyncio
+    async def test_un_host_caido_no_falla(self):
+        async def upstream(request: httpx.Request):
+            raise httpx.ConnectError("sin ruta", request=request)
+
+        pool = AsyncHttpClientPool()
+        pool.clients[upstream_key("https://sm.example.com")] = httpx.AsyncClient(transport=httpx.MockTransport(upstream))
+        assert await pool.warm("https://sm.example.com", connections=2) == 0
+        await pool.aclose()
+
+
+@pytest.mark.unit
+class TestWarmUp:
+    @pytest.mark.asyncio
+    async def test_registra_pasos_y_fallos(self):
+        async def ok():
+            return 3
+
+        async def falla():
+            raise RuntimeError("mongo caído")
+
+        state = WarmUp()
+        await state.run({"upstreams": ok, "mongodb": falla})
+
+        report = state.report()
+        assert report["ready"] is True
+        assert report["steps"]["upstreams"]["result"] == 3
+        assert report["steps"]["mongodb"]["ok"] is False
+        assert "mongo caído" in report["steps"]["mongodb"]["error"]
+
+
+@pytest.mark.integration
+class TestHealthDuranteCalentamiento:
+    def test_health_responde_503_hasta_terminar(self, monkeypatch):
+        liberar = anyio.Event()
+
+        async def lento():
+            await liberar.wait()
+
+        monkeypatch.setattr(api_app, "warm_up_steps", lambda app: {"upstreams": lento})
+
+        with TestClient(app) as client:
+            respuesta = client.get("/health")
+            assert respuesta.status_code == 503
+            assert respuesta.json() == {"status": "warming_up"}
+
+            client.portal.call(liberar.set)
+            for _ in range(100):
+                if warm_up.ready:
+                    break
+                client.portal.call(anyio.sleep, 0.01)
+            assert client.get("/health").json() == {"status": "ok"}
+            assert "upstreams" in client.get("/health/startup").json()["warmup"]["steps"]